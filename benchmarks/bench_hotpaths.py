@@ -0,0 +1,211 @@
+"""Benchmarks for the utils and portfolio hot paths on replayed fixture data.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_hotpaths                 # full grid
+    python -m benchmarks.bench_hotpaths --quick         # smallest sizes only
+    python -m benchmarks.bench_hotpaths --output bench.jsonl --latency 0.05
+
+Each result is one JSON line on stdout (and in ``--output`` if given):
+
+    {"benchmark": "generate_portfolio_snapshot", "params": {"holdings": 500},
+     "repeats": 3, "wall_time_s": {"min": ..., "median": ...}, "peak_memory_bytes": ...}
+
+Wall time is measured without tracing; peak memory comes from one extra
+traced run with ``tracemalloc``.
+"""
+import argparse
+import atexit
+import itertools
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fixtures and stores live in a scratch directory removed on exit. Pointing the
+# local store there must happen before utils is imported.
+WORKDIR = tempfile.mkdtemp(prefix="stockinsight-bench-")
+atexit.register(shutil.rmtree, WORKDIR, ignore_errors=True)
+os.environ.setdefault("STOCKINSIGHT_CACHE_DIR", os.path.join(WORKDIR, "store"))
+# Replayed fixtures aren't rate limited; --latency models upstream speed instead
+os.environ.setdefault("STOCKINSIGHT_UPSTREAM_RATE", "0")
+
+import fundamentals
+import history_store
+import providers
+import sector_stats
+import upstream
+import utils
+from prefetch import QuoteSnapshot
+from benchmarks.fixtures import fixture_symbols, holdings_for, synthetic_history, write_fixtures
+
+HOLDING_SIZES = [26, 100, 500, 1000, 5000]
+HISTORY_YEARS = [1, 5, 10, 20]
+QUICK_HOLDING_SIZES = [26, 500]
+QUICK_HISTORY_YEARS = [1, 5]
+
+
+def measure(name, params, func, repeats, setup=None):
+    """Time ``func`` over ``repeats`` runs, then record peak memory of one traced run."""
+    timings = []
+    for _ in range(repeats):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        func(state)
+        timings.append(time.perf_counter() - start)
+
+    state = setup() if setup else None
+    tracemalloc.start()
+    func(state)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'benchmark': name,
+        'params': params,
+        'repeats': repeats,
+        'wall_time_s': {'min': min(timings), 'median': statistics.median(timings)},
+        'peak_memory_bytes': peak,
+    }
+
+
+def _clear_memos():
+    """Drop every in-memory layer: memoized fetches, indicator state, the shared quote snapshot and upstream state."""
+    utils.get_info.cache_clear()
+    utils.get_quote.cache_clear()
+    utils.load_history.cache_clear()
+    # Recreated on first use, so a repeat can't reuse the previous one's indicator state
+    utils._indicator_cache = None
+    utils._quote_snapshot = QuoteSnapshot()
+    # Fresh rate limiter, breaker, stale copies and unknown-symbol cache
+    upstream._upstream = upstream.Upstream()
+
+
+def _fresh_store():
+    """Point the process-wide history and fundamentals stores at empty files and drop every in-memory layer."""
+    directory = tempfile.mkdtemp(dir=WORKDIR)
+    history_store._store = history_store.HistoryStore(os.path.join(directory, "history.sqlite3"))
+    fundamentals._store = fundamentals.FundamentalsStore(os.path.join(directory, "fundamentals.sqlite3"))
+    # Sector aggregates are built from (and subscribed to) the fundamentals store
+    sector_stats._stats = None
+    _clear_memos()
+
+
+def bench_portfolio(sizes, repeats, latency):
+    import pages.portfolio as portfolio
+
+    symbols = fixture_symbols(max(sizes))
+    root = write_fixtures(tempfile.mkdtemp(dir=WORKDIR), symbols, history=False)
+    providers.set_provider(providers.ReplayProvider(root, latency=latency))
+    holdings = holdings_for(symbols)
+
+    for size in sizes:
+        subset = symbols[:size]
+
+        # Every repeat starts cold, so no run is served from an earlier run's caches
+        yield measure('generate_portfolio_snapshot', {'holdings': size, 'latency_s': latency},
+                      lambda _: utils.generate_portfolio_snapshot(subset, holdings), repeats, setup=_fresh_store)
+
+        _fresh_store()
+        frame, _, _ = utils.generate_portfolio_snapshot(subset, holdings)
+        yield measure('calculate_gain_loss', {'holdings': size},
+                      lambda df: portfolio.calculate_gain_loss(df), repeats, setup=frame.copy)
+
+
+def bench_history(years_list, repeats, latency):
+    for years in years_list:
+        closes = synthetic_history(years, years)['Close']
+        yield measure('calculate_rsi', {'years': years, 'bars': len(closes)},
+                      lambda _: utils.calculate_rsi(closes), repeats)
+
+        root = write_fixtures(tempfile.mkdtemp(dir=WORKDIR), fixture_symbols(1), years=years)
+        providers.set_provider(providers.ReplayProvider(root, latency=latency))
+        symbol = fixture_symbols(1)[0]
+
+        yield measure('get_stock_data', {'years': years, 'store': 'cold', 'latency_s': latency},
+                      lambda _: utils.get_stock_data(symbol), repeats, setup=_fresh_store)
+
+        # Warm: the bars are stored, but nothing is memoized in memory
+        utils.get_stock_data(symbol)
+        yield measure('get_stock_data', {'years': years, 'store': 'warm', 'latency_s': latency},
+                      lambda _: utils.get_stock_data(symbol), repeats, setup=_clear_memos)
+
+
+def bench_downsample(years_list, repeats):
+    import downsample
+
+    for years in years_list:
+        hist = synthetic_history(years, years)
+        yield measure('lttb', {'years': years, 'bars': len(hist)},
+                      lambda _: downsample.lttb(hist, 'Close'), repeats)
+        yield measure('ohlc_buckets', {'years': years, 'bars': len(hist)},
+                      lambda _: downsample.ohlc_buckets(hist), repeats)
+
+
+def bench_xirr(sizes, repeats, flows_per_holding=100):
+    import numpy as np
+    import xirr
+
+    for size in sizes:
+        rng = np.random.default_rng(size)
+        groups = np.repeat(np.arange(size), flows_per_holding)
+        years = rng.uniform(0, 20, len(groups))
+        amounts = -rng.uniform(100, 10_000, len(groups))
+        # One terminal inflow per holding, worth its buys grown at a random rate
+        growth = (1 + rng.uniform(-0.3, 0.5, size))[groups] ** years
+        terminal = np.bincount(groups, weights=-amounts * growth, minlength=size)
+        args = (np.concatenate([groups, np.arange(size)]), np.concatenate([amounts, terminal]),
+                np.concatenate([years, np.zeros(size)]), size)
+        yield measure('solve_xirr', {'holdings': size, 'cashflows': len(args[0])},
+                      lambda _: xirr.solve_xirr(*args), repeats)
+
+
+def bench_summary(repeats):
+    info = {
+        'regularMarketPrice': 1234.5, 'regularMarketPreviousClose': 1200.0, 'regularMarketOpen': 1210.0,
+        'dayHigh': 1240.0, 'dayLow': 1190.0, 'fiftyTwoWeekHigh': 1500.0, 'fiftyTwoWeekLow': 900.0,
+        'trailingPE': 24.3, 'trailingEps': 50.8, 'marketCap': 4_500_000_000_000, 'volume': 1_200_000,
+    }
+    yield measure('prepare_summary_data', {}, lambda _: utils.prepare_summary_data(info), repeats)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help="run only the smallest sizes")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--latency', type=float, default=0.0, help="artificial replay latency per upstream call (s)")
+    parser.add_argument('--output', help="also append JSON lines to this file")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_HOLDING_SIZES if args.quick else HOLDING_SIZES
+    years = QUICK_HISTORY_YEARS if args.quick else HISTORY_YEARS
+
+    results = itertools.chain(
+        bench_portfolio(sizes, args.repeats, args.latency),
+        bench_history(years, args.repeats, args.latency),
+        bench_downsample(years, args.repeats),
+        bench_xirr(sizes, args.repeats),
+        bench_summary(args.repeats),
+    )
+
+    out = open(args.output, 'a') if args.output else None
+    try:
+        for result in results:
+            line = json.dumps(result)
+            print(line)
+            if out:
+                out.write(line + "\n")
+                out.flush()
+    finally:
+        if out:
+            out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Import-time budget check: cold-start cost of the app and batch entry points.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_import                    # all modules, default budgets
+    python -m benchmarks.bench_import utils cli --repeats 5
+    python -m benchmarks.bench_import --budget utils=0.1 --output imports.jsonl
+
+Each module is imported in a fresh interpreter under ``python -X importtime``
+and its cumulative import time is read from the trace. Results are JSON lines
+in the same shape as ``bench_hotpaths``, plus the budget and any heavy
+dependency that was loaded eagerly:
+
+    {"benchmark": "import", "params": {"module": "utils"}, "repeats": 3,
+     "wall_time_s": {"min": ..., "median": ...}, "budget_s": 0.15, "eager": [], "ok": true}
+
+The exit status is 1 if any module goes over its budget or eagerly imports
+one of its ``LAZY`` dependencies, so this can gate CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Set, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds of cumulative import time allowed per module (median over repeats)
+IMPORT_BUDGETS = {
+    'market_calendar': 0.1,
+    'utils': 0.15,
+    'cli': 0.1,
+    'screener': 0.15,
+    # The Streamlit page needs streamlit and pandas up front; this guards against
+    # further eager imports (yfinance alone adds about 0.6 s)
+    'pages.portfolio': 2.0,
+}
+
+# Dependencies each module must leave to first use
+HEAVY = ('pandas', 'numpy', 'pyarrow', 'yfinance', 'requests', 'plotly', 'streamlit')
+LAZY = {
+    'market_calendar': HEAVY,
+    'utils': HEAVY,
+    'cli': HEAVY,
+    'screener': HEAVY,
+    'pages.portfolio': ('yfinance', 'requests'),
+}
+
+
+def import_trace(module: str) -> Tuple[float, Set[str]]:
+    """Cumulative seconds to import ``module`` in a fresh interpreter, and every module it loaded."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    # Keep imports that create the local store from touching the real one
+    env.setdefault("STOCKINSIGHT_CACHE_DIR", tempfile.mkdtemp(prefix="stockinsight-import-"))
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    cumulative, loaded = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, micros, name = line.split('|')
+        loaded.add(name.strip())
+        if name.strip() == module and not name[1:].startswith(' '):
+            cumulative = int(micros) / 1e6
+    if cumulative is None:
+        raise RuntimeError(f"import {module}: no top-level entry in the -X importtime trace")
+    return cumulative, loaded
+
+
+def check_module(module: str, budget: float, repeats: int) -> Dict:
+    timings, loaded = [], set()
+    for _ in range(repeats):
+        seconds, loaded = import_trace(module)
+        timings.append(seconds)
+
+    eager = sorted(dep for dep in LAZY.get(module, ()) if dep in loaded)
+    median = statistics.median(timings)
+    return {
+        'benchmark': 'import',
+        'params': {'module': module},
+        'repeats': repeats,
+        'wall_time_s': {'min': min(timings), 'median': median},
+        'budget_s': budget,
+        'eager': eager,
+        'ok': median <= budget and not eager,
+    }
+
+
+def _parse_budgets(overrides: List[str]) -> Dict[str, float]:
+    budgets = dict(IMPORT_BUDGETS)
+    for item in overrides:
+        module, _, seconds = item.partition('=')
+        try:
+            budgets[module] = float(seconds)
+        except ValueError:
+            raise SystemExit(f"--budget expects MODULE=SECONDS, got {item!r}")
+    return budgets
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', help="modules to check (default: every module in IMPORT_BUDGETS)")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--budget', action='append', default=[], metavar='MODULE=SECONDS',
+                        help="override a module's budget (repeatable)")
+    parser.add_argument('--output', help="also append JSON lines to this file")
+    args = parser.parse_args(argv)
+
+    budgets = _parse_budgets(args.budget)
+    modules = args.modules or list(IMPORT_BUDGETS)
+    unknown = [module for module in modules if module not in budgets]
+    if unknown:
+        raise SystemExit(f"No budget for {', '.join(unknown)}; pass --budget MODULE=SECONDS")
+
+    failed = []
+    out = open(args.output, 'a') if args.output else None
+    try:
+        for module in modules:
+            result = check_module(module, budgets[module], args.repeats)
+            line = json.dumps(result)
+            print(line)
+            if out:
+                out.write(line + "\n")
+                out.flush()
+            if not result['ok']:
+                failed.append(module)
+    finally:
+        if out:
+            out.close()
+
+    if failed:
+        print(f"Over import budget: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Deterministic market-data fixtures in the ReplayProvider layout.
+
+They are written exactly as ``STOCKINSIGHT_PROVIDER=record:<dir>`` would record
+live payloads, but generated, so the suite can scale to thousands of symbols
+and decades of history offline and reproducibly.
+"""
+import json
+import os
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from providers import _symbol_dir
+
+TRADING_DAYS_PER_YEAR = 252
+INDEX_SYMBOLS = ['^NSEI', '^NSEBANK', '^BSESN']
+
+
+def fixture_symbols(count: int) -> List[str]:
+    """Synthetic NSE tickers SYM0000, SYM0001, ..."""
+    return [f"SYM{i:04d}" for i in range(count)]
+
+
+def synthetic_history(seed: int, years: int, end: str = "2025-01-31") -> pd.DataFrame:
+    """Geometric random-walk daily bars in the yfinance history shape."""
+    rng = np.random.default_rng(seed)
+    days = years * TRADING_DAYS_PER_YEAR
+    index = pd.bdate_range(end=end, periods=days, name='Date')
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, days)))
+    spread = np.abs(rng.normal(0, 0.01, days)) * close
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.3, days) * spread,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(10_000, 5_000_000, days).astype(float),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
+
+
+def synthetic_info(seed: int, last_close: float, high: float, low: float) -> Dict:
+    """A ``Ticker.info`` payload with the fields the app reads."""
+    rng = np.random.default_rng(seed + 1_000_000)
+    info = {
+        'longName': f"Synthetic Company {seed}",
+        'regularMarketPrice': round(last_close, 2),
+        'regularMarketPreviousClose': round(last_close * (1 + rng.normal(0, 0.01)), 2),
+        'regularMarketOpen': round(last_close * (1 + rng.normal(0, 0.005)), 2),
+        'dayHigh': round(last_close * 1.01, 2),
+        'dayLow': round(last_close * 0.99, 2),
+        'fiftyTwoWeekHigh': round(high, 2),
+        'fiftyTwoWeekLow': round(low, 2),
+        'trailingPE': round(float(rng.uniform(5, 80)), 2),
+        'trailingEps': round(float(rng.uniform(-5, 60)), 2),
+        'returnOnEquity': round(float(rng.uniform(-0.05, 0.35)), 4),
+        'dividendYield': round(float(rng.choice([0.0, rng.uniform(0.001, 0.05)])), 4),
+        'marketCap': int(rng.uniform(1e9, 1e13)),
+        'volume': int(rng.uniform(1e4, 1e7)),
+        'sector': str(rng.choice(['Technology', 'Financial Services', 'Energy', 'Healthcare', 'Consumer Defensive'])),
+        'exchangeTimezoneName': 'Asia/Kolkata',
+    }
+    info['sharesOutstanding'] = round(info['marketCap'] / last_close)
+    return info
+
+
+def write_fixtures(root: str, symbols: List[str], years: int = 1, history: bool = True) -> str:
+    """Write info.json (and history.csv unless ``history`` is False) for each symbol plus the indices.
+
+    Symbols get the .NS suffix. Skipping history keeps quote-only fixtures for
+    thousands of holdings small.
+    """
+    for seed, symbol in enumerate(INDEX_SYMBOLS + [f"{s}.NS" for s in symbols]):
+        directory = _symbol_dir(root, symbol)
+        os.makedirs(directory, exist_ok=True)
+        hist = synthetic_history(seed, years)
+        if history:
+            hist.to_csv(os.path.join(directory, "history.csv"))
+        last_year = hist['Close'].iloc[-TRADING_DAYS_PER_YEAR:]
+        with open(os.path.join(directory, "info.json"), "w") as f:
+            json.dump(synthetic_info(seed, hist['Close'].iloc[-1], last_year.max(), last_year.min()), f)
+    return root
+
+
+def holdings_for(symbols: List[str]) -> Dict[str, Dict]:
+    """Holdings dict in the shape generate_portfolio_snapshot expects."""
+    rng = np.random.default_rng(7)
+    dates = pd.Timestamp("2010-01-01") + pd.to_timedelta(rng.integers(0, 5000, len(symbols)), unit='D')
+    return {
+        symbol: {
+            "avg_purchase_price": round(float(rng.uniform(20, 2000)), 2),
+            "last_purchase_price": round(float(rng.uniform(20, 2000)), 2),
+            "last_purchase_date": date.strftime('%Y-%m-%d'),
+        }
+        for symbol, date in zip(symbols, dates)
+    }
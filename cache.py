@@ -0,0 +1,84 @@
+"""In-process TTL + LRU memoization for the upstream fetch functions."""
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Union
+
+
+def _freeze(value):
+    """Turn dicts/lists into hashable tuples so they can be part of a cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def copy_result(value):
+    """Shallow-copy containers on the way out so callers can't mutate cached values."""
+    # A pandas object can only exist once pandas is loaded, so don't import it here
+    pd = sys.modules.get('pandas')
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, tuple):
+        return tuple(copy_result(v) for v in value)
+    return value
+
+
+def ttl_lru_cache(maxsize: int = 128, ttl: Union[float, Callable[[], float]] = 60):
+    """Memoize a function with a size-bounded LRU whose entries expire after ``ttl`` seconds.
+
+    ``ttl`` may be a callable, evaluated when an entry is stored, so the expiry
+    can follow market hours. Exceptions are never cached. Arguments are bound
+    to the signature with defaults applied, so ``load_history(s)``,
+    ``load_history(s, "1y")`` and ``load_history(s, period="1y")`` share an entry.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        entries = OrderedDict()
+        lock = threading.Lock()
+        stats = {'hits': 0, 'misses': 0}
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = _freeze(tuple(bound.arguments.values()))
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(key)
+                    stats['hits'] += 1
+                    return copy_result(entry[1])
+                stats['misses'] += 1
+
+            value = func(*args, **kwargs)
+            expires_at = time.monotonic() + (ttl() if callable(ttl) else ttl)
+            with lock:
+                entries[key] = (expires_at, value)
+                entries.move_to_end(key)
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return copy_result(value)
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+
+        def cache_info() -> dict:
+            with lock:
+                return {**stats, 'size': len(entries), 'maxsize': maxsize}
+
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_info = cache_info
+        return wrapper
+
+    return decorator
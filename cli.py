@@ -0,0 +1,230 @@
+"""Headless batch entry point for portfolio snapshots and stock summaries.
+
+Runs without Streamlit or Plotly, for cron and end-of-day jobs:
+
+    python cli.py snapshot                              # ledger holdings -> CSV on stdout
+    python cli.py snapshot TCS INFY --output snap.json
+    python cli.py snapshot --symbols-file nifty500.txt --output eod.parquet
+    python cli.py stock TCS RELIANCE --format json
+    python cli.py screen --universe nifty50 --refresh --top 20
+    python cli.py sectors --level industry
+
+``--format`` defaults to the output file's extension (csv, json, parquet),
+or csv on stdout. Symbols files hold one or more comma- or
+whitespace-separated symbols per line; text after '#' is ignored.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+FORMATS = ('csv', 'json', 'parquet')
+
+
+def read_symbols_file(path: str) -> List[str]:
+    """Symbols listed in a file, in order and without duplicates."""
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            symbols.extend(token for token in line.split('#', 1)[0].replace(',', ' ').split())
+    return list(dict.fromkeys(symbol.upper() for symbol in symbols))
+
+
+def write_frame(df, output: str, fmt: str):
+    """Write ``df`` to ``output`` ('-' for stdout) as csv, json (records) or parquet."""
+    if fmt == 'parquet':
+        if output == '-':
+            raise SystemExit("Parquet output needs --output FILE")
+        df.to_parquet(output, index=False)
+    elif fmt == 'json':
+        text = df.to_json(orient='records', date_format='iso', indent=2)
+        if output == '-':
+            sys.stdout.write(text + "\n")
+        else:
+            with open(output, 'w') as f:
+                f.write(text + "\n")
+    else:
+        df.to_csv(sys.stdout if output == '-' else output, index=False)
+
+
+def _resolve_format(args) -> str:
+    if args.format:
+        return args.format
+    extension = os.path.splitext(args.output)[1].lstrip('.').lower()
+    return extension if extension in FORMATS else 'csv'
+
+
+def _requested_symbols(args) -> List[str]:
+    symbols = [symbol.upper() for symbol in args.symbols]
+    if args.symbols_file:
+        symbols += read_symbols_file(args.symbols_file)
+    return list(dict.fromkeys(symbols))
+
+
+def run_snapshot(args) -> int:
+    import numpy as np
+    from ledger import get_ledger
+    from portfolio_metrics import calculate_gain_loss, add_xirr
+    from utils import generate_portfolio_snapshot
+
+    holdings = get_ledger().holdings(args.account)
+    symbols = _requested_symbols(args) or list(holdings)
+    if not symbols:
+        print(f"No symbols given and no holdings in account '{args.account}'", file=sys.stderr)
+        return 1
+
+    # Symbols without a position still get quote columns; purchase columns stay empty
+    empty = {"avg_purchase_price": np.nan, "last_purchase_price": np.nan, "last_purchase_date": None}
+    stock_data = {symbol: holdings.get(symbol, empty) for symbol in symbols}
+
+    df, summary, message = generate_portfolio_snapshot(symbols, stock_data)
+    if message != "success":
+        print(message, file=sys.stderr)
+        return 1
+
+    df = add_xirr(calculate_gain_loss(df), summary, account=args.account)
+    write_frame(df, args.output, _resolve_format(args))
+
+    portfolio_xirr = summary['Portfolio XIRR %']
+    print(f"{len(df)} symbols, total value {summary['Total Value']:,.2f}, "
+          f"change {summary['Total Change %']:.2f}%, "
+          f"portfolio XIRR {'N/A' if np.isnan(portfolio_xirr) else f'{portfolio_xirr:.2f}%'}",
+          file=sys.stderr)
+    if summary.get('Invalid Symbols'):
+        print(f"Unknown symbols: {', '.join(summary['Invalid Symbols'])}", file=sys.stderr)
+    if summary.get('Unavailable Symbols'):
+        print(f"Temporarily unavailable: {', '.join(summary['Unavailable Symbols'])}", file=sys.stderr)
+    return 0
+
+
+def run_stock(args) -> int:
+    import pandas as pd
+    from utils import MAX_FETCH_WORKERS, get_stock_data
+
+    symbols = _requested_symbols(args)
+    if not symbols:
+        print("No symbols given", file=sys.stderr)
+        return 1
+
+    with ThreadPoolExecutor(max_workers=args.workers or MAX_FETCH_WORKERS) as pool:
+        results = list(pool.map(get_stock_data, symbols))
+
+    rows, failed = [], []
+    for symbol, (hist, info, message, insights) in zip(symbols, results):
+        if message != "success":
+            failed.append(f"{symbol} ({message})")
+            continue
+        last = hist.iloc[-1]
+        rows.append({
+            'Symbol': symbol,
+            'Name': info.get('longName', symbol),
+            'Price': info.get('regularMarketPrice'),
+            'Previous Close': info.get('regularMarketPreviousClose'),
+            'P/E': info.get('trailingPE'),
+            'EPS': info.get('trailingEps'),
+            '52W High': info.get('fiftyTwoWeekHigh'),
+            '52W Low': info.get('fiftyTwoWeekLow'),
+            'MA20': last['MA20'],
+            'MA50': last['MA50'],
+            'MA200': last['MA200'],
+            'RSI': last['RSI'],
+            'Pros': " | ".join(insights['Pros']),
+            'Cons': " | ".join(insights['Cons']),
+        })
+
+    if rows:
+        write_frame(pd.DataFrame(rows), args.output, _resolve_format(args))
+    if failed:
+        print(f"Unable to fetch: {', '.join(failed)}", file=sys.stderr)
+    warnings = {insights['Warning'] for _, _, _, insights in results if insights and 'Warning' in insights}
+    for warning in warnings:
+        print(warning, file=sys.stderr)
+    return 0 if rows else 1
+
+
+def run_screen(args) -> int:
+    from screener import load_universe, refresh_universe, screen_universe
+    from utils import to_yahoo_symbol
+
+    try:
+        symbols = [to_yahoo_symbol(symbol) for symbol in _requested_symbols(args)] or load_universe(args.universe)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.refresh:
+        failed = refresh_universe(symbols)
+        print(f"Refreshed {len(symbols) - len(failed)} of {len(symbols)} symbols", file=sys.stderr)
+        if failed:
+            print(f"Unable to refresh: {', '.join(failed)}", file=sys.stderr)
+
+    df, summary, message = screen_universe(symbols, sector=args.sector, min_score=args.min_score)
+    if message != "success":
+        print(message, file=sys.stderr)
+        return 1
+
+    write_frame(df.head(args.top) if args.top else df, args.output, _resolve_format(args))
+    print(f"Screened {summary['Screened']} of {summary['Universe']} symbols, {len(df)} matched", file=sys.stderr)
+    if summary['Rules Warning']:
+        print(summary['Rules Warning'], file=sys.stderr)
+    if summary['Missing Prices']:
+        print(f"No stored prices (run with --refresh): {', '.join(summary['Missing Prices'])}", file=sys.stderr)
+    return 0
+
+
+def run_sectors(args) -> int:
+    from sector_stats import get_sector_stats
+
+    df = get_sector_stats().frame(args.level)
+    if df.empty:
+        print("No fundamentals stored yet; run 'screen --refresh' first", file=sys.stderr)
+        return 1
+    write_frame(df, args.output, _resolve_format(args))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('symbols', nargs='*', help="stock symbols, e.g. TCS INFY (case-insensitive)")
+    common.add_argument('--symbols-file', help="file of symbols to add to the list")
+    common.add_argument('--output', '-o', default='-', help="output file, or '-' for stdout (default)")
+    common.add_argument('--format', '-f', choices=FORMATS, help="output format (default: from --output extension, else csv)")
+
+    commands = parser.add_subparsers(dest='command', required=True)
+    snapshot = commands.add_parser('snapshot', parents=[common],
+                                   help="portfolio snapshot with gains and XIRR (default: ledger holdings)")
+    # Literal ledger.DEFAULT_ACCOUNT: importing ledger here would load pandas just to print --help
+    snapshot.add_argument('--account', default='default', help="ledger account whose holdings to use")
+    snapshot.set_defaults(run=run_snapshot)
+
+    stock = commands.add_parser('stock', parents=[common], help="quote, indicators and pros/cons per symbol")
+    stock.add_argument('--workers', type=int, help="parallel fetches (default: MAX_FETCH_WORKERS)")
+    stock.set_defaults(run=run_stock)
+
+    screen = commands.add_parser('screen', parents=[common],
+                                 help="rank a universe by pros minus cons from the local stores")
+    screen.add_argument('--universe', '-u', default='nifty50',
+                        help="universe name under data/universes, 'all' for every stored symbol, or a symbols file")
+    screen.add_argument('--refresh', action='store_true', help="update stored fundamentals and prices first")
+    screen.add_argument('--sector', help="only this sector")
+    screen.add_argument('--min-score', type=int, help="only symbols with at least this score")
+    screen.add_argument('--top', type=int, help="only the first N ranks")
+    screen.set_defaults(run=run_screen)
+
+    sectors = commands.add_parser('sectors', help="mean/median P/E, P/B and ROE per sector or industry")
+    sectors.add_argument('--level', choices=('sector', 'industry'), default='sector')
+    sectors.add_argument('--output', '-o', default='-', help="output file, or '-' for stdout (default)")
+    sectors.add_argument('--format', '-f', choices=FORMATS, help="output format (default: from --output extension, else csv)")
+    sectors.set_defaults(run=run_sectors)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
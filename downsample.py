@@ -0,0 +1,82 @@
+"""Server-side reduction of long price histories to a bounded number of chart points."""
+import numpy as np
+import pandas as pd
+
+# Upper bound on points sent to the browser for a single chart trace
+MAX_CHART_POINTS = 1000
+
+
+def _x_values(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(float)
+    return np.arange(len(index), dtype=float)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Positions kept by Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept; each bucket in between keeps
+    the point forming the largest triangle with the previous pick and the
+    next bucket's average, which preserves peaks and troughs of the series.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    picks = np.empty(threshold, dtype=int)
+    picks[0], picks[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        picks[bucket + 1] = previous
+    return picks
+
+
+def lttb(frame: pd.DataFrame, column: str = 'Close', max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """Rows of ``frame`` chosen by LTTB on ``column``; frames already within ``max_points`` are returned as is."""
+    values = frame[column]
+    valid = frame[values.notna()]
+    if len(valid) <= max_points:
+        return valid
+    keep = lttb_indices(_x_values(valid.index), valid[column].to_numpy(dtype=float), max_points)
+    return valid.iloc[keep]
+
+
+def ohlc_buckets(hist: pd.DataFrame, max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """Merge consecutive bars into at most ``max_points`` candles.
+
+    Each candle takes the first Open, highest High, lowest Low and last Close
+    of its bars, summed Volume, and is stamped with its first bar's date.
+    Any other column (moving averages, RSI) keeps its value at the last bar.
+    """
+    n = len(hist)
+    if n <= max_points:
+        return hist
+
+    size = -(-n // max_points)
+    starts = np.arange(0, n, size)
+    ends = np.minimum(starts + size, n) - 1
+
+    result = {}
+    for column in hist.columns:
+        values = hist[column].to_numpy()
+        if column == 'Open':
+            result[column] = values[starts]
+        elif column == 'High':
+            result[column] = np.fmax.reduceat(values.astype(float), starts)
+        elif column == 'Low':
+            result[column] = np.fmin.reduceat(values.astype(float), starts)
+        elif column in ('Volume', 'Dividends'):
+            result[column] = np.add.reduceat(np.nan_to_num(values.astype(float)), starts)
+        else:
+            result[column] = values[ends]
+    return pd.DataFrame(result, index=hist.index[starts])
@@ -0,0 +1,145 @@
+"""Persistent store of per-symbol fundamentals (P/E, EPS, ROE, dividend yield, ...).
+
+Fundamentals change with quarterly results, not with every tick, so they are
+kept in SQLite next to the bar store and refreshed from the full quote
+payload only once they are older than ``FUNDAMENTALS_TTL_SECONDS``. The
+table also backs cross-sectional views over every symbol seen so far.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
+
+from history_store import CACHE_DIR
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FUNDAMENTALS_TTL_SECONDS = 24 * 3600
+
+# Ticker.info key -> SQLite column
+TEXT_FIELDS = {
+    'longName': 'name',
+    'sector': 'sector',
+    'industry': 'industry',
+}
+NUMERIC_FIELDS = {
+    'trailingPE': 'trailing_pe',
+    'trailingEps': 'trailing_eps',
+    'priceToBook': 'price_to_book',
+    'returnOnEquity': 'return_on_equity',
+    'dividendYield': 'dividend_yield',
+    'earningsGrowth': 'earnings_growth',
+    'debtToEquity': 'debt_to_equity',
+    # Market cap is derived from this and the live price; volume comes with the quote
+    'sharesOutstanding': 'shares_outstanding',
+}
+FUNDAMENTAL_FIELDS = {**TEXT_FIELDS, **NUMERIC_FIELDS}
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS fundamentals (
+    symbol TEXT PRIMARY KEY,
+    {', '.join(f'{column} TEXT' for column in TEXT_FIELDS.values())},
+    {', '.join(f'{column} REAL' for column in NUMERIC_FIELDS.values())},
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fundamentals_fetched_at ON fundamentals (fetched_at);
+"""
+
+
+def extract_fundamentals(info: dict) -> Dict:
+    """The fundamentals subset of a ``Ticker.info`` payload; missing or non-numeric values become None."""
+    fields = {key: info.get(key) for key in TEXT_FIELDS}
+    for key in NUMERIC_FIELDS:
+        value = info.get(key)
+        fields[key] = float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+    return fields
+
+
+class FundamentalsStore:
+    """Latest fundamentals per symbol with the time they were fetched."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(CACHE_DIR, "fundamentals.sqlite3")
+        # Called as listener(symbol, fields) after every put, e.g. to keep sector aggregates current
+        self._listeners: List[Callable[[str, Dict], None]] = []
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+            # Stores created before a field was added get its column; old rows read None until refreshed
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(fundamentals)")}
+            for column in NUMERIC_FIELDS.values():
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE fundamentals ADD COLUMN {column} REAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Same as HistoryStore: one connection per call, WAL for concurrent readers
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Stored fundamentals keyed like ``Ticker.info``, plus 'fetched_at'; None if never stored."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(FUNDAMENTAL_FIELDS.values())}, fetched_at FROM fundamentals WHERE symbol = ?",
+                (symbol,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {**dict(zip(FUNDAMENTAL_FIELDS, row[:-1])), 'fetched_at': row[-1]}
+
+    def put(self, symbol: str, info: dict) -> Dict:
+        """Store the fundamentals in a ``Ticker.info`` payload and return them."""
+        fields = extract_fundamentals(info)
+        columns = ['symbol', *FUNDAMENTAL_FIELDS.values(), 'fetched_at']
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO fundamentals ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                (symbol, *fields.values(), time.time())
+            )
+        for listener in self._listeners:
+            listener(symbol, fields)
+        return fields
+
+    def subscribe(self, listener: Callable[[str, Dict], None]):
+        """Call ``listener(symbol, fields)`` after each ``put`` in this process."""
+        self._listeners.append(listener)
+
+    def changed_since(self, since: float) -> List[Dict]:
+        """Rows fetched at or after ``since`` (epoch seconds), keyed like ``get`` plus 'symbol'."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT symbol, {', '.join(FUNDAMENTAL_FIELDS.values())}, fetched_at FROM fundamentals "
+                "WHERE fetched_at >= ? ORDER BY fetched_at",
+                (since,)
+            ).fetchall()
+        return [{'symbol': row[0], **dict(zip(FUNDAMENTAL_FIELDS, row[1:-1])), 'fetched_at': row[-1]} for row in rows]
+
+    def frame(self, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """All stored rows (or those for ``symbols``) as a frame with a Symbol column and ``Ticker.info`` keys."""
+        import pandas as pd
+
+        query = f"SELECT symbol, {', '.join(FUNDAMENTAL_FIELDS.values())}, fetched_at FROM fundamentals"
+        params = []
+        if symbols is not None:
+            params = list(dict.fromkeys(symbols))
+            query += f" WHERE symbol IN ({', '.join('?' * len(params))})" if params else " WHERE 0"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        df = pd.DataFrame(rows, columns=['Symbol', *FUNDAMENTAL_FIELDS, 'fetched_at'])
+        return df.astype({key: float for key in NUMERIC_FIELDS})
+
+
+_store: Optional[FundamentalsStore] = None
+
+
+def get_fundamentals_store() -> FundamentalsStore:
+    """Return the process-wide fundamentals store, creating it on first use."""
+    global _store
+    if _store is None:
+        _store = FundamentalsStore()
+    return _store
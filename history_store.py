@@ -0,0 +1,178 @@
+"""Persistent on-disk store of daily OHLCV bars, keyed by symbol and date."""
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+CACHE_DIR = os.environ.get("STOCKINSIGHT_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+# yfinance history column -> SQLite column
+BAR_COLUMNS = {
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Volume': 'volume',
+    'Dividends': 'dividends',
+    'Stock Splits': 'stock_splits',
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL,
+    volume REAL, dividends REAL, stock_splits REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol TEXT PRIMARY KEY,
+    start TEXT NOT NULL,
+    tz TEXT,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class HistoryStore:
+    """Daily bars for every symbol ever fetched, plus how far back each is complete.
+
+    ``coverage.start`` is the earliest date for which the stored bars are known
+    to be complete, so a later request for a shorter period never re-downloads
+    and a request reaching further back triggers one backfill.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(CACHE_DIR, "history.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One short-lived connection per call keeps the store safe to use from
+        # the fetch thread pool; WAL lets readers proceed during a write.
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def coverage(self, symbol: str) -> Optional[Dict]:
+        """Return {'start', 'end', 'tz', 'fetched_at'} for a symbol, or None if never stored."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT c.start, c.tz, c.fetched_at, MAX(b.date) FROM coverage c "
+                "LEFT JOIN bars b ON b.symbol = c.symbol WHERE c.symbol = ?",
+                (symbol,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return {'start': row[0], 'tz': row[1], 'fetched_at': row[2], 'end': row[3]}
+
+    def load(self, symbol: str, start: Optional[str] = None) -> pd.DataFrame:
+        """Load stored bars on or after ``start`` (ISO date) as a yfinance-shaped frame."""
+        import pandas as pd
+
+        columns = ", ".join(BAR_COLUMNS.values())
+        query = f"SELECT date, {columns} FROM bars WHERE symbol = ?"
+        params = [symbol]
+        if start:
+            query += " AND date >= ?"
+            params.append(start)
+        query += " ORDER BY date"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+            tz_row = conn.execute("SELECT tz FROM coverage WHERE symbol = ?", (symbol,)).fetchone()
+
+        df = pd.DataFrame(rows, columns=['Date'] + list(BAR_COLUMNS))
+        index = pd.DatetimeIndex(pd.to_datetime(df.pop('Date')), name='Date')
+        if tz_row and tz_row[0]:
+            index = index.tz_localize(tz_row[0])
+        df.index = index
+        return df.astype(float)
+
+    def tail(self, symbol: str, count: int) -> pd.DataFrame:
+        """The last ``count`` stored bars of a symbol, oldest first, shaped like ``load``."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT MIN(date) FROM (SELECT date FROM bars WHERE symbol = ? ORDER BY date DESC LIMIT ?)",
+                (symbol, count)
+            ).fetchone()
+        return self.load(symbol, row[0] if row and row[0] else '9999-12-31')
+
+    def closes(self, symbols: Iterable[str], days: int = 365) -> pd.DataFrame:
+        """Closes of ``symbols`` over the ``days`` calendar days up to the latest stored bar among them.
+
+        One query for the whole set, returned as a dates x symbols frame
+        (naive dates, NaN where a symbol has no bar); symbols with no stored
+        bars are left out.
+        """
+        import pandas as pd
+
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return pd.DataFrame(dtype=float)
+        placeholders = ", ".join("?" * len(symbols))
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT symbol, date, close FROM bars WHERE symbol IN ({placeholders}) AND date >= "
+                f"date((SELECT MAX(date) FROM bars WHERE symbol IN ({placeholders})), ?)",
+                (*symbols, *symbols, f"-{days} days")
+            ).fetchall()
+
+        df = pd.DataFrame(rows, columns=['Symbol', 'Date', 'Close'])
+        frame = df.pivot(index='Date', columns='Symbol', values='Close').astype(float)
+        frame.index = pd.DatetimeIndex(pd.to_datetime(frame.index), name='Date')
+        return frame.reindex(columns=[symbol for symbol in symbols if symbol in frame.columns])
+
+    def save(self, symbol: str, hist: pd.DataFrame, start: Optional[str] = None):
+        """Upsert bars from a yfinance history frame and stamp the fetch time.
+
+        Pass ``start`` when the frame is a complete download from that date, to
+        extend the symbol's coverage; delta refreshes leave coverage unchanged.
+        """
+        import pandas as pd
+
+        tz = str(hist.index.tz) if getattr(hist.index, 'tz', None) is not None else None
+        frame = hist.reindex(columns=list(BAR_COLUMNS))
+        records = [
+            (symbol, ts.strftime('%Y-%m-%d'), *[None if pd.isna(v) else float(v) for v in values])
+            for ts, values in zip(frame.index, frame.itertuples(index=False, name=None))
+        ]
+
+        with closing(self._connect()) as conn, conn:
+            placeholders = ", ".join("?" * (len(BAR_COLUMNS) + 2))
+            conn.executemany(
+                f"INSERT OR REPLACE INTO bars (symbol, date, {', '.join(BAR_COLUMNS.values())}) "
+                f"VALUES ({placeholders})",
+                records
+            )
+            existing = conn.execute("SELECT start, tz FROM coverage WHERE symbol = ?", (symbol,)).fetchone()
+            if existing is None:
+                conn.execute(
+                    "INSERT INTO coverage (symbol, start, tz, fetched_at) VALUES (?, ?, ?, ?)",
+                    (symbol, start or (records[0][1] if records else '9999-12-31'), tz, time.time())
+                )
+            else:
+                new_start = min(existing[0], start) if start else existing[0]
+                conn.execute(
+                    "UPDATE coverage SET start = ?, tz = COALESCE(?, tz), fetched_at = ? WHERE symbol = ?",
+                    (new_start, tz, time.time(), symbol)
+                )
+
+
+_store: Optional[HistoryStore] = None
+
+
+def get_history_store() -> HistoryStore:
+    """Return the process-wide history store, creating it on first use."""
+    global _store
+    if _store is None:
+        _store = HistoryStore()
+    return _store
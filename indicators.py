@@ -0,0 +1,266 @@
+"""Technical indicators: batch functions plus an incremental engine for live updates."""
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MA_WINDOWS = (20, 50, 200)
+RSI_PERIOD = 14
+INDICATOR_COLUMNS = [f'MA{window}' for window in MA_WINDOWS] + ['RSI']
+
+
+def calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
+    """Calculate Relative Strength Index (RSI) for a given series."""
+    delta = series.diff(1)
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+
+    rs = gain / loss
+    rsi = 100 - (100 / (1 + rs))
+    return rsi
+
+
+def add_indicators(hist: pd.DataFrame) -> pd.DataFrame:
+    """Add MA20/MA50/MA200 and RSI columns to a history frame in place."""
+    for window in MA_WINDOWS:
+        hist[f'MA{window}'] = hist['Close'].rolling(window=window).mean()
+    hist['RSI'] = calculate_rsi(hist['Close'], RSI_PERIOD)
+    return hist
+
+
+class _RollingSum:
+    """Running sum over the last ``window`` values, exact zero when the window holds only zeros."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.nonzero = 0
+
+    def push(self, value: float) -> Optional[float]:
+        """Add a value and return the one that fell out of the window, if any."""
+        self.values.append(value)
+        self.total += value
+        self.nonzero += value != 0
+        if len(self.values) <= self.window:
+            return None
+        dropped = self.values.popleft()
+        self.total -= dropped
+        self.nonzero -= dropped != 0
+        return dropped
+
+    def undo(self, dropped: Optional[float]):
+        """Reverse the most recent push, given what it dropped."""
+        value = self.values.pop()
+        self.total -= value
+        self.nonzero -= value != 0
+        if dropped is not None:
+            self.values.appendleft(dropped)
+            self.total += dropped
+            self.nonzero += dropped != 0
+
+    def mean(self) -> float:
+        if len(self.values) < self.window:
+            return math.nan
+        return (self.total if self.nonzero else 0.0) / self.window
+
+
+class IncrementalIndicators:
+    """MA and RSI state that advances in O(1) per bar or intraday tick.
+
+    Produces the same values as ``add_indicators`` on the full series: moving
+    averages need ``window`` closes, and RSI follows ``calculate_rsi`` (the
+    first bar counts as a zero gain and loss).
+    """
+
+    def __init__(self, ma_windows: Tuple[int, ...] = MA_WINDOWS, rsi_period: int = RSI_PERIOD):
+        self._mas = {window: _RollingSum(window) for window in ma_windows}
+        self._gains = _RollingSum(rsi_period)
+        self._losses = _RollingSum(rsi_period)
+        self._prev_close: Optional[float] = None
+        self._undo = None
+
+    @classmethod
+    def from_closes(cls, closes, **kwargs) -> 'IncrementalIndicators':
+        """Build an engine primed with a sequence of closes."""
+        engine = cls(**kwargs)
+        for close in closes:
+            engine.update(close)
+        return engine
+
+    def update(self, close: float) -> Dict[str, float]:
+        """Advance by one new bar and return the indicator values at that bar."""
+        close = float(close)
+        delta = close - self._prev_close if self._prev_close is not None else 0.0
+        self._undo = (
+            self._prev_close,
+            {window: ma.push(close) for window, ma in self._mas.items()},
+            self._gains.push(max(delta, 0.0)),
+            self._losses.push(max(-delta, 0.0)),
+        )
+        self._prev_close = close
+        return self.values()
+
+    def revise(self, close: float) -> Dict[str, float]:
+        """Replace the latest bar's close, e.g. with a newer intraday price."""
+        if self._undo is None:
+            return self.update(close)
+        prev_close, dropped_mas, dropped_gain, dropped_loss = self._undo
+        for window, ma in self._mas.items():
+            ma.undo(dropped_mas[window])
+        self._gains.undo(dropped_gain)
+        self._losses.undo(dropped_loss)
+        self._prev_close = prev_close
+        return self.update(close)
+
+    def values(self) -> Dict[str, float]:
+        """Current MA and RSI values, NaN where not enough bars have been seen."""
+        result = {f'MA{window}': ma.mean() for window, ma in self._mas.items()}
+        gain, loss = self._gains.mean(), self._losses.mean()
+        if math.isnan(gain) or (gain == 0 and loss == 0):
+            result['RSI'] = math.nan
+        elif loss == 0:
+            result['RSI'] = 100.0
+        else:
+            result['RSI'] = 100 - (100 / (1 + gain / loss))
+        return result
+
+
+class IndicatorCache:
+    """Per-series indicator state so repeated refreshes only process new bars.
+
+    A refresh that only appends bars, or updates the latest one, advances the
+    stored engine; anything else (a new series, a shifted start date, or
+    earlier closes that changed because a dividend or split re-adjusted the
+    download) falls back to ``add_indicators`` over the whole frame.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[object, Tuple[IncrementalIndicators, pd.DataFrame, np.ndarray]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _extends(computed: pd.DataFrame, closes: np.ndarray, hist: pd.DataFrame) -> bool:
+        """Whether ``hist`` is the cached series with only its last bar revised and/or bars appended."""
+        if computed.index[0] != hist.index[0] or computed.index[-1] not in hist.index:
+            return False
+        settled = len(computed) - 1
+        return (hist.index[:settled].equals(computed.index[:settled])
+                and np.array_equal(hist['Close'].to_numpy(dtype=float)[:settled], closes[:settled], equal_nan=True))
+
+    def apply(self, key, hist: pd.DataFrame) -> pd.DataFrame:
+        """Add indicator columns to ``hist`` in place, reusing state stored under ``key``."""
+        if hist.empty:
+            return add_indicators(hist)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not self._extends(entry[1], entry[2], hist):
+                add_indicators(hist)
+                engine = IncrementalIndicators.from_closes(hist['Close'].iloc[-max(MA_WINDOWS) - 1:])
+                computed = hist[INDICATOR_COLUMNS].copy()
+            else:
+                engine, computed, closes = entry
+                last = computed.index[-1]
+                rows = {}
+                # Only the last known bar and anything after it can have changed
+                if hist.at[last, 'Close'] != closes[-1]:
+                    rows[last] = engine.revise(hist.at[last, 'Close'])
+                for ts, close in hist.loc[hist.index > last, 'Close'].items():
+                    rows[ts] = engine.update(close)
+                if rows:
+                    update = pd.DataFrame.from_dict(rows, orient='index')
+                    computed = pd.concat([computed.drop(index=list(rows), errors='ignore'), update])
+                for column in INDICATOR_COLUMNS:
+                    hist[column] = computed[column].reindex(hist.index)
+
+            self._entries[key] = (engine, computed, hist['Close'].to_numpy(dtype=float).copy())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return hist
+
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def close_matrix(histories: Dict[str, pd.DataFrame]) -> Tuple[List[str], pd.DatetimeIndex, np.ndarray]:
+    """Align each symbol's Close column into a symbols x dates matrix, NaN where a symbol has no bar."""
+    frame = pd.concat({symbol: hist['Close'] for symbol, hist in histories.items()}, axis=1).sort_index()
+    return list(frame.columns), frame.index, frame.to_numpy(dtype=float).T
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of each trailing ``window`` along axis 1; NaN until a full window exists or where it holds NaN."""
+    symbols, dates = values.shape
+    out = np.full((symbols, dates), np.nan)
+    if dates < window:
+        return out
+    isnan = np.isnan(values)
+    zero_pad = np.zeros((symbols, 1))
+    sums = np.concatenate([zero_pad, np.cumsum(np.where(isnan, 0.0, values), axis=1)], axis=1)
+    nans = np.concatenate([zero_pad, np.cumsum(isnan, axis=1)], axis=1)
+    nonzero = np.concatenate([zero_pad, np.cumsum(values != 0, axis=1)], axis=1)
+
+    window_sums = sums[:, window:] - sums[:, :-window]
+    # Windows of exact zeros stay exactly zero rather than cumsum round-off
+    window_sums[(nonzero[:, window:] - nonzero[:, :-window]) == 0] = 0.0
+    window_sums[(nans[:, window:] - nans[:, :-window]) > 0] = np.nan
+    out[:, window - 1:] = window_sums
+    return out
+
+
+def _window_extreme(values: np.ndarray, window: int, ufunc: np.ufunc) -> np.ndarray:
+    """Trailing max/min over up to ``window`` bars along axis 1 (van Herk/Gil-Werman, NaN-skipping)."""
+    symbols, dates = values.shape
+    padded_len = -(-(dates + window - 1) // window) * window
+    padded = np.full((symbols, padded_len), np.nan)
+    padded[:, window - 1:window - 1 + dates] = values
+    blocks = padded.reshape(symbols, -1, window)
+    prefix = ufunc.accumulate(blocks, axis=2).reshape(symbols, -1)
+    suffix = ufunc.accumulate(blocks[:, :, ::-1], axis=2)[:, :, ::-1].reshape(symbols, -1)
+    # Window ending at padded position j starts at j - window + 1
+    ends = np.arange(window - 1, window - 1 + dates)
+    with np.errstate(invalid='ignore'):
+        return ufunc(suffix[:, ends - window + 1], prefix[:, ends])
+
+
+def indicator_panel(closes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Compute MA20/50/200, RSI and 52-week high/low for every row of a symbols x dates close matrix.
+
+    Each output has the same shape as ``closes``. MAs and RSI match
+    ``add_indicators`` applied to each row; the 52-week range is the trailing
+    high/low close over the last 252 bars available.
+    """
+    closes = np.asarray(closes, dtype=float)
+    panel = {f'MA{window}': _window_sums(closes, window) / window for window in MA_WINDOWS}
+
+    # Same convention as calculate_rsi: NaN deltas (first bar, gaps) count as zero
+    delta = np.diff(closes, axis=1, prepend=np.nan)
+    with np.errstate(invalid='ignore'):
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = _window_sums(gain, RSI_PERIOD) / RSI_PERIOD
+    avg_loss = _window_sums(loss, RSI_PERIOD) / RSI_PERIOD
+    with np.errstate(divide='ignore', invalid='ignore'):
+        panel['RSI'] = 100 - (100 / (1 + avg_gain / avg_loss))
+
+    panel['52W High'] = _window_extreme(closes, TRADING_DAYS_PER_YEAR, np.fmax)
+    panel['52W Low'] = _window_extreme(closes, TRADING_DAYS_PER_YEAR, np.fmin)
+    return panel
+
+
+def latest_indicators(symbols: List[str], closes: np.ndarray) -> pd.DataFrame:
+    """Indicator values at the last date of the matrix, one row per symbol."""
+    panel = indicator_panel(closes)
+    # Use each symbol's last available close, which may predate the matrix's last column
+    has_close = ~np.isnan(closes)
+    last = np.where(has_close.any(axis=1), closes.shape[1] - 1 - np.argmax(has_close[:, ::-1], axis=1), -1)
+    rows = np.arange(len(symbols))
+    data = {'Close': np.where(last >= 0, closes[rows, last], np.nan)}
+    data.update({name: np.where(last >= 0, values[rows, last], np.nan) for name, values in panel.items()})
+    return pd.DataFrame(data, index=pd.Index(symbols, name='Symbol'))
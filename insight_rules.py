@@ -0,0 +1,193 @@
+"""Declarative pros & cons rules, compiled to vectorized masks.
+
+The rules live in ``data/insight_rules.json``; each one names its kind
+('pro' or 'con'), a condition and a message:
+
+    {"id": "low_pe", "kind": "pro", "message": "Low P/E ratio ({pe:.2f}), undervalued.",
+     "when": {"all": [{"field": "pe", "op": "truthy"}, {"field": "pe", "op": "<", "value": 20}]}}
+
+A condition is a clause ``{"field", "op", "value"}`` or ``{"field", "op",
+"ref", "factor"}`` (compare with another field, optionally scaled), or a
+combination ``{"all": [...]}``, ``{"any": [...]}`` or ``{"not": ...}``.
+Comparisons with a missing value are false, as in plain Python ``if`` chains
+over None. Messages are ``str.format`` templates over the row's fields and
+are only rendered for the rows a rule matches.
+
+A rule set evaluates every rule over a frame of fields (one row per symbol)
+in one pass, so a universe costs a few numpy operations per rule rather
+than a Python loop per symbol. ``get_insight_rules`` reloads the file when it
+changes, so threshold and message edits need no code change or restart; an
+invalid edit keeps the previous rules and comes back as a warning.
+"""
+from __future__ import annotations
+
+import json
+import operator
+import os
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "insight_rules.json")
+KINDS = ('pro', 'con')
+
+COMPARATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+# Ops that take no value
+UNARY_OPS = ('truthy', 'present')
+
+
+def _truthy(values: np.ndarray) -> np.ndarray:
+    """Python truthiness per element, with missing values (None/NaN) false."""
+    import numpy as np
+    import pandas as pd
+
+    present = pd.notna(values)
+    if values.dtype.kind in 'fiub':
+        return present & (values != 0)
+    return present & np.array([bool(value) for value in values], dtype=bool)
+
+
+def _compile(condition: Dict, where: str) -> Tuple[Callable[[Dict[str, np.ndarray]], np.ndarray], set]:
+    """Compile a condition into a function of {field: column} and the set of fields it reads."""
+    import numpy as np
+    import pandas as pd
+
+    if not isinstance(condition, dict):
+        raise ValueError(f"{where}: condition must be an object, got {condition!r}")
+    if 'all' in condition or 'any' in condition:
+        combine = np.logical_and if 'all' in condition else np.logical_or
+        parts = [_compile(part, where) for part in condition.get('all', condition.get('any'))]
+        if not parts:
+            raise ValueError(f"{where}: empty 'all'/'any'")
+        functions = [function for function, _ in parts]
+        fields = set().union(*(used for _, used in parts))
+        return (lambda columns: combine.reduce([function(columns) for function in functions])), fields
+    if 'not' in condition:
+        function, fields = _compile(condition['not'], where)
+        return (lambda columns: ~function(columns)), fields
+
+    field, op = condition.get('field'), condition.get('op')
+    if not field:
+        raise ValueError(f"{where}: clause without a 'field': {condition!r}")
+    if op == 'truthy':
+        return (lambda columns: _truthy(columns[field])), {field}
+    if op == 'present':
+        return (lambda columns: pd.notna(columns[field])), {field}
+    if op == 'in':
+        choices = list(condition['value'])
+        return (lambda columns: np.isin(columns[field], choices)), {field}
+    if op not in COMPARATORS:
+        raise ValueError(f"{where}: unknown op {op!r}; use one of {', '.join([*COMPARATORS, *UNARY_OPS, 'in'])}")
+
+    compare = COMPARATORS[op]
+    if 'ref' in condition:
+        ref, factor = condition['ref'], condition.get('factor', 1)
+
+        def clause(columns):
+            other = columns[ref] if factor == 1 else columns[ref] * factor
+            with np.errstate(invalid='ignore'):
+                return np.asarray(compare(columns[field], other), dtype=bool)
+        return clause, {field, ref}
+
+    if 'value' not in condition:
+        raise ValueError(f"{where}: clause needs a 'value' or a 'ref': {condition!r}")
+    value = condition['value']
+
+    def clause(columns):
+        with np.errstate(invalid='ignore'):
+            return np.asarray(compare(columns[field], value), dtype=bool)
+    return clause, {field}
+
+
+class InsightRules:
+    """A compiled list of rules, in the order their messages are listed."""
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = []
+        self.fields = set()
+        for number, rule in enumerate(rules, start=1):
+            where = f"rule {number} ({rule.get('id', 'unnamed')})"
+            if rule.get('kind') not in KINDS:
+                raise ValueError(f"{where}: 'kind' must be 'pro' or 'con'")
+            if not isinstance(rule.get('message'), str):
+                raise ValueError(f"{where}: 'message' must be a string")
+            function, fields = _compile(rule.get('when'), where)
+            self.rules.append((rule['kind'], rule['message'], function))
+            self.fields |= fields
+
+    def masks(self, data: pd.DataFrame) -> np.ndarray:
+        """Rules x rows boolean matrix: which rules hold for each row of ``data``."""
+        import numpy as np
+
+        missing = self.fields - set(data.columns)
+        if missing:
+            raise KeyError(f"Insight rules need the missing fields: {', '.join(sorted(missing))}")
+        columns = {field: data[field].to_numpy() for field in self.fields}
+        if not self.rules:
+            return np.zeros((0, len(data)), dtype=bool)
+        return np.vstack([function(columns) for _, _, function in self.rules])
+
+    def counts(self, data: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Number of pros and of cons per row."""
+        masks = self.masks(data)
+        kinds = [kind for kind, _, _ in self.rules]
+        pros = masks[[kind == 'pro' for kind in kinds]].sum(axis=0)
+        cons = masks[[kind == 'con' for kind in kinds]].sum(axis=0)
+        return pros, cons
+
+    def insights(self, data: pd.DataFrame) -> List[Dict[str, List[str]]]:
+        """{'Pros': [...], 'Cons': [...]} messages per row of ``data``."""
+        masks = self.masks(data)
+        results = []
+        for row_number, row in enumerate(data.to_dict('records')):
+            result = {'Pros': [], 'Cons': []}
+            for (kind, message, _), matched in zip(self.rules, masks[:, row_number]):
+                if matched:
+                    result['Pros' if kind == 'pro' else 'Cons'].append(message.format(**row))
+            results.append(result)
+        return results
+
+
+def load_rules(path: str = RULES_PATH) -> InsightRules:
+    """Read and compile a rules file; raises ValueError describing the first invalid rule."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    return InsightRules(config['rules'])
+
+
+_rules: Optional[InsightRules] = None
+_rules_mtime: Optional[float] = None
+_rules_warning: Optional[str] = None
+_rules_lock = threading.Lock()
+
+
+def get_insight_rules() -> Tuple[InsightRules, Optional[str]]:
+    """Return (rules, warning) from ``RULES_PATH``, recompiled whenever the file changes.
+
+    While the file is invalid the previous rules are served and ``warning``
+    says why; otherwise it is None.
+    """
+    global _rules, _rules_mtime, _rules_warning
+    mtime = os.path.getmtime(RULES_PATH)
+    with _rules_lock:
+        if _rules is None or mtime != _rules_mtime:
+            try:
+                _rules = load_rules(RULES_PATH)
+                _rules_warning = None
+            except (ValueError, KeyError) as e:
+                if _rules is None:
+                    raise
+                # Keep serving the last good rules while the file is being fixed
+                _rules_warning = f"Invalid insight rules in {RULES_PATH}, showing the previous ones: {e}"
+            _rules_mtime = mtime
+        return _rules, _rules_warning
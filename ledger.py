@@ -0,0 +1,307 @@
+"""Persistent ledger of buy/sell transactions with incrementally maintained positions.
+
+Transactions are indexed by (account, symbol, date) and by (symbol, date).
+Each (account, symbol) has a row in ``positions`` holding its open quantity,
+average-cost basis, last buy and realized P&L. Appending a trade updates that
+one row in O(1). A backdated trade (dated before the position's latest trade)
+replays only that position's own transactions, because average cost depends
+on trade order.
+"""
+import os
+import sqlite3
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from history_store import CACHE_DIR
+
+DEFAULT_ACCOUNT = 'default'
+SIDES = ('BUY', 'SELL')
+# Quantities below this are treated as a closed position
+QUANTITY_EPSILON = 1e-9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    account TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    side TEXT NOT NULL CHECK (side IN ('BUY', 'SELL')),
+    quantity REAL NOT NULL CHECK (quantity > 0),
+    price REAL NOT NULL CHECK (price >= 0),
+    fees REAL NOT NULL DEFAULT 0,
+    seeded INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS transactions_account_symbol_date ON transactions (account, symbol, date);
+CREATE INDEX IF NOT EXISTS transactions_symbol_date ON transactions (symbol, date);
+CREATE TABLE IF NOT EXISTS positions (
+    account TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    quantity REAL NOT NULL,
+    cost REAL NOT NULL,
+    realized_pnl REAL NOT NULL,
+    first_buy_date TEXT,
+    last_buy_date TEXT,
+    last_buy_price REAL,
+    last_trade_date TEXT NOT NULL,
+    trades INTEGER NOT NULL,
+    PRIMARY KEY (account, symbol)
+) WITHOUT ROWID;
+"""
+
+_POSITION_FIELDS = ('quantity', 'cost', 'realized_pnl', 'first_buy_date', 'last_buy_date',
+                    'last_buy_price', 'last_trade_date', 'trades')
+
+# positions column -> DataFrame column
+POSITION_COLUMNS = {
+    'account': 'Account',
+    'symbol': 'Symbol',
+    'quantity': 'Quantity',
+    'average_cost': 'Average Cost',
+    'cost': 'Invested',
+    'last_buy_price': 'Last Buy',
+    'last_buy_date': 'Last Buy Date',
+    'first_buy_date': 'First Buy Date',
+    'realized_pnl': 'Realized P&L',
+    'trades': 'Trades',
+}
+
+
+def _empty_position() -> Dict:
+    return {'quantity': 0.0, 'cost': 0.0, 'realized_pnl': 0.0, 'first_buy_date': None,
+            'last_buy_date': None, 'last_buy_price': None, 'last_trade_date': '', 'trades': 0}
+
+
+def _apply(position: Dict, date: str, side: str, quantity: float, price: float, fees: float) -> Dict:
+    """Advance a position by one trade using the average-cost method."""
+    if side == 'BUY':
+        position['quantity'] += quantity
+        position['cost'] += quantity * price + fees
+        if position['first_buy_date'] is None or date < position['first_buy_date']:
+            position['first_buy_date'] = date
+        # Ties go to the later insert, so same-day lots keep entry order
+        if position['last_buy_date'] is None or date >= position['last_buy_date']:
+            position['last_buy_date'] = date
+            position['last_buy_price'] = price
+    else:
+        if quantity > position['quantity'] + QUANTITY_EPSILON:
+            raise ValueError(f"Cannot sell {quantity:g}; only {position['quantity']:g} held on {date}")
+        average = position['cost'] / position['quantity']
+        position['realized_pnl'] += quantity * (price - average) - fees
+        position['quantity'] -= quantity
+        position['cost'] -= quantity * average
+        if position['quantity'] < QUANTITY_EPSILON:
+            position['quantity'], position['cost'] = 0.0, 0.0
+    position['last_trade_date'] = max(position['last_trade_date'], date)
+    position['trades'] += 1
+    return position
+
+
+class Ledger:
+    """Buy/sell transactions for any number of accounts, plus their current positions."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(CACHE_DIR, "ledger.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(_SCHEMA)
+            # Ledgers created before seeded trades were marked get the column, unmarked
+            if 'seeded' not in {row[1] for row in conn.execute("PRAGMA table_info(transactions)")}:
+                conn.execute("ALTER TABLE transactions ADD COLUMN seeded INTEGER NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Same pattern as HistoryStore: short-lived connections, WAL for concurrent readers
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _normalize(account: str, symbol: str, side: str, quantity: float, price: float,
+                   date, fees: float) -> tuple:
+        side = side.upper()
+        if side not in SIDES:
+            raise ValueError(f"Unknown side: {side}")
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+        if price < 0 or fees < 0:
+            raise ValueError("Price and fees cannot be negative")
+        return (account, symbol.strip().upper(), pd.Timestamp(date).strftime('%Y-%m-%d'),
+                side, float(quantity), float(price), float(fees))
+
+    @staticmethod
+    def _load_position(conn, account: str, symbol: str) -> Optional[Dict]:
+        row = conn.execute(
+            f"SELECT {', '.join(_POSITION_FIELDS)} FROM positions WHERE account = ? AND symbol = ?",
+            (account, symbol)
+        ).fetchone()
+        return dict(zip(_POSITION_FIELDS, row)) if row else None
+
+    @staticmethod
+    def _store_position(conn, account: str, symbol: str, position: Dict):
+        conn.execute(
+            f"INSERT OR REPLACE INTO positions (account, symbol, {', '.join(_POSITION_FIELDS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(_POSITION_FIELDS))})",
+            (account, symbol, *[position[field] for field in _POSITION_FIELDS])
+        )
+
+    @staticmethod
+    def _replay(conn, account: str, symbol: str) -> Dict:
+        """Rebuild one position from its own transactions, in date then entry order."""
+        position = _empty_position()
+        rows = conn.execute(
+            "SELECT date, side, quantity, price, fees FROM transactions "
+            "WHERE account = ? AND symbol = ? ORDER BY date, id",
+            (account, symbol)
+        ).fetchall()
+        for row in rows:
+            _apply(position, *row)
+        return position
+
+    def add_trade(self, account: str, symbol: str, side: str, quantity: float, price: float,
+                  date, fees: float = 0.0) -> int:
+        """Record a trade and update its position; returns the transaction id.
+
+        Raises ValueError for invalid input or a sell larger than the holding,
+        in which case nothing is written.
+        """
+        record = self._normalize(account, symbol, side, quantity, price, date, fees)
+        account, symbol, date = record[0], record[1], record[2]
+
+        with closing(self._connect()) as conn, conn:
+            # Take the write lock before reading the position, so concurrent trades can't both apply to the same row
+            conn.execute("BEGIN IMMEDIATE")
+            position = self._load_position(conn, account, symbol)
+            cursor = conn.execute(
+                "INSERT INTO transactions (account, symbol, date, side, quantity, price, fees) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                record
+            )
+            if position is None or date >= position['last_trade_date']:
+                position = _apply(position or _empty_position(), *record[2:])
+            else:
+                position = self._replay(conn, account, symbol)
+            self._store_position(conn, account, symbol, position)
+            return cursor.lastrowid
+
+    def add_trades(self, trades: Iterable[Dict]) -> int:
+        """Record many trades (dicts with add_trade's arguments) in one transaction.
+
+        A trade may also set 'seeded' to mark it as reconstructed rather than
+        real. Only the positions the batch touches are rebuilt. Returns the
+        number of trades written; an invalid trade rolls back the whole batch.
+        """
+        records = [
+            (*self._normalize(trade.get('account', DEFAULT_ACCOUNT), trade['symbol'], trade['side'],
+                              trade['quantity'], trade['price'], trade['date'], trade.get('fees', 0.0)),
+             int(bool(trade.get('seeded', False))))
+            for trade in trades
+        ]
+        with closing(self._connect()) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO transactions (account, symbol, date, side, quantity, price, fees, seeded) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                records
+            )
+            for account, symbol in dict.fromkeys((record[0], record[1]) for record in records):
+                self._store_position(conn, account, symbol, self._replay(conn, account, symbol))
+        return len(records)
+
+    def rebuild_positions(self):
+        """Recompute every position from the transactions table."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM positions")
+            pairs = conn.execute("SELECT DISTINCT account, symbol FROM transactions").fetchall()
+            for account, symbol in pairs:
+                self._store_position(conn, account, symbol, self._replay(conn, account, symbol))
+
+    def accounts(self) -> List[str]:
+        with closing(self._connect()) as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT account FROM positions ORDER BY account")]
+
+    def positions(self, account: Optional[str] = None, include_closed: bool = False) -> pd.DataFrame:
+        """Current positions, one row per (account, symbol)."""
+        query = (
+            "SELECT account, symbol, quantity, CASE WHEN quantity > 0 THEN cost / quantity END, cost, "
+            "last_buy_price, last_buy_date, first_buy_date, realized_pnl, trades FROM positions"
+        )
+        clauses, params = [], []
+        if account is not None:
+            clauses.append("account = ?")
+            params.append(account)
+        if not include_closed:
+            clauses.append("quantity > 0")
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY account, symbol"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return pd.DataFrame(rows, columns=list(POSITION_COLUMNS.values()))
+
+    def transactions(self, account: Optional[str] = None, symbol: Optional[str] = None,
+                     start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+        """Transactions filtered by account, symbol and inclusive ISO date range, oldest first.
+
+        'Seeded' is True for trades reconstructed by ``seed_from_holdings``.
+        """
+        query = "SELECT id, account, symbol, date, side, quantity, price, fees, seeded FROM transactions"
+        clauses, params = [], []
+        for clause, value in (("account = ?", account), ("symbol = ?", symbol and symbol.upper()),
+                              ("date >= ?", start), ("date <= ?", end)):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY date, id"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        df = pd.DataFrame(rows, columns=['Id', 'Account', 'Symbol', 'Date', 'Side', 'Quantity', 'Price', 'Fees', 'Seeded'])
+        return df.astype({'Seeded': bool})
+
+    def holdings(self, account: str = DEFAULT_ACCOUNT) -> Dict[str, Dict]:
+        """Open positions in the ``{symbol: {...}}`` shape generate_portfolio_snapshot expects."""
+        return {
+            row['Symbol']: {
+                "avg_purchase_price": row['Average Cost'],
+                "last_purchase_price": row['Last Buy'],
+                "last_purchase_date": row['Last Buy Date'],
+                "quantity": row['Quantity'],
+            }
+            for _, row in self.positions(account).iterrows()
+        }
+
+    def seed_from_holdings(self, holdings: Dict[str, Dict], account: str = DEFAULT_ACCOUNT) -> int:
+        """Turn legacy ``{symbol: {avg, last price, last date}}`` holdings into seeded buy transactions.
+
+        The legacy data has no quantities or earlier lots. Each symbol becomes
+        a 1-share buy at the last price, preceded (when the average differs)
+        by a same-day buy at ``max(2 * avg - last, 0)`` sized so the position
+        keeps both the average and the last purchase price. The trades are
+        marked as seeded: their quantities and dates are made up, so they
+        have no meaningful XIRR.
+        """
+        trades = []
+        for symbol, data in holdings.items():
+            average, last, date = data["avg_purchase_price"], data["last_purchase_price"], data["last_purchase_date"]
+            if abs(last - average) > 1e-9 and average > 0:
+                earlier = max(2 * average - last, 0.0)
+                trades.append({'account': account, 'symbol': symbol, 'side': 'BUY', 'seeded': True,
+                               'quantity': (last - average) / (average - earlier), 'price': earlier, 'date': date})
+            trades.append({'account': account, 'symbol': symbol, 'side': 'BUY', 'seeded': True,
+                           'quantity': 1, 'price': last, 'date': date})
+        return self.add_trades(trades)
+
+
+_ledger: Optional[Ledger] = None
+
+
+def get_ledger() -> Ledger:
+    """Return the process-wide ledger, creating it on first use."""
+    global _ledger
+    if _ledger is None:
+        _ledger = Ledger()
+    return _ledger
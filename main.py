@@ -1,6 +1,12 @@
+import os
+import uuid
 import streamlit as st
 import pages.portfolio as portfolio
 import pages.mutual_funds as mutualfunds
+import pages.screener as screener
+import profiling
+from profiling import stage
+from utils import start_prefetch
 
 # Page config
 st.set_page_config(
@@ -10,18 +16,54 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Force clear cache and session state
-st.cache_data.clear()
+# Keep quotes for the ledger's holdings and the indices warm in a snapshot
+# shared by all sessions; started once per process
+start_prefetch(list(portfolio.load_holdings()))
+
+# Upstream data is memoized in utils with a market-hours TTL, so only
+# per-session state is reset here
 if 'last_symbol' in st.session_state:
     del st.session_state['last_symbol']
 
+# Line colour of each NIFTY 50 trend range
+RANGE_COLORS = {'1M': 'blue', '1Y': 'green', '3Y': 'red', '10Y': 'purple', 'Max': 'black'}
+
 #-----------------------------------------------------------
+def debug_enabled() -> bool:
+    return st.query_params.get("debug") == "1" or os.environ.get("STOCKINSIGHT_DEBUG") == "1"
+
+def show_render_profiles(profiles):
+    import pandas as pd
+
+    with st.sidebar:
+        st.subheader("🛠 Render Timings")
+        for render in profiles:
+            st.caption(
+                f"{render.page}: {render.total_seconds * 1000:,.0f} ms total, "
+                f"{sum(render.upstream.values())} upstream calls"
+            )
+            st.dataframe(
+                pd.DataFrame([
+                    {
+                        "Stage": entry["stage"],
+                        "ms": round(entry["seconds"] * 1000, 1),
+                        "Runs": entry["count"],
+                        "Upstream": sum(entry["upstream_calls"].values()),
+                    }
+                    for entry in render.stages
+                ]),
+                hide_index=True,
+                use_container_width=True
+            )
+
+def section_profile(page: str, name: str):
+    """Profile a fragment as a stage of the full render, or on its own when it reruns alone."""
+    return profiling.section(page, name, session=st.session_state.get('profile_session'))
+
 def homepage_content():
     import plotly.graph_objects as go
     from utils import (
         is_indian_market_open, 
-        get_stock_data, 
-        prepare_summary_data, 
         get_nse_indices,
         #generate_portfolio_snapshot
     )
@@ -38,7 +80,8 @@ def homepage_content():
     """)
 
     # Market status
-    is_open, market_status = is_indian_market_open()
+    with stage("market_status"):
+        is_open, market_status = is_indian_market_open()
     status_color = "green" if is_open else "red"
     st.markdown(
         f"""
@@ -52,7 +95,8 @@ def homepage_content():
 
     # NSE Indices Section
     st.subheader("📊 NSE & BSE Indices")
-    indices_data = get_nse_indices()
+    with stage("get_nse_indices"):
+        indices_data = get_nse_indices()
 
     # Create three columns for NIFTY 50, BANK NIFTY, and SENSEX
     nifty_col, sensex_col, banknifty_col  = st.columns(3)
@@ -74,24 +118,26 @@ def homepage_content():
                 delta_color="normal" if change >= 0 else "inverse"
             )
             # Nifty 50 Chart
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=hist_data.index,
-                y=hist_data['Close'],
-                name='NIFTY 50',
-                line=dict(color='blue', width=1)
-            ))
-
-            fig.update_layout(
-                title="NIFTY 50 Historical Trend",
-                yaxis_title="Value",
-                xaxis_title="Date",
-                template="plotly_white",
-                height=400,
-                showlegend=True
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+            with stage("figure"):
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=hist_data.index,
+                    y=hist_data['Close'],
+                    name='NIFTY 50',
+                    line=dict(color='blue', width=1)
+                ))
+
+                fig.update_layout(
+                    title="NIFTY 50 Historical Trend",
+                    yaxis_title="Value",
+                    xaxis_title="Date",
+                    template="plotly_white",
+                    height=400,
+                    showlegend=True
+                )
+
+            with stage("plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
         else:
             st.error(f"Error loading NIFTY 50 data: {message}")
 
@@ -112,24 +158,26 @@ def homepage_content():
                 delta_color="normal" if change >= 0 else "inverse"
             )
             # SENSEX Chart
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=hist_data.index,
-                y=hist_data['Close'],
-                name='SENSEX',
-                line=dict(color='red', width=1)
-            ))
-
-            fig.update_layout(
-                title="SENSEX Historical Trend",
-                yaxis_title="Value",
-                xaxis_title="Date",
-                template="plotly_white",
-                height=400,
-                showlegend=True
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+            with stage("figure"):
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=hist_data.index,
+                    y=hist_data['Close'],
+                    name='SENSEX',
+                    line=dict(color='red', width=1)
+                ))
+
+                fig.update_layout(
+                    title="SENSEX Historical Trend",
+                    yaxis_title="Value",
+                    xaxis_title="Date",
+                    template="plotly_white",
+                    height=400,
+                    showlegend=True
+                )
+
+            with stage("plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
         else:
             st.error(f"Error loading SENSEX data: {message}")
 
@@ -150,148 +198,139 @@ def homepage_content():
                 delta_color="normal" if change >= 0 else "inverse"
             )
             # Bank Nifty Chart
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=hist_data.index,
-                y=hist_data['Close'],
-                name='BANK NIFTY',
-                line=dict(color='green', width=1)
-            ))
-
-            fig.update_layout(
-                title="BANK NIFTY Historical Trend",
-                yaxis_title="Value",
-                xaxis_title="Date",
-                template="plotly_white",
-                height=400,
-                showlegend=True
-            )
-
-            st.plotly_chart(fig, use_container_width=True)
+            with stage("figure"):
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=hist_data.index,
+                    y=hist_data['Close'],
+                    name='BANK NIFTY',
+                    line=dict(color='green', width=1)
+                ))
+
+                fig.update_layout(
+                    title="BANK NIFTY Historical Trend",
+                    yaxis_title="Value",
+                    xaxis_title="Date",
+                    template="plotly_white",
+                    height=400,
+                    showlegend=True
+                )
+
+            with stage("plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
         else:
             st.error(f"Error loading BANK NIFTY data: {message}")
 
     # NIFTY 50 Historical Trends Section
-    st.subheader("📈 NIFTY 50 Historical Trends")
-
-    # Create a tabbed layout for different timeframes
-    tab1, tab2, tab3 = st.tabs(["1 Month", "1 Year", "3 Years"])
-
-    hist_data, info, message = indices_data['NIFTY 50']
-    # 1 Month Chart
-    with tab1:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=hist_data.index[-30:],  # Last 30 days
-            y=hist_data['Close'][-30:],
-            name="NIFTY 50 (1M)",
-            line=dict(color='blue', width=1)
-        ))
-        
-        fig.update_layout(
-            title="NIFTY 50 - 1 Month Trend",
-            xaxis_title="Date",
-            yaxis_title="Value",
-            template="plotly_white",
-            #xaxis=dict(type="category")  # Ensures each day is plotted on the x-axis
-            xaxis=dict(
-                tickmode="array",
-                tickvals=hist_data.index[-30:],  # Ensure every date has a tick
-                tickangle=-45,  # Rotate labels for better readability
-                showgrid=True
-            ),
-            yaxis=dict(showgrid=True)  # Ensures Y-axis grid is visible
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-
-
-    # 1 Year Chart
-    with tab2:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=hist_data.index[-252:],  # Last 252 trading days (~1 year)
-            y=hist_data['Close'][-252:],
-            name="NIFTY 50 (1Y)",
-            line=dict(color='green', width=1)
-        ))
-        fig.update_layout(
-            title="NIFTY 50 - 1 Year Trend", 
-            xaxis_title="Date", 
-            yaxis_title="Value", 
-            template="plotly_white",
-            yaxis=dict(showgrid=True)  # Ensures Y-axis grid is visible
-            
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
-    # 3 Years Chart
-    with tab3:
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=hist_data.index[-756:],  # Last 756 trading days (~3 years)
-            y=hist_data['Close'][-756:],
-            name="NIFTY 50 (3Y)",
-            line=dict(color='red', width=1)
-        ))
-        fig.update_layout(
-            title="NIFTY 50 - 3 Year Trend", 
-            xaxis_title="Date", 
-            yaxis_title="Value", 
-            template="plotly_white",
-            yaxis=dict(showgrid=True)  # Ensures Y-axis grid is visible
-        )
-        st.plotly_chart(fig, use_container_width=True)
-
+    nifty_trend_section()
 
     # Stock input
-    st.subheader("🔍 Stock Search")
-    symbol = st.text_input(
-        "Enter Stock Symbol:",
-        help="Enter stock symbol (e.g., 'TCS' or 'tcs'). Case-insensitive.",
-        key="stock_input"
-    ).strip()
+    stock_search_section(is_open)
 
-    if symbol:
-        with st.spinner(f'Fetching data for {symbol}...'):
-            #hist_data, info, message = get_stock_data(symbol)
-            hist_data, info, message, insights = get_stock_data(symbol)
 
+@st.fragment
+def nifty_trend_section():
+    """NIFTY 50 trend chart; changing its range reruns only this section."""
+    import plotly.graph_objects as go
+    from utils import get_chart_history, CHART_RANGES, NSE_INDICES
+
+    with section_profile("homepage", "nifty_trend"):
+        st.subheader("📈 NIFTY 50 Historical Trends")
+        # Only the selected range is loaded; long ranges are downsampled server-side
+        chart_range = st.radio(
+            "Timeframe",
+            list(CHART_RANGES),
+            index=1,
+            horizontal=True,
+            key="nifty_range",
+            label_visibility="collapsed"
+        )
+        with stage("get_chart_history"):
+            range_data, range_message = get_chart_history(NSE_INDICES['NIFTY 50'], chart_range)
+
+        if range_message != "success":
+            st.error(f"Error loading NIFTY 50 data: {range_message}")
+        else:
+            with stage("figure"):
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(
+                    x=range_data.index,
+                    y=range_data['Close'],
+                    name=f"NIFTY 50 ({chart_range})",
+                    line=dict(color=RANGE_COLORS[chart_range], width=1)
+                ))
+
+                fig.update_layout(
+                    title=f"NIFTY 50 - {chart_range} Trend",
+                    xaxis_title="Date",
+                    yaxis_title="Value",
+                    template="plotly_white",
+                    xaxis=dict(
+                        # A month is short enough to label every trading day
+                        tickmode="array" if chart_range == "1M" else "auto",
+                        tickvals=range_data.index if chart_range == "1M" else None,
+                        tickangle=-45,  # Rotate labels for better readability
+                        showgrid=True
+                    ),
+                    yaxis=dict(showgrid=True)  # Ensures Y-axis grid is visible
+                )
+
+            with stage("plotly_chart"):
+                st.plotly_chart(fig, use_container_width=True)
+
+
+@st.fragment
+def stock_search_section(is_open: bool):
+    """Stock lookup, summary and charts; its widgets rerun only this section."""
+    import plotly.graph_objects as go
+    from utils import (
+        get_stock_quote, get_stock_data_async, prepare_summary_data, get_chart_history, to_yahoo_symbol,
+        CHART_RANGES
+    )
+
+    with section_profile("homepage", "stock_search"):
+        st.subheader("🔍 Stock Search")
+        symbol = st.text_input(
+            "Enter Stock Symbol:",
+            help="Enter stock symbol (e.g., 'TCS' or 'tcs'). Case-insensitive.",
+            key="stock_input"
+        ).strip()
+
+        if symbol:
+            with stage("get_stock_quote"):
+                quote, message = get_stock_quote(symbol)
 
             if message != "success":
                 st.error(message)
             else:
+                # Fundamentals, the 1-year bars and the pros & cons load in the
+                # background while the price and chart render
+                stock_future = get_stock_data_async(symbol)
                 try:
-                    # Display basic info
-                    company_name = info.get('longName', symbol)
-                    st.subheader(f"{company_name} ({symbol.upper()})")
-
-                    # Display summary table
-                    st.subheader("Stock Summary")
-                    if not is_open:
-                        st.info("Note: Data shown is from the last market close")
-                    summary_df = prepare_summary_data(info)
-                    st.table(summary_df)
-
-                    # Display Pros and Con
-                    st.subheader("Pros & Cons")
-                    col1, col2 = st.columns(2)
-
-                    with col1:
-                        st.subheader("✅ Pros")
-                        if insights["Pros"]:
-                            for pro in insights["Pros"]:
-                                st.success(f"✔ {pro}")
-                        else:
-                            st.info("No strong positive indicators found.")
-
-                    with col2:
-                        st.subheader("❌ Cons")
-                        if insights["Cons"]:
-                            for con in insights["Cons"]:
-                                st.warning(f"⚠ {con}")
-                        else:
-                            st.info("No major risks identified.")
+                    # Display basic info; the company name arrives with the fundamentals
+                    title = st.empty()
+                    title.subheader(symbol.upper())
+
+                    current_price = quote['regularMarketPrice']
+                    prev_close = quote.get('regularMarketPreviousClose')
+                    price_col, day_col, year_col = st.columns(3)
+                    if prev_close:
+                        change = current_price - prev_close
+                        price_col.metric("Current Price", f"₹{current_price:,.2f}",
+                                         f"{change:,.2f} ({change / prev_close * 100:.2f}%)")
+                    else:
+                        price_col.metric("Current Price", f"₹{current_price:,.2f}")
+                    if quote.get('dayLow') and quote.get('dayHigh'):
+                        day_col.metric("Day Range", f"₹{quote['dayLow']:,.2f} - ₹{quote['dayHigh']:,.2f}")
+                    if quote.get('fiftyTwoWeekLow') and quote.get('fiftyTwoWeekHigh'):
+                        year_col.metric("52 Week Range",
+                                        f"₹{quote['fiftyTwoWeekLow']:,.2f} - ₹{quote['fiftyTwoWeekHigh']:,.2f}")
+
+                    # Summary and pros & cons are filled in here once they arrive
+                    details = st.container()
+                    with details:
+                        loading = st.empty()
+                        loading.info("Loading fundamentals...")
 
                     # Technical Indicators section
                     st.subheader("Technical Indicators")
@@ -312,127 +351,221 @@ def homepage_content():
 
                     # Interactive price chart
                     st.subheader("Price History")
-                    fig = go.Figure()
-
-                    # Main candlestick chart
-                    fig.add_trace(
-                        go.Candlestick(
-                            x=hist_data.index,
-                            open=hist_data['Open'],
-                            high=hist_data['High'],
-                            low=hist_data['Low'],
-                            close=hist_data['Close'],
-                            name='OHLC'
-                        )
-                    )
-
-                    # Add Moving Averages
-                    if show_ma20:
-                        fig.add_trace(go.Scatter(
-                            x=hist_data.index,
-                            y=hist_data['MA20'],
-                            name='MA20',
-                            line=dict(color='blue', width=1)
-                        ))
-
-                    if show_ma50:
-                        fig.add_trace(go.Scatter(
-                            x=hist_data.index,
-                            y=hist_data['MA50'],
-                            name='MA50',
-                            line=dict(color='orange', width=1)
-                        ))
-
-                    if show_ma200:
-                        fig.add_trace(go.Scatter(
-                            x=hist_data.index,
-                            y=hist_data['MA200'],
-                            name='MA200',
-                            line=dict(color='red', width=1)
-                        ))
-
-                    fig.update_layout(
-                        title=f"{symbol} Stock Price",
-                        yaxis_title="Price (₹)",
-                        xaxis_title="Date",
-                        template="plotly_white",
-                        height=600,
-                        xaxis_rangeslider_visible=False
+                    price_range = st.radio(
+                        "Price history range",
+                        list(CHART_RANGES),
+                        index=1,
+                        horizontal=True,
+                        key="price_range",
+                        label_visibility="collapsed"
                     )
-
-                    st.plotly_chart(fig, use_container_width=True)
-
-                    # RSI Chart
-                    if show_rsi:
-                        rsi_fig = go.Figure()
-                        rsi_fig.add_trace(go.Scatter(
-                            x=hist_data.index,
-                            y=hist_data['RSI'],
-                            name='RSI',
-                            line=dict(color='purple', width=1)
-                        ))
-
-                        # Add overbought/oversold lines
-                        rsi_fig.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought (70)")
-                        rsi_fig.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold (30)")
-
-                        rsi_fig.update_layout(
-                            title="Relative Strength Index (RSI)",
-                            yaxis_title="RSI",
-                            xaxis_title="Date",
-                            template="plotly_white",
-                            height=300,
-                            yaxis=dict(range=[0, 100])
-                        )
-
-                        st.plotly_chart(rsi_fig, use_container_width=True)
-
-                    # Download buttons
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        # Download button for summary
-                        csv = summary_df.to_csv(index=False)
-                        st.download_button(
-                            label="Download Summary CSV",
-                            data=csv,
-                            file_name=f"{symbol}_summary.csv",
-                            mime="text/csv"
-                        )
-
-                    with col2:
-                        # Download button for historical data
-                        csv_hist = hist_data.to_csv()
-                        st.download_button(
-                            label="Download Historical Data CSV",
-                            data=csv_hist,
-                            file_name=f"{symbol}_historical.csv",
-                            mime="text/csv"
-                        )
+                    with stage("get_chart_history"):
+                        chart_data, chart_message = get_chart_history(to_yahoo_symbol(symbol), price_range, candles=True)
+                    if chart_message != "success":
+                        with stage("get_stock_data"):
+                            chart_data = stock_future.result()[0]
+                        st.warning(f"{chart_message}; showing 1 year" if chart_data is not None else chart_message)
+
+                    if chart_data is not None:
+                        with stage("figure"):
+                            fig = go.Figure()
+
+                            # Main candlestick chart
+                            fig.add_trace(
+                                go.Candlestick(
+                                    x=chart_data.index,
+                                    open=chart_data['Open'],
+                                    high=chart_data['High'],
+                                    low=chart_data['Low'],
+                                    close=chart_data['Close'],
+                                    name='OHLC'
+                                )
+                            )
+
+                            # Add Moving Averages
+                            if show_ma20:
+                                fig.add_trace(go.Scatter(
+                                    x=chart_data.index,
+                                    y=chart_data['MA20'],
+                                    name='MA20',
+                                    line=dict(color='blue', width=1)
+                                ))
+
+                            if show_ma50:
+                                fig.add_trace(go.Scatter(
+                                    x=chart_data.index,
+                                    y=chart_data['MA50'],
+                                    name='MA50',
+                                    line=dict(color='orange', width=1)
+                                ))
+
+                            if show_ma200:
+                                fig.add_trace(go.Scatter(
+                                    x=chart_data.index,
+                                    y=chart_data['MA200'],
+                                    name='MA200',
+                                    line=dict(color='red', width=1)
+                                ))
+
+                            fig.update_layout(
+                                title=f"{symbol} Stock Price",
+                                yaxis_title="Price (₹)",
+                                xaxis_title="Date",
+                                template="plotly_white",
+                                height=600,
+                                xaxis_rangeslider_visible=False
+                            )
+
+                        with stage("plotly_chart"):
+                            st.plotly_chart(fig, use_container_width=True)
+
+                        # RSI Chart
+                        if show_rsi:
+                            with stage("figure"):
+                                rsi_fig = go.Figure()
+                                rsi_fig.add_trace(go.Scatter(
+                                    x=chart_data.index,
+                                    y=chart_data['RSI'],
+                                    name='RSI',
+                                    line=dict(color='purple', width=1)
+                                ))
+
+                                # Add overbought/oversold lines
+                                rsi_fig.add_hline(y=70, line_dash="dash", line_color="red", annotation_text="Overbought (70)")
+                                rsi_fig.add_hline(y=30, line_dash="dash", line_color="green", annotation_text="Oversold (30)")
+
+                                rsi_fig.update_layout(
+                                    title="Relative Strength Index (RSI)",
+                                    yaxis_title="RSI",
+                                    xaxis_title="Date",
+                                    template="plotly_white",
+                                    height=300,
+                                    yaxis=dict(range=[0, 100])
+                                )
+
+                            with stage("plotly_chart"):
+                                st.plotly_chart(rsi_fig, use_container_width=True)
+
+                    with stage("get_stock_data"):
+                        hist_data, info, message, insights = stock_future.result()
+                    loading.empty()
+                    if message != "success":
+                        with details:
+                            st.warning(f"Fundamentals unavailable: {message}")
+                    else:
+                        company_name = info.get('longName', symbol)
+                        title.subheader(f"{company_name} ({symbol.upper()})")
+
+                        with details:
+                            # Display summary table
+                            st.subheader("Stock Summary")
+                            if not is_open:
+                                st.info("Note: Data shown is from the last market close")
+                            with stage("prepare_summary_data"):
+                                summary_df = prepare_summary_data(info)
+                            st.table(summary_df)
+
+                            # Display Pros and Con
+                            st.subheader("Pros & Cons")
+                            if insights.get("Warning"):
+                                st.warning(insights["Warning"])
+                            col1, col2 = st.columns(2)
+
+                            with col1:
+                                st.subheader("✅ Pros")
+                                if insights["Pros"]:
+                                    for pro in insights["Pros"]:
+                                        st.success(f"✔ {pro}")
+                                else:
+                                    st.info("No strong positive indicators found.")
+
+                            with col2:
+                                st.subheader("❌ Cons")
+                                if insights["Cons"]:
+                                    for con in insights["Cons"]:
+                                        st.warning(f"⚠ {con}")
+                                else:
+                                    st.info("No major risks identified.")
+
+                        # Download buttons
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            # Download button for summary
+                            csv = summary_df.to_csv(index=False)
+                            st.download_button(
+                                label="Download Summary CSV",
+                                data=csv,
+                                file_name=f"{symbol}_summary.csv",
+                                mime="text/csv"
+                            )
+
+                        with col2:
+                            # Download button for historical data
+                            csv_hist = hist_data.to_csv()
+                            st.download_button(
+                                label="Download Historical Data CSV",
+                                data=csv_hist,
+                                file_name=f"{symbol}_historical.csv",
+                                mime="text/csv"
+                            )
 
                 except Exception as e:
                     st.error(f"Error displaying data: {str(e)}")
-    else:
-        st.info("Please enter a stock symbol to view data")
-
+        else:
+            st.info("Please enter a stock symbol to view data")
 
-    
 
 #----------------------------------------------
-# Create tab-based navigation
-tab1, tab2, tab3 = st.tabs(["📈 Stock Insight","📈 Portfolio", "💰 Mutual Funds"])
+# Section navigation: only the selected section runs, so interacting with one
+# never re-fetches another. Widgets inside a section run as fragments and
+# rerun just that fragment.
+SECTIONS = ["📈 Stock Insight", "📈 Portfolio", "🔎 Screener", "💰 Mutual Funds"]
+
+# Streamlit drops the state of widgets that aren't rendered; re-assigning it
+# keeps inputs of hidden sections across navigation
+for key in ("nifty_range", "stock_input", "price_range", "portfolio_input",
+            "screener_universe", "screener_sector", "screener_min_score"):
+    if key in st.session_state:
+        st.session_state[key] = st.session_state[key]
+
+section = st.radio(
+    "Section",
+    SECTIONS,
+    horizontal=True,
+    key="section",
+    label_visibility="collapsed"
+)
+
+# Every render is profiled per stage; ?debug=1 logs the timings and shows them in the sidebar
+session_id = st.session_state.setdefault('profile_session', uuid.uuid4().hex)
+if debug_enabled():
+    profiling.log_session(session_id)
+profiles = []
 
 # Stock Insight
-with tab1:
-    homepage_content()
+if section == SECTIONS[0]:
+    with profiling.profile("homepage", session=session_id) as homepage_profile:
+        homepage_content()
+    profiles.append(homepage_profile)
 # Portfolio Section
-with tab2:
-    portfolio.show()
+elif section == SECTIONS[1]:
+    with profiling.profile("portfolio", session=session_id) as portfolio_profile:
+        portfolio.show()
+    profiles.append(portfolio_profile)
+# Screener Section
+elif section == SECTIONS[2]:
+    with profiling.profile("screener", session=session_id) as screener_profile:
+        screener.show()
+    profiles.append(screener_profile)
 # Mutual Funds Section
-with tab3:
+else:
     mutualfunds.show()
 #--------------------------------------------------------------
 
 
+if debug_enabled():
+    show_render_profiles(profiles)
+
 # Footer
 st.markdown("""
 ---
@@ -0,0 +1,196 @@
+"""NSE trading calendar built from a bundled holiday file, with O(1) session lookups.
+
+Sessions run 9:15 AM to 3:30 PM IST on weekdays that are not exchange
+holidays. The holidays live in ``data/nse_holidays.json`` and are refreshed
+from NSE off the request path:
+
+    python -m market_calendar --refresh
+
+For every calendar day in the years the file covers (plus the following
+year), the index of the next and previous session is precomputed. Is-open,
+next-open and previous-close are then a few list lookups. Dates outside
+that range fall back to weekdays only.
+"""
+import argparse
+import datetime
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+import pytz
+
+IST = pytz.timezone('Asia/Kolkata')
+MARKET_OPEN = datetime.time(9, 15)
+MARKET_CLOSE = datetime.time(15, 30)
+
+HOLIDAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nse_holidays.json")
+NSE_HOLIDAY_URL = "https://www.nseindia.com/api/holiday-master?type=trading"
+
+
+class TradingCalendar:
+    """Trading sessions between Jan 1 of the first holiday year and Dec 31 of the year after the last."""
+
+    def __init__(self, holidays: Dict[datetime.date, str]):
+        self.holidays = dict(holidays)
+        years = [day.year for day in self.holidays] or [datetime.date.today().year]
+        self.first_day = datetime.date(min(years), 1, 1)
+        self.last_day = datetime.date(max(years) + 1, 12, 31)
+
+        days = (self.last_day - self.first_day).days + 1
+        self.sessions = []
+        # Per calendar day: index into sessions of the first session on/after
+        # it, and of the last session on/before it (-1 if none)
+        self._next = [0] * days
+        self._prev = [0] * days
+        for offset in range(days):
+            day = self.first_day + datetime.timedelta(days=offset)
+            if day.weekday() < 5 and day not in self.holidays:
+                self.sessions.append(day)
+            self._prev[offset] = len(self.sessions) - 1
+        following = len(self.sessions)
+        for offset in range(days - 1, -1, -1):
+            day = self.first_day + datetime.timedelta(days=offset)
+            if self._prev[offset] >= 0 and self.sessions[self._prev[offset]] == day:
+                following = self._prev[offset]
+            self._next[offset] = following
+
+    def _offset(self, day: datetime.date) -> Optional[int]:
+        if self.first_day <= day <= self.last_day:
+            return (day - self.first_day).days
+        return None
+
+    def is_session(self, day: datetime.date) -> bool:
+        """True if ``day`` is a trading day."""
+        offset = self._offset(day)
+        if offset is None:
+            return day.weekday() < 5
+        index = self._prev[offset]
+        return index >= 0 and self.sessions[index] == day
+
+    def next_session(self, day: datetime.date) -> datetime.date:
+        """First trading day strictly after ``day``."""
+        following = day + datetime.timedelta(days=1)
+        offset = self._offset(following)
+        if offset is not None and self._next[offset] < len(self.sessions):
+            return self.sessions[self._next[offset]]
+        while not self.is_session(following):
+            following += datetime.timedelta(days=1)
+        return following
+
+    def previous_session(self, day: datetime.date) -> datetime.date:
+        """Last trading day strictly before ``day``."""
+        preceding = day - datetime.timedelta(days=1)
+        offset = self._offset(preceding)
+        if offset is not None and self._prev[offset] >= 0:
+            return self.sessions[self._prev[offset]]
+        while not self.is_session(preceding):
+            preceding -= datetime.timedelta(days=1)
+        return preceding
+
+    def is_open(self, now: datetime.datetime) -> bool:
+        now = now.astimezone(IST)
+        return self.is_session(now.date()) and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+    def next_open(self, now: datetime.datetime) -> datetime.datetime:
+        """Start of the next session after ``now`` (today's, if it hasn't opened yet)."""
+        now = now.astimezone(IST)
+        day = now.date()
+        if not (self.is_session(day) and now.time() < MARKET_OPEN):
+            day = self.next_session(day)
+        return IST.localize(datetime.datetime.combine(day, MARKET_OPEN))
+
+    def previous_close(self, now: datetime.datetime) -> datetime.datetime:
+        """End of the most recent session that closed at or before ``now``."""
+        now = now.astimezone(IST)
+        day = now.date()
+        if not (self.is_session(day) and now.time() >= MARKET_CLOSE):
+            day = self.previous_session(day)
+        return IST.localize(datetime.datetime.combine(day, MARKET_CLOSE))
+
+    def holiday_name(self, day: datetime.date) -> Optional[str]:
+        return self.holidays.get(day)
+
+
+def load_holidays(path: str = HOLIDAY_FILE) -> Dict[datetime.date, str]:
+    """Read ``{date: description}`` from a holiday file; a missing or broken file means no holidays."""
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        return {datetime.date.fromisoformat(day): name for day, name in data['holidays'].items()}
+    except (OSError, ValueError, KeyError) as e:
+        print("Error loading NSE holiday file:", e)
+        return {}
+
+
+def fetch_nse_holidays(timeout: float = 10) -> Dict[datetime.date, str]:
+    """Download the trading holiday list from NSE as ``{date: description}``."""
+    import requests
+
+    response = requests.get(NSE_HOLIDAY_URL, headers={"User-Agent": "Mozilla/5.0"}, timeout=timeout)
+    response.raise_for_status()
+    return {
+        datetime.datetime.strptime(item['tradingDate'], "%d-%b-%Y").date(): item.get('description', 'Holiday')
+        for item in response.json()['CM']
+    }
+
+
+_calendar: Optional[TradingCalendar] = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar() -> TradingCalendar:
+    """Return the process-wide calendar, built from the holiday file on first use."""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = TradingCalendar(load_holidays())
+    return _calendar
+
+
+def refresh_holidays(path: str = HOLIDAY_FILE, timeout: float = 10) -> int:
+    """Merge NSE's current holiday list into the holiday file and rebuild the calendar.
+
+    Returns the number of holidays in the file afterwards.
+    """
+    global _calendar
+    holidays = load_holidays(path)
+    holidays.update(fetch_nse_holidays(timeout))
+
+    payload = {
+        'source': NSE_HOLIDAY_URL,
+        'updated': datetime.date.today().isoformat(),
+        'holidays': {day.isoformat(): name for day, name in sorted(holidays.items())},
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+    if path == HOLIDAY_FILE:
+        with _calendar_lock:
+            _calendar = TradingCalendar(holidays)
+    return len(holidays)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or refresh the bundled NSE trading calendar.")
+    parser.add_argument('--refresh', action='store_true', help="download NSE's holiday list into the holiday file")
+    parser.add_argument('--file', default=HOLIDAY_FILE)
+    args = parser.parse_args(argv)
+
+    if args.refresh:
+        print(f"{refresh_holidays(args.file)} holidays in {args.file}")
+
+    calendar = get_calendar() if args.file == HOLIDAY_FILE else TradingCalendar(load_holidays(args.file))
+    now = datetime.datetime.now(IST)
+    print(f"Open now: {calendar.is_open(now)}")
+    print(f"Previous close: {calendar.previous_close(now):%A, %d %b %Y %I:%M %p} IST")
+    print(f"Next open: {calendar.next_open(now):%A, %d %b %Y %I:%M %p} IST")
+
+
+if __name__ == '__main__':
+    main()
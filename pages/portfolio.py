@@ -1,11 +1,196 @@
 import streamlit as st
-import plotly.graph_objects as go
 from utils import (
-    generate_portfolio_snapshot
+    generate_portfolio_snapshot,
+    format_currency
 )
 import pandas as pd
+import numpy as np
 import datetime
 from datetime import datetime as dt
+import threading
+from profiling import stage, section
+from ledger import get_ledger, DEFAULT_ACCOUNT
+from portfolio_metrics import calculate_gain_loss, add_xirr
+
+# Legacy default holdings, used to seed an empty transaction ledger
+# Initialize dictionary with dummy values
+DEFAULT_HOLDINGS = {
+    'COALINDIA': {
+        "avg_purchase_price": 199.14,  
+        "last_purchase_price": 202.85,  
+        "last_purchase_date": '2022-08-16' 
+    },
+    'GABRIEL': {
+        "avg_purchase_price": 20,  
+        "last_purchase_price": 20,  
+        "last_purchase_date": '2012-07-19' 
+    },
+    'GAIL': {
+        "avg_purchase_price": 124.96,  
+        "last_purchase_price": 146.20,  
+        "last_purchase_date": '2022-03-23' 
+    },
+    'GSPL': {
+        "avg_purchase_price": 220.00,  
+        "last_purchase_price":220.00,
+        "last_purchase_date": '2022-09-10' 
+    },
+    'HINDUNILVR': {
+        "avg_purchase_price": 220,  
+        "last_purchase_price": 220,
+        "last_purchase_date": '2007-10-16' 
+    },
+    'HCLTECH': {
+        "avg_purchase_price": 1552.50,
+        "last_purchase_price": 1475.00,
+        "last_purchase_date": '2025-04-03' 
+    },
+    'IRCTC': {
+        "avg_purchase_price": 773.55,  
+        "last_purchase_price": 773.55,
+        "last_purchase_date": '2022-03-22' 
+    },
+    'IDBI': {
+       "avg_purchase_price": 61.61,  
+       "last_purchase_price": 74,
+        "last_purchase_date": '2025-02-20' 
+    },
+    'IOC': {
+        "avg_purchase_price": 125.20,  
+        "last_purchase_price": 125.20,
+        "last_purchase_date": '2025-01-14' 
+    },
+    'ITC': {
+        "avg_purchase_price": 408.00,
+        "last_purchase_price": 408.00,
+        "last_purchase_date": '2025-03-27' 
+    },
+    'KARURVYSYA': {
+        "avg_purchase_price": 72,  
+        "last_purchase_price": 94,
+        "last_purchase_date": '2022-11-10' 
+    },
+    'KFINTECH': {
+        "avg_purchase_price": 915.45,
+        "last_purchase_price": 915.45,
+        "last_purchase_date": '2025-03-12' 
+    },
+    'LTF': {
+        "avg_purchase_price": 90.03,  
+        "last_purchase_price": 124.60,
+        "last_purchase_date": '2023-08-30' 
+    },
+   
+    'MARICO': {
+        "avg_purchase_price": 503.41,  
+        "last_purchase_price": 503.41,
+        "last_purchase_date": '2022-11-14' 
+    },
+    'NIFTYBEES': {
+        "avg_purchase_price": 252.75,
+        "last_purchase_price": 284.24,  
+        "last_purchase_date": '2024-10-03' 
+    },
+    'NTPC': {
+        "avg_purchase_price": 159.66,
+        "last_purchase_price": 159.66,  
+        "last_purchase_date": '2022-05-12' 
+    },
+     # 'OLAELEC': {
+    #    "avg_purchase_price": 61.30,  
+    #    "last_purchase_price": 61.30,
+    #     "last_purchase_date": '2025-02-20' 
+    # },
+    'ONGC': {
+        "avg_purchase_price": 138.16,  
+        "last_purchase_price": 138.16,
+        "last_purchase_date": '2022-08-16' 
+    },
+    'PNBGILTS': {
+       "avg_purchase_price": 60.41,  
+       "last_purchase_price": 62.90,
+        "last_purchase_date": '2023-08-31' 
+    },
+    'SBIN': {
+       "avg_purchase_price": 766.74,  
+       "last_purchase_price": 766.74,
+        "last_purchase_date": '2024-06-04' 
+    },
+    'SOUTHBANK': {
+       "avg_purchase_price": 25.92,  
+       "last_purchase_price": 24.54,
+        "last_purchase_date": '2024-10-03' 
+    },
+    'TATACOMM': {
+        "avg_purchase_price": 450,  
+        "last_purchase_price": 450,
+        "last_purchase_date": '2007-12-28' 
+    },
+    'TATAMOTORS': {
+        "avg_purchase_price": 434.05,  
+        "last_purchase_price": 434.05,
+        "last_purchase_date": '2022-03-22' 
+    },
+    'TATASTEEL': {
+       "avg_purchase_price": 106.92,  
+       "last_purchase_price": 106.92,
+        "last_purchase_date": '2022-09-07' 
+    },
+    'TATAPOWER': {
+        "avg_purchase_price": 247.45,  
+        "last_purchase_price": 283.80,
+        "last_purchase_date": '2022-05-12'  
+    },
+    'WELSPUNLIV': {
+        "avg_purchase_price": 93.91,
+        "last_purchase_price": 93.91,  
+        "last_purchase_date": '2022-04-21'  
+    },
+    'WIPRO': {
+        "avg_purchase_price": 234.89,  
+        "last_purchase_price": 234.89,
+        "last_purchase_date": '2022-06-09'  
+    },
+    
+}
+
+_seed_lock = threading.Lock()
+
+def load_holdings(account: str = DEFAULT_ACCOUNT) -> dict:
+    """Open positions of ``account`` from the ledger, seeding it from DEFAULT_HOLDINGS when empty."""
+    ledger = get_ledger()
+    holdings = ledger.holdings(account)
+    if not holdings and account == DEFAULT_ACCOUNT:
+        with _seed_lock:
+            if ledger.transactions(account=account).empty:
+                ledger.seed_from_holdings(DEFAULT_HOLDINGS, account)
+        holdings = ledger.holdings(account)
+    return holdings
+
+def record_trade_form(account: str = DEFAULT_ACCOUNT):
+    """Form that appends a buy or sell to the ledger; the snapshot below picks it up on this run."""
+    with st.expander("➕ Record a Trade"):
+        with st.form("record_trade", clear_on_submit=True):
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                trade_symbol = st.text_input("Symbol")
+                side = st.radio("Side", ["BUY", "SELL"], horizontal=True)
+            with col2:
+                quantity = st.number_input("Quantity", min_value=0.0, step=1.0)
+                price = st.number_input("Price (₹)", min_value=0.0, step=0.05)
+            with col3:
+                trade_date = st.date_input("Date", value=datetime.date.today())
+                fees = st.number_input("Fees (₹)", min_value=0.0, step=1.0)
+
+            if st.form_submit_button("Record Trade"):
+                if not trade_symbol.strip():
+                    st.warning("Please enter a stock symbol")
+                else:
+                    try:
+                        get_ledger().add_trade(account, trade_symbol, side, quantity, price, trade_date, fees)
+                        st.success(f"Recorded {side} of {quantity:g} {trade_symbol.strip().upper()} at ₹{price:,.2f}")
+                    except ValueError as e:
+                        st.error(f"Unable to record trade: {e}")
 
 def show():
     #st.title("Stock Insight")
@@ -19,154 +204,23 @@ def pagecontent():
         Enter stock symbols separated by commas (e.g., TCS, INFY, RELIANCE or tcs, infy, reliance). Case-insensitive.
     """)
 
-    # Some defaults
-    symbols=["COALINDIA", "GABRIEL", "GAIL", "GSPL", "HINDUNILVR","HCLTECH", "IRCTC", "IDBI", "IOC","ITC", "KARURVYSYA","KFINTECH", "LTF", "ONGC", "MARICO","NIFTYBEES","NTPC", "PNBGILTS","SBIN","SOUTHBANK","TATACOMM", "TATAMOTORS", "TATAPOWER", "TATASTEEL", "WELSPUNLIV", "WIPRO"]
-
-    # Initialize dictionary with dummy values
-    stock_data = {
-        'COALINDIA': {
-            "avg_purchase_price": 199.14,  
-            "last_purchase_price": 202.85,  
-            "last_purchase_date": '2022-08-16' 
-        },
-        'GABRIEL': {
-            "avg_purchase_price": 20,  
-            "last_purchase_price": 20,  
-            "last_purchase_date": '2012-07-19' 
-        },
-        'GAIL': {
-            "avg_purchase_price": 124.96,  
-            "last_purchase_price": 146.20,  
-            "last_purchase_date": '2022-03-23' 
-        },
-        'GSPL': {
-            "avg_purchase_price": 220.00,  
-            "last_purchase_price":220.00,
-            "last_purchase_date": '2022-09-10' 
-        },
-        'HINDUNILVR': {
-            "avg_purchase_price": 220,  
-            "last_purchase_price": 220,
-            "last_purchase_date": '2007-10-16' 
-        },
-        'HCLTECH': {
-            "avg_purchase_price": 1552.50,
-            "last_purchase_price": 1475.00,
-            "last_purchase_date": '2025-04-03' 
-        },
-        'IRCTC': {
-            "avg_purchase_price": 773.55,  
-            "last_purchase_price": 773.55,
-            "last_purchase_date": '2022-03-22' 
-        },
-        'IDBI': {
-           "avg_purchase_price": 61.61,  
-           "last_purchase_price": 74,
-            "last_purchase_date": '2025-02-20' 
-        },
-        'IOC': {
-            "avg_purchase_price": 125.20,  
-            "last_purchase_price": 125.20,
-            "last_purchase_date": '2025-01-14' 
-        },
-        'ITC': {
-            "avg_purchase_price": 408.00,
-            "last_purchase_price": 408.00,
-            "last_purchase_date": '2025-03-27' 
-        },
-        'KARURVYSYA': {
-            "avg_purchase_price": 72,  
-            "last_purchase_price": 94,
-            "last_purchase_date": '2022-11-10' 
-        },
-        'KFINTECH': {
-            "avg_purchase_price": 915.45,
-            "last_purchase_price": 915.45,
-            "last_purchase_date": '2025-03-12' 
-        },
-        'LTF': {
-            "avg_purchase_price": 90.03,  
-            "last_purchase_price": 124.60,
-            "last_purchase_date": '2023-08-30' 
-        },
-       
-        'MARICO': {
-            "avg_purchase_price": 503.41,  
-            "last_purchase_price": 503.41,
-            "last_purchase_date": '2022-11-14' 
-        },
-        'NIFTYBEES': {
-            "avg_purchase_price": 252.75,
-            "last_purchase_price": 284.24,  
-            "last_purchase_date": '2024-10-03' 
-        },
-        'NTPC': {
-            "avg_purchase_price": 159.66,
-            "last_purchase_price": 159.66,  
-            "last_purchase_date": '2022-05-12' 
-        },
-         # 'OLAELEC': {
-        #    "avg_purchase_price": 61.30,  
-        #    "last_purchase_price": 61.30,
-        #     "last_purchase_date": '2025-02-20' 
-        # },
-        'ONGC': {
-            "avg_purchase_price": 138.16,  
-            "last_purchase_price": 138.16,
-            "last_purchase_date": '2022-08-16' 
-        },
-        'PNBGILTS': {
-           "avg_purchase_price": 60.41,  
-           "last_purchase_price": 62.90,
-            "last_purchase_date": '2023-08-31' 
-        },
-        'SBIN': {
-           "avg_purchase_price": 766.74,  
-           "last_purchase_price": 766.74,
-            "last_purchase_date": '2024-06-04' 
-        },
-        'SOUTHBANK': {
-           "avg_purchase_price": 25.92,  
-           "last_purchase_price": 24.54,
-            "last_purchase_date": '2024-10-03' 
-        },
-        'TATACOMM': {
-            "avg_purchase_price": 450,  
-            "last_purchase_price": 450,
-            "last_purchase_date": '2007-12-28' 
-        },
-        'TATAMOTORS': {
-            "avg_purchase_price": 434.05,  
-            "last_purchase_price": 434.05,
-            "last_purchase_date": '2022-03-22' 
-        },
-        'TATASTEEL': {
-           "avg_purchase_price": 106.92,  
-           "last_purchase_price": 106.92,
-            "last_purchase_date": '2022-09-07' 
-        },
-        'TATAPOWER': {
-            "avg_purchase_price": 247.45,  
-            "last_purchase_price": 283.80,
-            "last_purchase_date": '2022-05-12'  
-        },
-        'WELSPUNLIV': {
-            "avg_purchase_price": 93.91,
-            "last_purchase_price": 93.91,  
-            "last_purchase_date": '2022-04-21'  
-        },
-        'WIPRO': {
-            "avg_purchase_price": 234.89,  
-            "last_purchase_price": 234.89,
-            "last_purchase_date": '2022-06-09'  
-        },
-        
-    }
+    record_trade_form()
 
+    stock_data = load_holdings()
+    symbols = list(stock_data)
 
     with st.spinner("Generating portfolio snapshot..."):
         process_symbols(symbols,stock_data)
 
+    custom_snapshot(stock_data)
+
+@st.fragment
+def custom_snapshot(stock_data):
+    """Snapshot of user-entered symbols; typing or clicking reruns only this fragment."""
+    with section("portfolio", "custom_snapshot", session=st.session_state.get('profile_session')):
+        custom_snapshot_content(stock_data)
+
+def custom_snapshot_content(stock_data):
     portfolio_input = st.text_input(
         "Enter Portfolio Symbols:",
         help="Enter multiple stock symbols separated by commas (case-insensitive)",
@@ -239,93 +293,51 @@ def pagecontent():
                 #         mime="text/csv"
                 #     )
 
-def clean_price(price):
-    # Check if the price is a string (which contains '₹' and commas)
-    if isinstance(price, str):
-        return float(price.replace("₹", "").replace(",", ""))
-    return price  # If it's already a float, just return it
-
-def color_current_price(value,average_buy, last_buy):
-    # Clean both values, remove ₹ and commas, then convert to float
-    value = clean_price(value)
-    average_buy = clean_price(average_buy)
-    last_buy = clean_price(last_buy)
-    
-    # Compare and apply color formatting for display
-    if value < average_buy:
-        return f'<span style="color: red;">₹{value:.2f}</span>'
-    elif value < last_buy:
-        return f'<span style="color: red;">₹{value:.2f}</span>'
-    else:
-        return f'<span style="color: black;">₹{value:.2f}</span>'
-
-def calculate_gain_loss(df):
-    today = dt.today()
-
-    def compute(row):
-        last_buy_price = clean_price(row["Last Buy"])
-        current_price = clean_price(row["Current Price"])
-
-        # Check if the Last Buy Date is None or empty
-        if pd.isna(row["Last Buy Date"]) or row["Last Buy Date"] is None:
-            # Handle missing date (you can skip the row, set to a default, etc.)
-            return pd.Series([None, None, None])  # Return None for all calculations if date is missing
-
-        # If the date is valid, parse it
-        buy_date = dt.strptime(row["Last Buy Date"], "%Y-%m-%d")
-        years_held = (today - buy_date).days / 365.25  # Account for leap years
-
-        # Price difference
-        price_difference = current_price - last_buy_price
-
-        # Percentage gain/loss
-        percentage_gain = (price_difference / last_buy_price) * 100
-        
-
-        # Avoid division by zero for annualized return
-        if years_held >= 1:
-            annualized_return = ((1 + (percentage_gain / 100)) ** (1 / years_held) - 1) * 100
-        else:
-            annualized_return = percentage_gain  # If held for less than a year
-
-        years_held="{:.1f}".format(years_held)   # round to one decimal place
-        annualized_return="{:.2f}".format(annualized_return)   # round to 2 decimal place
-        percentage_gain ="{:.2f}".format(percentage_gain)   # round to 2 decimal place
-
-        return pd.Series([price_difference, percentage_gain,years_held, annualized_return])
-
-    # Apply calculation to each row
-    df[["Price Difference", "Total Gain %","Years", "Annualized Gain %"]] = df.apply(compute, axis=1)
-    #print(df[["Price Difference", "Total Gain %", "Annualized Gain %"]])
-    return df
+def current_price_colors(df):
+    # Red where the current price is below the average or last buy price, else black
+    below = (df["Current Price"] < df["Average Buy"]) | (df["Current Price"] < df["Last Buy"])
+    return np.where(below, "color: red;", "color: black;")
+
+# Display formatting, applied once at render time; the data itself stays numeric
+PORTFOLIO_FORMATTERS = {
+    "Average Buy": "{:.2f}".format,
+    "Last Buy": "{:.2f}".format,
+    "Current Price": format_currency,
+    "Change": format_currency,
+    "Change %": "{:.2f}%".format,
+    "52W High": format_currency,
+    "52W Low": format_currency,
+    "Distance from 52W High %": "{:.2f}%".format,
+    "Distance from 52W Low %": "{:.2f}%".format,
+    "Price Difference": "{:.2f}".format,
+    "Total Gain %": "{:.2f}".format,
+    "Years": "{:.1f}".format,
+    "Annualized Gain %": "{:.2f}".format,
+    "XIRR %": "{:.2f}".format,
+}
+
+def style_portfolio(df):
+    return (
+        df.style
+        .format(PORTFOLIO_FORMATTERS, na_rep="N/A")
+        .apply(lambda _: current_price_colors(df), subset=["Current Price"])
+        .hide(axis="index")
+    )
 
 
 def process_symbols(symbols, stock_data):
     # Generate snapshot
-    portfolio_df, summary, message = generate_portfolio_snapshot(symbols, stock_data)
+    with stage("generate_portfolio_snapshot"):
+        portfolio_df, summary, message = generate_portfolio_snapshot(symbols, stock_data)
 
     if message != "success":
         st.error(message)
     else:
-        portfolio_data = pd.DataFrame(portfolio_df)
-
-        # Apply calculations and get the modified DataFrame
-        df = calculate_gain_loss(portfolio_df)
-
-        # Option 1: Assign the calculated columns from df to portfolio_data
-        portfolio_data["Price Difference"] = df["Price Difference"]
-        portfolio_data["Total Gain %"] = df["Total Gain %"]
-        portfolio_data["Years"] = df["Years"]
-        portfolio_data["Annualized Gain %"] = df["Annualized Gain %"]
-
-        # Apply formatting for display, separate from calculations
-        # portfolio_df["Current Price"] = portfolio_df.apply(lambda row: color_current_price(row["Current Price"], row["Last Buy"]), axis=1)
-        # portfolio_df["Current Price"] = portfolio_df["Current Price"].apply(lambda x: f'<span style="color: red;">₹{x}</span>' if x < row["Last Buy"] else f'<span style="color: black;">₹{x}</span>')
-
-        portfolio_df["Current Price"] = portfolio_df.apply(
-                lambda row: color_current_price(row["Current Price"], row["Average Buy"], row["Last Buy"]), axis=1
-        )
-        
+        # Apply calculations; all columns stay numeric until the table is rendered
+        with stage("calculate_gain_loss"):
+            portfolio_df = calculate_gain_loss(portfolio_df)
+        with stage("xirr"):
+            portfolio_df = add_xirr(portfolio_df, summary)
 
         # # Display DataFrame with Streamlit
         # st.markdown(
@@ -334,7 +346,7 @@ def process_symbols(symbols, stock_data):
 
         # Display summary metrics
         st.subheader("Portfolio Summary")
-        col1, col2, col3 = st.columns(3)
+        col1, col2, col3, col4 = st.columns(4)
 
         with col1:
             st.metric(
@@ -350,12 +362,18 @@ def process_symbols(symbols, stock_data):
         with col3:
             st.metric("Worst Performer", summary['Worst Performer'])
 
+        with col4:
+            portfolio_xirr = summary['Portfolio XIRR %']
+            st.metric("Portfolio XIRR", "N/A" if np.isnan(portfolio_xirr) else f"{portfolio_xirr:.2f}%")
+
         # Display timestamp
         st.caption(f"Last Updated: {summary['Timestamp']}")
 
         # Display invalid symbols if any
         if 'Invalid Symbols' in summary and summary['Invalid Symbols']:
-            st.warning(f"Unable to fetch data for the following symbols: {', '.join(summary['Invalid Symbols'])}")
+            st.warning(f"No market data found for these symbols (check for typos): {', '.join(summary['Invalid Symbols'])}")
+        if summary.get('Unavailable Symbols'):
+            st.info(f"Quotes temporarily unavailable, will retry on the next refresh: {', '.join(summary['Unavailable Symbols'])}")
 
         # # Display portfolio table
         # st.subheader("Portfolio Details")
@@ -393,7 +411,8 @@ def process_symbols(symbols, stock_data):
         # )
 
         # Display DataFrame with Streamlit
-        st.markdown(
-            portfolio_df.to_html(escape=False, index=False), unsafe_allow_html=True
-        )
+        with stage("style_portfolio"):
+            portfolio_html = style_portfolio(portfolio_df).to_html()
+        with stage("render_table"):
+            st.markdown(portfolio_html, unsafe_allow_html=True)
 
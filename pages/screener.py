@@ -0,0 +1,84 @@
+import streamlit as st
+from profiling import stage
+from screener import ALL_STORED, list_universes, load_universe, screen_universe
+from utils import format_currency
+
+# Display formatting, applied at render time; the data itself stays numeric
+SCREENER_FORMATTERS = {
+    "Price": format_currency,
+    "MA50": format_currency,
+    "MA200": format_currency,
+    "RSI": "{:.1f}".format,
+    "52W High": format_currency,
+    "52W Low": format_currency,
+    "P/E": "{:.2f}".format,
+    "Sector P/E": "{:.2f}".format,
+    "EPS": "{:.2f}".format,
+    "ROE %": "{:.2f}%".format,
+    "Dividend Yield %": "{:.2f}%".format,
+}
+
+def show():
+    pagecontent()
+
+def pagecontent():
+    st.subheader("🔎 Stock Screener")
+    st.markdown("""
+        Rank a whole universe by the Stock Insight pros & cons (score = pros - cons).
+        Screens read stored prices and fundamentals only; refresh them with
+        `python cli.py screen --universe <name> --refresh`.
+    """)
+    screener_form()
+
+@st.fragment
+def screener_form():
+    """Screener controls and results; changing a filter reruns only this fragment."""
+    universes = list_universes()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        universe = st.selectbox(
+            "Universe", universes, key="screener_universe",
+            format_func=lambda name: "All stored symbols" if name == ALL_STORED else name.upper()
+        )
+
+    with stage("screen_universe"):
+        try:
+            symbols = load_universe(universe)
+        except ValueError as e:
+            st.error(str(e))
+            return
+        df, summary, message = screen_universe(symbols)
+
+    if message != "success":
+        st.warning(message)
+        return
+
+    with col2:
+        sectors = ["All"] + sorted(df['Sector'].dropna().unique())
+        sector = st.selectbox("Sector", sectors, key="screener_sector")
+    with col3:
+        # Fixed bounds, so a score chosen for one universe stays valid for the next
+        min_score = st.slider("Minimum score", -10, 10, key="screener_min_score")
+
+    results = df[df['Score'] >= min_score]
+    if sector != "All":
+        results = results[results['Sector'] == sector]
+
+    st.caption(f"{len(results)} of {summary['Screened']} screened symbols match "
+               f"({summary['Universe']} in universe). Screened at {summary['Timestamp']}.")
+    if summary['Rules Warning']:
+        st.warning(summary['Rules Warning'])
+    if summary['Missing Prices']:
+        st.info(f"No stored prices yet, refresh the universe to include: "
+                f"{', '.join(symbol.replace('.NS', '') for symbol in summary['Missing Prices'])}")
+
+    st.dataframe(
+        results.style.format(SCREENER_FORMATTERS, na_rep="N/A").hide(axis="index"),
+        hide_index=True
+    )
+    st.download_button(
+        label="Download Screener Results",
+        data=results.to_csv(index=False),
+        file_name=f"screener_{universe}.csv",
+        mime="text/csv"
+    )
@@ -0,0 +1,72 @@
+"""Portfolio return calculations shared by the Streamlit page and the command-line tool."""
+from datetime import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from ledger import get_ledger, DEFAULT_ACCOUNT, QUANTITY_EPSILON
+from xirr import transaction_cashflows, xirr
+
+
+def calculate_gain_loss(df):
+    today = pd.Timestamp(dt.today())
+
+    # Work on whole columns as float arrays instead of row by row
+    last_buy_price = df["Last Buy"].to_numpy(dtype=float)
+    current_price = df["Current Price"].to_numpy(dtype=float)
+
+    # Missing or unparsable Last Buy Dates become NaT and propagate NaN below
+    buy_date = pd.to_datetime(df["Last Buy Date"], format="%Y-%m-%d", errors="coerce")
+    years_held = ((today - buy_date).dt.days / 365.25).to_numpy(dtype=float)  # Account for leap years
+
+    # Price difference
+    price_difference = current_price - last_buy_price
+    price_difference[np.isnan(years_held)] = np.nan
+
+    # Percentage gain/loss
+    percentage_gain = (price_difference / last_buy_price) * 100
+
+    # Compound over holdings older than a year, otherwise report the plain gain
+    with np.errstate(divide="ignore", invalid="ignore"):
+        compounded = ((1 + (percentage_gain / 100)) ** (1 / years_held) - 1) * 100
+    annualized_return = np.where(years_held >= 1, compounded, percentage_gain)
+
+    # Values stay unrounded floats; rounding happens at display time (see PORTFOLIO_FORMATTERS)
+    df["Price Difference"] = price_difference
+    df["Total Gain %"] = percentage_gain
+    df["Years"] = years_held
+    df["Annualized Gain %"] = annualized_return
+    return df
+
+
+def add_xirr(df, summary, account=DEFAULT_ACCOUNT):
+    """Add a cashflow-based "XIRR %" column and portfolio XIRR from the ledger's transactions.
+
+    Symbols without transactions get NaN; open positions are valued at the
+    snapshot's Current Price as of today. The portfolio XIRR also includes
+    the realized cashflows of fully sold symbols. Symbols seeded from legacy
+    holdings have made-up quantities and dates, so they get NaN and are
+    left out of the portfolio XIRR.
+    """
+    transactions = get_ledger().transactions(account=account)
+    seeded = transactions.loc[transactions["Seeded"], "Symbol"].unique()
+    transactions = transactions[~transactions["Symbol"].isin(seeded)]
+    quantity = transactions["Quantity"].to_numpy(dtype=float)
+    held = pd.Series(np.where(transactions["Side"] == "BUY", quantity, -quantity),
+                     index=transactions["Symbol"].to_numpy()).groupby(level=0).sum()
+    closed = held.index[held <= QUANTITY_EPSILON]
+    # Open positions outside the snapshot have no price here, so they're left out
+    transactions = transactions[transactions["Symbol"].isin(df["Symbol"]) | transactions["Symbol"].isin(closed)]
+    if transactions.empty:
+        df["XIRR %"] = np.nan
+        summary["Portfolio XIRR %"] = np.nan
+        return df
+
+    today = pd.Timestamp(dt.today()).normalize()
+    prices = pd.Series(df["Current Price"].to_numpy(dtype=float), index=df["Symbol"])
+    # A symbol can appear on several rows; value its holding once, at the last row's price
+    prices = prices[~prices.index.duplicated(keep="last")]
+    cashflows = transaction_cashflows(transactions, prices, as_of=today)
+    df["XIRR %"] = df["Symbol"].map(xirr(cashflows, as_of=today)).to_numpy(dtype=float) * 100
+    summary["Portfolio XIRR %"] = xirr(cashflows, by=None, as_of=today).iloc[0] * 100
+    return df
@@ -0,0 +1,97 @@
+"""Shared in-memory quote snapshot and the background thread that keeps it warm.
+
+The snapshot is process-wide, so every Streamlit session reads the same
+entries and upstream traffic depends on the watched symbols and the refresh
+schedule, not on the number of viewers. What to refresh and when is decided
+by the caller (``utils``), which passes a ``refresh`` and a ``next_delay``
+function to ``Prefetcher``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class QuoteSnapshot:
+    """Latest quote info and daily history per symbol, stamped with when they were fetched."""
+
+    def __init__(self):
+        self._quotes: Dict[str, Tuple[dict, float]] = {}
+        self._histories: Dict[str, Tuple[pd.DataFrame, float]] = {}
+        self._lock = threading.Lock()
+
+    def put_quote(self, symbol: str, info: dict):
+        with self._lock:
+            self._quotes[symbol] = (info, time.time())
+
+    def quote(self, symbol: str, since: float) -> Optional[dict]:
+        """A copy of the stored info if fetched at or after ``since`` (epoch seconds), else None."""
+        with self._lock:
+            entry = self._quotes.get(symbol)
+        if entry is None or entry[1] < since:
+            return None
+        return dict(entry[0])
+
+    def put_history(self, symbol: str, hist: pd.DataFrame):
+        with self._lock:
+            self._histories[symbol] = (hist.copy(), time.time())
+
+    def history(self, symbol: str, since: float) -> Optional[pd.DataFrame]:
+        """A copy of the stored bars if fetched at or after ``since``, else None."""
+        with self._lock:
+            entry = self._histories.get(symbol)
+        if entry is None or entry[1] < since:
+            return None
+        return entry[0].copy()
+
+
+class Prefetcher:
+    """Daemon thread that calls ``refresh()`` and then sleeps ``next_delay()`` seconds, repeatedly.
+
+    ``start`` is idempotent, so it can be called on every script rerun.
+    ``wake`` cuts the current sleep short, e.g. after new symbols are watched.
+    """
+
+    def __init__(self, refresh: Callable[[], None], next_delay: Callable[[], float], name: str = "quote-prefetch"):
+        self.refresh = refresh
+        self.next_delay = next_delay
+        self.name = name
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Start the thread unless it is running; returns True if it was started."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                print("Error refreshing prefetched quotes:", e)
+            try:
+                delay = self.next_delay()
+            except Exception as e:
+                print("Error scheduling quote prefetch:", e)
+                delay = 60
+            self._wake.wait(timeout=max(delay, 1))
+            self._wake.clear()
@@ -0,0 +1,179 @@
+"""Per-stage wall-time and upstream-call instrumentation for page renders.
+
+A render is wrapped in ``profile(page)``; code anywhere below it (including
+``utils``) marks stages with ``stage(name)``, which is a no-op when no profile
+is active. Stages nest, so ``get_stock_data/indicators`` is reported under its
+parent. ``count_upstream(kind)`` attributes real network calls to the
+caller's stage and its parents. Work submitted through ``submit`` or
+``map_in_context`` keeps the caller's profile and stage, so calls made on the
+fetch pool are counted too.
+
+Logging is opt-in. With ``STOCKINSIGHT_TIMING_LOG`` set, every finished
+profile is appended as one JSON line to that file; sessions passed to
+``log_session`` (``?debug=1``) are logged to ``<cache dir>/render_timings.jsonl``
+when it isn't set. The log rotates at ``TIMING_LOG_MAX_BYTES``.
+"""
+import contextvars
+import datetime
+import json
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from history_store import CACHE_DIR
+
+TIMING_LOG = os.environ.get("STOCKINSIGHT_TIMING_LOG", "")
+# Where debug sessions are logged when STOCKINSIGHT_TIMING_LOG isn't set
+DEBUG_TIMING_LOG = os.path.join(CACHE_DIR, "render_timings.jsonl")
+TIMING_LOG_MAX_BYTES = 5 * 1024 * 1024
+TIMING_LOG_BACKUPS = 2
+
+# Sessions whose renders are logged even without STOCKINSIGHT_TIMING_LOG
+_debug_sessions = set()
+# Log path -> RotatingFileHandler, opened on first write
+_log_handlers = {}
+_log_lock = threading.Lock()
+
+_current_profile = contextvars.ContextVar('render_profile', default=None)
+_stage_path = contextvars.ContextVar('render_stage_path', default=())
+
+
+class RenderProfile:
+    """Accumulated stage timings and upstream call counts for one page render."""
+
+    def __init__(self, page: str, session: Optional[str] = None):
+        self.page = page
+        self.session = session
+        self.started_at = datetime.datetime.now(datetime.timezone.utc)
+        self.total_seconds = 0.0
+        self.upstream = Counter()
+        self._stages: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, path: str) -> Dict:
+        return self._stages.setdefault(path, {'stage': path, 'seconds': 0.0, 'count': 0, 'upstream_calls': Counter()})
+
+    def _record(self, path: str, seconds: float):
+        with self._lock:
+            entry = self._entry(path)
+            entry['seconds'] += seconds
+            entry['count'] += 1
+
+    def _count(self, path: tuple, kind: str):
+        # Attribute the call to the caller's stage and each of its parents
+        with self._lock:
+            self.upstream[kind] += 1
+            for depth in range(1, len(path) + 1):
+                self._entry("/".join(path[:depth]))['upstream_calls'][kind] += 1
+
+    @property
+    def stages(self) -> List[Dict]:
+        """Stage records in first-entered order, with upstream counts as plain dicts."""
+        with self._lock:
+            return [{**entry, 'upstream_calls': dict(entry['upstream_calls'])} for entry in self._stages.values()]
+
+    def to_record(self) -> Dict:
+        return {
+            'ts': self.started_at.isoformat(),
+            'page': self.page,
+            'session': self.session,
+            'total_seconds': self.total_seconds,
+            'upstream_calls': dict(self.upstream),
+            'stages': self.stages,
+        }
+
+
+def log_session(session: str):
+    """Log the renders of ``session`` too, e.g. one opened with ``?debug=1``."""
+    _debug_sessions.add(session)
+
+
+def _write_record(path: str, record: Dict):
+    import logging
+    from logging.handlers import RotatingFileHandler
+
+    with _log_lock:
+        handler = _log_handlers.get(path)
+        if handler is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=TIMING_LOG_MAX_BYTES,
+                                          backupCount=TIMING_LOG_BACKUPS, encoding="utf-8")
+            _log_handlers[path] = handler
+    handler.handle(logging.makeLogRecord({'msg': json.dumps(record)}))
+
+
+@contextmanager
+def profile(page: str, session: Optional[str] = None, log_path: Optional[str] = None):
+    """Profile everything run inside the block and append the result to the timing log, if enabled."""
+    render = RenderProfile(page, session)
+    token = _current_profile.set(render)
+    start = time.perf_counter()
+    try:
+        yield render
+    finally:
+        render.total_seconds = time.perf_counter() - start
+        _current_profile.reset(token)
+        path = log_path
+        if path is None:
+            path = TIMING_LOG or (DEBUG_TIMING_LOG if session in _debug_sessions else "")
+        if path:
+            try:
+                _write_record(path, render.to_record())
+            except OSError as e:
+                print("Error writing render timing log:", e)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a named stage of the active profile; does nothing outside ``profile``."""
+    render = _current_profile.get()
+    if render is None:
+        yield
+        return
+
+    path = _stage_path.get() + (name,)
+    token = _stage_path.set(path)
+    with render._lock:
+        render._entry("/".join(path))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _stage_path.reset(token)
+        render._record("/".join(path), elapsed)
+
+
+@contextmanager
+def section(page: str, name: str, session: Optional[str] = None):
+    """Stage ``name`` of the active profile, or a profile of its own (``page/name``) otherwise.
+
+    Meant for Streamlit fragments, which run inside the page's profile on a
+    full rerun but alone when only the fragment reruns.
+    """
+    if _current_profile.get() is not None:
+        with stage(name):
+            yield
+    else:
+        with profile(f"{page}/{name}", session=session):
+            yield
+
+
+def count_upstream(kind: str):
+    """Record one real upstream request (e.g. 'info', 'history') against the active profile."""
+    render = _current_profile.get()
+    if render is not None:
+        render._count(_stage_path.get(), kind)
+
+
+def submit(executor, fn, *args, **kwargs):
+    """``executor.submit`` that runs ``fn`` in a copy of the caller's context."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def map_in_context(executor, fn, items):
+    """``executor.map`` that runs each call in a copy of the caller's context."""
+    return [future.result() for future in [submit(executor, fn, item) for item in items]]
@@ -0,0 +1,285 @@
+"""Market data providers: the live Yahoo Finance backend and an offline replay backend.
+
+Everything in ``utils`` that needs upstream data goes through ``get_provider()``.
+The backend is chosen with the ``STOCKINSIGHT_PROVIDER`` environment variable:
+
+    STOCKINSIGHT_PROVIDER=yfinance              (default)
+    STOCKINSIGHT_PROVIDER=replay:/path/to/dir   serve recorded payloads
+    STOCKINSIGHT_PROVIDER=record:/path/to/dir   fetch live and record payloads
+
+``STOCKINSIGHT_REPLAY_LATENCY`` and ``STOCKINSIGHT_REPLAY_JITTER`` (seconds)
+add artificial per-call latency to the replay backend.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_TZ = 'Asia/Kolkata'
+
+# Ticker.info keys a quote carries; P/E, EPS, shares outstanding etc. come with the fundamentals
+QUOTE_FIELDS = (
+    'regularMarketPrice',
+    'regularMarketPreviousClose',
+    'regularMarketOpen',
+    'dayHigh',
+    'dayLow',
+    'fiftyTwoWeekHigh',
+    'fiftyTwoWeekLow',
+    'volume',
+    'currency',
+)
+
+
+class MarketDataProvider:
+    """Interface for an upstream source of quote info and daily history."""
+
+    def info(self, symbol: str) -> dict:
+        """Return the quote/fundamentals payload (Yahoo ``Ticker.info`` shape)."""
+        raise NotImplementedError
+
+    def quote(self, symbol: str) -> dict:
+        """Return just the price fields (``QUOTE_FIELDS``, keyed like ``info``).
+
+        Backends without a lighter call derive it from ``info``.
+        """
+        info = self.info(symbol)
+        return {key: info[key] for key in QUOTE_FIELDS if key in info}
+
+    def history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        """Return daily OHLCV bars for a yfinance ``period`` or from ``start`` (ISO date)."""
+        raise NotImplementedError
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Live data from Yahoo Finance via yfinance."""
+
+    def info(self, symbol: str) -> dict:
+        import yfinance as yf
+        return yf.Ticker(symbol).info
+
+    def quote(self, symbol: str) -> dict:
+        # One chart request (five daily bars and their metadata) instead of the full quoteSummary.
+        # fast_info would issue a separate download for several of its attributes.
+        import yfinance as yf
+        from yfinance.exceptions import YFTzMissingError
+
+        ticker = yf.Ticker(symbol)
+        try:
+            # Without raise_errors yfinance logs request failures and returns an empty frame,
+            # which would look like an unknown symbol. Yahoo's own "no prices" answer raises
+            # YFPricesMissingError, which upstream treats as not found.
+            # Unadjusted bars: on an ex-dividend day adjusted closes understate the previous close
+            hist = ticker.history(period="5d", auto_adjust=False, raise_errors=True)
+        except YFTzMissingError:
+            # Also raised when yfinance swallowed a failed timezone request, so not definitive:
+            # answer without a price, which upstream doesn't negative-cache on the quote path
+            return {}
+        if hist.empty:
+            return {}
+        metadata = ticker.history_metadata or {}
+        last = hist.iloc[-1]
+
+        # Ticker.info key -> candidate sources, tried in order
+        sources = {
+            'regularMarketPrice': (lambda: metadata['regularMarketPrice'], lambda: last['Close']),
+            'regularMarketPreviousClose': (lambda: metadata['regularMarketPreviousClose'], lambda: hist['Close'].iloc[-2],
+                                           lambda: metadata['chartPreviousClose']),
+            'regularMarketOpen': (lambda: last['Open'],),
+            'dayHigh': (lambda: metadata['regularMarketDayHigh'], lambda: last['High']),
+            'dayLow': (lambda: metadata['regularMarketDayLow'], lambda: last['Low']),
+            'fiftyTwoWeekHigh': (lambda: metadata['fiftyTwoWeekHigh'],),
+            'fiftyTwoWeekLow': (lambda: metadata['fiftyTwoWeekLow'],),
+            'volume': (lambda: metadata['regularMarketVolume'], lambda: last['Volume']),
+            'currency': (lambda: metadata['currency'],),
+        }
+        quote = {}
+        for key in QUOTE_FIELDS:
+            for source in sources[key]:
+                try:
+                    value = source()
+                    value = value if isinstance(value, str) else float(value)
+                except Exception:
+                    # A missing or malformed field shouldn't cost the rest of the quote
+                    continue
+                if value == value:
+                    quote[key] = value
+                    break
+        return quote
+
+    def history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        import yfinance as yf
+        if start is not None:
+            return yf.Ticker(symbol).history(start=start)
+        return yf.Ticker(symbol).history(period=period or "1mo")
+
+
+def _symbol_dir(root: str, symbol: str) -> str:
+    # '^NSEI' and friends are valid directory names, but keep the layout portable
+    return os.path.join(root, symbol.replace('^', '_'))
+
+
+def _period_start(last: pd.Timestamp, period: Optional[str]) -> Optional[pd.Timestamp]:
+    """Translate a yfinance period string ('5d', '6mo', '1y', 'ytd', 'max') into a start date."""
+    import pandas as pd
+
+    if period in (None, 'max'):
+        return None
+    if period == 'ytd':
+        return last.replace(month=1, day=1)
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    count, unit = int(match.group(1)), match.group(2)
+    offsets = {'d': pd.DateOffset(days=count), 'wk': pd.DateOffset(weeks=count),
+               'mo': pd.DateOffset(months=count), 'y': pd.DateOffset(years=count)}
+    return last - offsets[unit]
+
+
+class ReplayProvider(MarketDataProvider):
+    """Serve recorded payloads from ``<root>/<symbol>/{info.json,history.csv}``.
+
+    With ``shift_to_today`` the recorded bars are moved forward so the last
+    one falls on the most recent weekday, keeping old recordings usable with
+    date-relative lookups. ``latency`` plus a uniform ``jitter`` is slept on
+    every call to mimic network round-trips.
+    """
+
+    def __init__(self, root: str, latency: float = 0.0, jitter: float = 0.0, shift_to_today: bool = True):
+        self.root = root
+        self.latency = latency
+        self.jitter = jitter
+        self.shift_to_today = shift_to_today
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def _sleep(self):
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def info(self, symbol: str) -> dict:
+        self._sleep()
+        path = os.path.join(_symbol_dir(self.root, symbol), "info.json")
+        if not os.path.exists(path):
+            # Mirrors Yahoo's answer for an unknown symbol: a payload without prices
+            return {'trailingPegRatio': None}
+        with open(path) as f:
+            return json.load(f)
+
+    def _load_history(self, symbol: str) -> pd.DataFrame:
+        import numpy as np
+        import pandas as pd
+
+        with self._lock:
+            if symbol in self._frames:
+                return self._frames[symbol]
+
+        path = os.path.join(_symbol_dir(self.root, symbol), "history.csv")
+        if not os.path.exists(path):
+            frame = pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits'],
+                                 index=pd.DatetimeIndex([], name='Date', tz=DEFAULT_TZ), dtype=float)
+        else:
+            frame = pd.read_csv(path, index_col='Date')
+            frame.index = pd.DatetimeIndex(pd.to_datetime(frame.index), name='Date').tz_localize(DEFAULT_TZ)
+            if self.shift_to_today and not frame.empty:
+                target = datetime.date.today()
+                while target.weekday() >= 5:
+                    target -= datetime.timedelta(days=1)
+                shift = np.busday_count(frame.index[-1].date(), target)
+                if shift > 0:
+                    frame.index = pd.DatetimeIndex(frame.index + pd.offsets.BDay(shift), name='Date')
+
+        with self._lock:
+            self._frames[symbol] = frame
+        return frame
+
+    def history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        import pandas as pd
+
+        self._sleep()
+        frame = self._load_history(symbol)
+        if frame.empty:
+            return frame.copy()
+        if start is not None:
+            begin = pd.Timestamp(start, tz=DEFAULT_TZ)
+        else:
+            begin = _period_start(frame.index[-1], period or "1mo")
+        return (frame if begin is None else frame[frame.index >= begin]).copy()
+
+
+class RecordingProvider(MarketDataProvider):
+    """Pass calls through to another provider and save what it returns in replay layout."""
+
+    def __init__(self, root: str, upstream: Optional[MarketDataProvider] = None):
+        self.root = root
+        self.upstream = upstream or YFinanceProvider()
+
+    def info(self, symbol: str) -> dict:
+        info = self.upstream.info(symbol)
+        directory = _symbol_dir(self.root, symbol)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "info.json"), "w") as f:
+            json.dump(info, f, default=str)
+        return info
+
+    def history(self, symbol: str, period: Optional[str] = None, start: Optional[str] = None) -> pd.DataFrame:
+        import pandas as pd
+
+        hist = self.upstream.history(symbol, period=period, start=start)
+        directory = _symbol_dir(self.root, symbol)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, "history.csv")
+
+        recorded = hist.copy()
+        if recorded.index.tz is not None:
+            recorded.index = recorded.index.tz_localize(None)
+        if os.path.exists(path):
+            # Merge with earlier recordings so delta refreshes extend the file
+            previous = pd.read_csv(path, index_col='Date', parse_dates=['Date'])
+            recorded = pd.concat([previous[~previous.index.isin(recorded.index)], recorded]).sort_index()
+        recorded.index.name = 'Date'
+        recorded.to_csv(path)
+        return hist
+
+
+_provider: Optional[MarketDataProvider] = None
+
+
+def _provider_from_env() -> MarketDataProvider:
+    spec = os.environ.get("STOCKINSIGHT_PROVIDER", "yfinance")
+    kind, _, root = spec.partition(":")
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if kind == "replay" and root:
+        return ReplayProvider(
+            root,
+            latency=float(os.environ.get("STOCKINSIGHT_REPLAY_LATENCY", 0)),
+            jitter=float(os.environ.get("STOCKINSIGHT_REPLAY_JITTER", 0)),
+        )
+    if kind == "record" and root:
+        return RecordingProvider(root)
+    raise ValueError(f"Unknown STOCKINSIGHT_PROVIDER: {spec}")
+
+
+def get_provider() -> MarketDataProvider:
+    """Return the active provider, configured from the environment on first use."""
+    global _provider
+    if _provider is None:
+        _provider = _provider_from_env()
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider):
+    """Replace the active provider, e.g. with a ReplayProvider for offline runs."""
+    global _provider
+    _provider = provider
@@ -0,0 +1,171 @@
+"""Universe-wide stock screener over the local data stores.
+
+Applies the pros & cons rules of the stock page (``data/insight_rules.json``)
+to every symbol of a universe (NIFTY 50, NIFTY 500, every stored NSE equity, ...) at once. Inputs
+are the fundamentals table and a close-price matrix read from the bar store
+with one query each; indicators come from one vectorized pass
+(``indicators.latest_indicators``). Screening makes no network calls.
+
+``refresh_universe`` fills the stores beforehand through the same
+rate-limited upstream layer as the app, e.g. from an end-of-day job:
+
+    python cli.py screen --universe nifty50 --refresh
+"""
+from __future__ import annotations
+
+import datetime
+import os
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from cache import ttl_lru_cache
+from fundamentals import get_fundamentals_store
+from history_store import get_history_store
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# One symbols file per universe: data/universes/<name>.txt
+UNIVERSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "universes")
+# Pseudo-universe of every symbol in the fundamentals store
+ALL_STORED = "all"
+# Calendar days of closes behind the indicators, as for the stock page ('1y')
+SCREEN_HISTORY_DAYS = 365
+# How long a scored universe is reused across reruns and filter changes
+SCREEN_CACHE_SECONDS = 60
+
+# Screener column -> Ticker.info key of the fundamentals row
+FUNDAMENTAL_COLUMNS = {
+    'Name': 'longName',
+    'Sector': 'sector',
+    'P/E': 'trailingPE',
+    'EPS': 'trailingEps',
+    'ROE %': 'returnOnEquity',
+    'Dividend Yield %': 'dividendYield',
+}
+RESULT_COLUMNS = ['Rank', 'Symbol', 'Name', 'Sector', 'Score', 'Pros', 'Cons', 'Price', 'As Of',
+                  'MA50', 'MA200', 'RSI', '52W High', '52W Low', 'P/E', 'Sector P/E', 'EPS', 'ROE %',
+                  'Dividend Yield %']
+
+
+def list_universes() -> List[str]:
+    """Names of the bundled universes, plus ``ALL_STORED``."""
+    names = sorted(name[:-4] for name in os.listdir(UNIVERSE_DIR) if name.endswith('.txt')) \
+        if os.path.isdir(UNIVERSE_DIR) else []
+    return names + [ALL_STORED]
+
+
+def load_universe(name: str) -> List[str]:
+    """Yahoo symbols of a universe name (see ``list_universes``) or symbols file path."""
+    from cli import read_symbols_file
+    from utils import to_yahoo_symbol
+
+    if name == ALL_STORED:
+        return get_fundamentals_store().frame()['Symbol'].tolist()
+    path = name if os.path.isfile(name) else os.path.join(UNIVERSE_DIR, f"{name}.txt")
+    if not os.path.isfile(path):
+        raise ValueError(f"Unknown universe '{name}'; choose from {', '.join(list_universes())}")
+    return list(dict.fromkeys(to_yahoo_symbol(symbol) for symbol in read_symbols_file(path)))
+
+
+def refresh_universe(symbols: List[str]) -> Dict[str, str]:
+    """Bring stored fundamentals and one year of bars up to date for ``symbols``.
+
+    Uses ``get_fundamentals`` and ``load_history``, so fresh entries are
+    skipped and every request goes through the rate limiter. Returns
+    {symbol: error message} for the symbols that failed.
+    """
+    from utils import _fetch_pool, get_fundamentals, load_history
+    from profiling import map_in_context
+
+    def refresh(symbol):
+        try:
+            get_fundamentals(symbol)
+            load_history(symbol, period="1y")
+            return None
+        except Exception as e:
+            return str(e) or type(e).__name__
+
+    errors = map_in_context(_fetch_pool, refresh, symbols)
+    _scored_universe.cache_clear()
+    return {symbol: error for symbol, error in zip(symbols, errors) if error is not None}
+
+
+@ttl_lru_cache(maxsize=8, ttl=SCREEN_CACHE_SECONDS)
+def _scored_universe(symbols: Tuple[str, ...]) -> Tuple[pd.DataFrame, Dict]:
+    """Indicators, fundamentals and pros/cons counts per stored symbol, with coverage details."""
+    import pandas as pd
+    from indicators import latest_indicators
+    from insight_rules import get_insight_rules
+    from utils import INSIGHT_INFO_FIELDS, insight_fields
+
+    closes = get_history_store().closes(symbols, days=SCREEN_HISTORY_DAYS)
+    if closes.empty:
+        return pd.DataFrame(), {}
+
+    names = list(closes.columns)
+    data = latest_indicators(names, closes.to_numpy(dtype=float).T)
+    data = data.rename(columns={'Close': 'Price'})
+    # Date of each symbol's last close, which may predate the matrix's last row
+    data['As Of'] = closes.notna().iloc[::-1].idxmax().dt.date
+
+    fundamentals = get_fundamentals_store().frame(names).set_index('Symbol').reindex(data.index)
+
+    # Same fields and rules as the stock page's pros & cons, for every symbol at once
+    inputs = pd.DataFrame({
+        'price': data['Price'], 'MA50': data['MA50'], 'MA200': data['MA200'], 'RSI': data['RSI'],
+        'fiftyTwoWeekHigh': data['52W High'], 'fiftyTwoWeekLow': data['52W Low'], 'sector': fundamentals['sector'],
+        **{key: fundamentals[key] for key in INSIGHT_INFO_FIELDS if key not in ('fiftyTwoWeekHigh', 'fiftyTwoWeekLow')},
+    })
+    fields = insight_fields(inputs)
+    rules, rules_warning = get_insight_rules()
+    data['Pros'], data['Cons'] = rules.counts(fields)
+    data['Sector P/E'] = fields['sector_pe']
+
+    for column, key in FUNDAMENTAL_COLUMNS.items():
+        data[column] = fundamentals[key]
+    data['ROE %'] = data['ROE %'] * 100
+    data['Dividend Yield %'] = data['Dividend Yield %'] * 100
+    data['Name'] = data['Name'].fillna(pd.Series(data.index.str.replace('.NS', ''), index=data.index))
+
+    data['Score'] = data['Pros'] - data['Cons']
+
+    summary = {
+        'Universe': len(symbols),
+        'Screened': len(data),
+        'Missing Prices': [symbol for symbol in symbols if symbol not in closes.columns],
+        'Missing Fundamentals': fundamentals.index[fundamentals['fetched_at'].isna()].tolist(),
+        'Timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'Rules Warning': rules_warning,
+    }
+    return data, summary
+
+
+def screen_universe(symbols: List[str], sector: Optional[str] = None,
+                    min_score: Optional[int] = None) -> Tuple[Optional[pd.DataFrame], Dict, str]:
+    """Rank ``symbols`` by pros minus cons, from stored closes and fundamentals only.
+
+    Returns (ranked frame, coverage summary, message). The price is the last
+    stored close and the 52-week range comes from stored closes, so a screen
+    reflects the last refresh rather than the live quote. Scores are reused
+    for ``SCREEN_CACHE_SECONDS``, so changing the filters doesn't re-read the stores.
+    """
+    import numpy as np
+
+    try:
+        data, summary = _scored_universe(tuple(dict.fromkeys(symbols)))
+        if data.empty:
+            return None, {}, "No stored prices for this universe; refresh it first"
+
+        if sector:
+            data = data[data['Sector'] == sector]
+        if min_score is not None:
+            data = data[data['Score'] >= min_score]
+
+        data = data.reset_index()
+        data['Symbol'] = data['Symbol'].str.replace('.NS', '')
+        data = data.sort_values(['Score', 'Pros', 'Symbol'], ascending=[False, False, True], ignore_index=True)
+        data.insert(0, 'Rank', np.arange(1, len(data) + 1))
+        return data[RESULT_COLUMNS], summary, "success"
+
+    except Exception as e:
+        return None, {}, f"Error screening universe: {str(e)}"
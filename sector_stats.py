@@ -0,0 +1,157 @@
+"""Sector and industry aggregates (mean and median P/E, P/B, ROE) over stored fundamentals.
+
+Built once from the fundamentals table, then kept current one symbol at a
+time: each group holds its values in sorted order plus a running sum, so a
+refresh of one symbol's fundamentals costs a sorted-list insert and delete per
+group (linear in the group size, a few hundred at most) and a lookup is O(1). Puts in this process arrive through ``FundamentalsStore.subscribe``;
+rows written by other processes (e.g. ``cli.py screen --refresh``) are
+picked up by a sync at most every ``SYNC_SECONDS``.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from fundamentals import FundamentalsStore, get_fundamentals_store
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Ticker.info key -> label of the aggregated metric
+STAT_FIELDS = {
+    'trailingPE': 'P/E',
+    'priceToBook': 'P/B',
+    'returnOnEquity': 'ROE',
+}
+LEVELS = ('sector', 'industry')
+STATS = ('mean', 'median')
+# Groups with fewer values than this report no aggregate; one or two stocks aren't a benchmark
+MIN_GROUP_SIZE = 5
+# Seconds between checks for rows written by other processes
+SYNC_SECONDS = 60
+
+
+class _Aggregate:
+    """Sorted values with a running sum: O(n) add/remove (a bisection, then a list shift), O(1) mean and median."""
+
+    def __init__(self):
+        self.values: List[float] = []
+        self.total = 0.0
+
+    def add(self, value: float):
+        bisect.insort(self.values, value)
+        self.total += value
+
+    def remove(self, value: float):
+        index = bisect.bisect_left(self.values, value)
+        del self.values[index]
+        self.total -= value
+
+    def stat(self, name: str) -> float:
+        count = len(self.values)
+        if name == 'mean':
+            return self.total / count
+        middle = count // 2
+        return self.values[middle] if count % 2 else (self.values[middle - 1] + self.values[middle]) / 2
+
+
+def _valid(value) -> bool:
+    return isinstance(value, (int, float)) and value == value
+
+
+class SectorStats:
+    """Per-sector and per-industry aggregates of ``STAT_FIELDS``, updated per symbol."""
+
+    def __init__(self, store: Optional[FundamentalsStore] = None):
+        self.store = store or get_fundamentals_store()
+        self._lock = threading.Lock()
+        # symbol -> ((level, group) pairs, {field: value}) it currently contributes
+        self._contributions: Dict[str, Tuple[Tuple, Dict[str, float]]] = {}
+        self._aggregates: Dict[Tuple[str, str, str], _Aggregate] = {}
+        self._synced_to = 0.0
+        self._checked_at = time.monotonic()
+        self.store.subscribe(self.update)
+        self._apply_changes()
+
+    def update(self, symbol: str, fields: Dict):
+        """Replace ``symbol``'s contribution with ``fields`` (Ticker.info keys)."""
+        groups = tuple((level, fields.get(level)) for level in LEVELS if fields.get(level))
+        # P/E and P/B are only meaningful when positive; ROE may be negative
+        values = {
+            field: float(fields[field]) for field in STAT_FIELDS
+            if _valid(fields.get(field)) and (field == 'returnOnEquity' or fields[field] > 0)
+        }
+        with self._lock:
+            old_groups, old_values = self._contributions.pop(symbol, ((), {}))
+            for level, group in old_groups:
+                for field, value in old_values.items():
+                    aggregate = self._aggregates[(level, group, field)]
+                    aggregate.remove(value)
+                    if not aggregate.values:
+                        del self._aggregates[(level, group, field)]
+            for level, group in groups:
+                for field, value in values.items():
+                    self._aggregates.setdefault((level, group, field), _Aggregate()).add(value)
+            self._contributions[symbol] = (groups, values)
+
+    def _apply_changes(self):
+        # Re-applying a row is harmless, so rows stamped exactly at the watermark are read again
+        for row in self.store.changed_since(self._synced_to):
+            self.update(row['symbol'], row)
+            self._synced_to = max(self._synced_to, row['fetched_at'])
+
+    def sync(self, force: bool = False):
+        """Apply rows other processes stored since the last sync (at most every ``SYNC_SECONDS``)."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < SYNC_SECONDS:
+            return
+        self._checked_at = now
+        self._apply_changes()
+
+    def value(self, level: str, group: Optional[str], field: str = 'trailingPE',
+              stat: str = 'median') -> Optional[float]:
+        """One aggregate, e.g. the median P/E of a sector; None for unknown or too-small groups."""
+        self.sync()
+        with self._lock:
+            aggregate = self._aggregates.get((level, group, field))
+            if aggregate is None or len(aggregate.values) < MIN_GROUP_SIZE:
+                return None
+            return aggregate.stat(stat)
+
+    def frame(self, level: str = 'sector') -> pd.DataFrame:
+        """Every group of ``level`` with its symbol count and the mean/median of each metric.
+
+        Values are in ``Ticker.info`` units, so ROE is a fraction (0.15 = 15%).
+        """
+        import pandas as pd
+
+        self.sync()
+        with self._lock:
+            groups = sorted({group for (group_level, group, _) in self._aggregates if group_level == level})
+            rows = []
+            for group in groups:
+                row = {level.title(): group}
+                for field, label in STAT_FIELDS.items():
+                    aggregate = self._aggregates.get((level, group, field))
+                    count = len(aggregate.values) if aggregate else 0
+                    row[f'{label} Count'] = count
+                    for stat in STATS:
+                        row[f'{label} {stat.title()}'] = aggregate.stat(stat) if count else None
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+
+_stats: Optional[SectorStats] = None
+_stats_lock = threading.Lock()
+
+
+def get_sector_stats() -> SectorStats:
+    """Return the process-wide aggregates, building them from the fundamentals store on first use."""
+    global _stats
+    if _stats is None:
+        with _stats_lock:
+            if _stats is None:
+                _stats = SectorStats()
+    return _stats
@@ -0,0 +1,17 @@
+from cache import ttl_lru_cache
+
+
+def test_equivalent_calls_share_an_entry():
+    calls = []
+
+    @ttl_lru_cache(maxsize=8, ttl=60)
+    def load(symbol, period="1y"):
+        calls.append((symbol, period))
+        return [symbol, period]
+
+    assert load("TCS.NS") == load("TCS.NS", "1y") == load("TCS.NS", period="1y") == load(symbol="TCS.NS")
+    assert calls == [("TCS.NS", "1y")]
+    assert load.cache_info()["size"] == 1
+
+    load("TCS.NS", period="5y")
+    assert calls == [("TCS.NS", "1y"), ("TCS.NS", "5y")]
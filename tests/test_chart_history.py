@@ -0,0 +1,38 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+from indicators import add_indicators
+from benchmarks.fixtures import synthetic_history
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Ten years of bars ending today, served by load_history for any period."""
+    hist = synthetic_history(seed=7, years=10, end=datetime.date.today().isoformat())
+    periods = []
+
+    def load_history(symbol, period="1y"):
+        periods.append(period)
+        return hist.loc[utils._period_start(period):].copy()
+
+    monkeypatch.setattr(utils, "load_history", load_history)
+    monkeypatch.setattr(utils, "_indicator_cache", None)
+    return hist, periods
+
+
+@pytest.mark.parametrize("chart_range", ["1M", "1Y", "3Y"])
+def test_chart_indicators_are_warmed_up(stored, chart_range):
+    hist, periods = stored
+    chart, message = utils.get_chart_history("TCS.NS", chart_range, max_points=10_000)
+
+    assert message == "success"
+    assert chart.index[0] >= pd.Timestamp(utils._period_start(utils.CHART_RANGES[chart_range]))
+    assert chart[["MA20", "MA50", "MA200", "RSI"]].notna().all().all()
+    # Same values as computing over the whole stored history
+    full = add_indicators(hist.copy())
+    np.testing.assert_allclose(chart["MA200"], full.loc[chart.index, "MA200"])
+    assert periods[-1] != utils.CHART_RANGES[chart_range]
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import INDICATOR_COLUMNS, IndicatorCache, add_indicators
+
+
+def _bars(count, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2024-01-01", periods=count, name="Date")
+    return pd.DataFrame({"Close": 100 + rng.normal(0, 1, count).cumsum()}, index=index)
+
+
+def _assert_matches_batch(hist):
+    expected = add_indicators(hist[["Close"]].copy())
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_allclose(hist[column], expected[column], rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("change", ["append", "revise", "revise_and_append", "rebase"])
+def test_incremental_output_matches_batch(change):
+    cache = IndicatorCache()
+    full = _bars(300)
+    cache.apply("TCS.NS", full.iloc[:260].copy())
+
+    hist = full.iloc[:260].copy()
+    if change in ("append", "revise_and_append"):
+        hist = full.copy()
+    if change in ("revise", "revise_and_append"):
+        hist.iloc[259, 0] += 3.5
+    if change == "rebase":
+        # A dividend re-adjusts every earlier close, then a new bar arrives
+        hist = full.iloc[:261].copy()
+        hist.iloc[:-1, 0] *= 0.97
+
+    _assert_matches_batch(cache.apply("TCS.NS", hist))
+
+
+def test_repeated_refreshes_stay_on_the_batch_values():
+    cache = IndicatorCache()
+    full = _bars(320, seed=3)
+    for end in range(220, 320, 7):
+        hist = full.iloc[:end].copy()
+        hist.iloc[-1, 0] += 1.0
+        _assert_matches_batch(cache.apply("INFY.NS", hist))
@@ -0,0 +1,154 @@
+import json
+import math
+import os
+
+import pandas as pd
+import pytest
+
+import insight_rules
+import utils
+
+SECTOR_PE = {"Technology": 25, "Finance": 15, "Healthcare": 18, "Consumer Goods": 22, "Energy": 12}
+
+BASE_INFO = {
+    "regularMarketPrice": 100.0,
+    "trailingPE": 18.5,
+    "trailingEps": 19,
+    "fiftyTwoWeekHigh": 150.0,
+    "fiftyTwoWeekLow": 60.0,
+    "returnOnEquity": 0.1534,
+    "dividendYield": 0.012,
+    "sector": "Technology",
+}
+
+
+def baseline_insights(symbol, hist, info):
+    """The if/elif chain get_stock_data used before the rules moved to data/insight_rules.json."""
+    current_price = info.get('regularMarketPrice', 0)
+    ma50 = hist['MA50'].iloc[-1]
+    ma200 = hist['MA200'].iloc[-1]
+    rsi = hist['RSI'].iloc[-1]
+    pe_ratio = info.get('trailingPE', None)
+    eps = info.get('trailingEps', None)
+    week52_high = info.get('fiftyTwoWeekHigh', None)
+    week52_low = info.get('fiftyTwoWeekLow', None)
+    dividend_yield = info.get('dividendYield', None)
+    sector = info.get('sector', 'Unknown')
+    roe = info.get('returnOnEquity', None)
+    if roe is not None:
+        roe = round(roe * 100, 2)
+
+    pros, cons = [], []
+    if current_price > ma50 and current_price > ma200:
+        pros.append("Stock is in an uptrend (above 50-day & 200-day MA).")
+    if 30 < rsi < 70:
+        pros.append("RSI is in a healthy range (30-70).")
+    if current_price >= week52_high * 0.95:
+        pros.append("Near 52-week high (strong momentum).")
+    if pe_ratio and pe_ratio < 20:
+        pros.append(f"Low P/E ratio ({pe_ratio:.2f}), undervalued.")
+
+    if current_price < ma50 or current_price < ma200:
+        cons.append("Stock is in a downtrend (below key moving averages).")
+    if rsi > 70:
+        cons.append("Stock is overbought (RSI > 70), possible correction ahead.")
+    if rsi < 30:
+        cons.append("Stock is oversold (RSI < 30), indicating weakness.")
+    if current_price <= week52_low * 1.05:
+        cons.append("Near 52-week low, weak momentum.")
+    if pe_ratio and pe_ratio > 50:
+        cons.append(f"High P/E ratio ({pe_ratio:.2f}), overvalued.")
+
+    if roe is not None:
+        if roe > 15:
+            pros.append(f"Strong Return on Equity (ROE): {roe}% - Indicates good profitability and efficient management.")
+        elif roe > 8:
+            pros.append(f"Moderate Return on Equity (ROE): {roe}% - Decent profitability, but further analysis needed.")
+        else:
+            cons.append(f"Low Return on Equity (ROE): {roe}% - Could indicate inefficiencies or weak profitability.")
+
+    if eps is not None:
+        if eps > 30:
+            pros.append(f"Very strong earnings per share {eps}, indicating high profitability.")
+        elif eps > 10:
+            pros.append(f"Good EPS {eps}, suggesting a profitable company.")
+        else:
+            cons.append(f"Low EPS {eps}, company may have profitability concerns.")
+
+    if dividend_yield and dividend_yield > 0:
+        pros.append(f"Pays dividends (Yield: {dividend_yield * 100:.2f}%).")
+    else:
+        cons.append("No dividends, less passive income potential.")
+
+    industry_avg_pe = SECTOR_PE.get(sector, None)
+    if pe_ratio and industry_avg_pe:
+        if pe_ratio < industry_avg_pe:
+            pros.append(f"P/E ratio ({pe_ratio:.2f}) is lower than sector average ({industry_avg_pe:.2f}).")
+        else:
+            cons.append(f"P/E ratio ({pe_ratio:.2f}) is higher than sector average ({industry_avg_pe:.2f}), overvalued.")
+
+    sentiment = utils.get_news_sentiment(symbol)
+    if sentiment == "Positive":
+        pros.append("Positive news sentiment, good market perception.")
+    elif sentiment == "Negative":
+        cons.append("Negative news sentiment, possible market concerns.")
+    else:
+        pros.append("Neutral news sentiment, no strong bias.")
+
+    return {"Pros": pros, "Cons": cons}
+
+
+CASES = {
+    "roe_strong": ({"returnOnEquity": 0.2}, {}),
+    "roe_boundary_15": ({"returnOnEquity": 0.15}, {}),
+    "roe_boundary_8": ({"returnOnEquity": 0.08}, {}),
+    "roe_low": ({"returnOnEquity": 0.05}, {}),
+    "roe_missing": ({"returnOnEquity": None}, {}),
+    "eps_very_strong": ({"trailingEps": 35}, {}),
+    "eps_boundary_30": ({"trailingEps": 30}, {}),
+    "eps_boundary_10": ({"trailingEps": 10}, {}),
+    "eps_low": ({"trailingEps": 5.5}, {}),
+    "no_dividend": ({"dividendYield": None}, {}),
+    "zero_dividend": ({"dividendYield": 0}, {}),
+    "sector_pe_tie": ({"trailingPE": 25.0}, {}),
+    "sector_pe_higher": ({"trailingPE": 60.0, "sector": "Energy"}, {}),
+    "unknown_sector": ({"sector": "Unknown"}, {}),
+    "nan_mas": ({}, {"MA50": math.nan, "MA200": math.nan}),
+    "downtrend": ({}, {"MA50": 120.0, "MA200": 90.0}),
+    "overbought_near_high": ({"regularMarketPrice": 145.0}, {"RSI": 75.0}),
+    "oversold_near_low": ({"regularMarketPrice": 62.0}, {"RSI": 25.0}),
+}
+
+
+@pytest.mark.parametrize("symbol", ["INFY.NS", "TCS.NS", "HDFC.NS"])
+@pytest.mark.parametrize("info_update, last_update", list(CASES.values()), ids=list(CASES))
+def test_build_insights_matches_baseline(monkeypatch, symbol, info_update, last_update):
+    monkeypatch.setattr(utils, "get_sector_avg_pe", SECTOR_PE.get)
+    info = {**BASE_INFO, **info_update}
+    info = {key: value for key, value in info.items() if value is not None}
+    last = {"MA50": 90.0, "MA200": 80.0, "RSI": 55.0, **last_update}
+    hist = pd.DataFrame([{"MA50": 95.0, "MA200": 85.0, "RSI": 50.0}, last])
+
+    assert utils.build_insights(symbol, hist, info) == baseline_insights(symbol, hist, info)
+
+
+def test_invalid_rules_file_keeps_previous_rules_with_warning(tmp_path, monkeypatch):
+    path = tmp_path / "insight_rules.json"
+    with open(insight_rules.RULES_PATH) as f:
+        path.write_text(f.read())
+    monkeypatch.setattr(insight_rules, "RULES_PATH", str(path))
+    monkeypatch.setattr(insight_rules, "_rules", None)
+    monkeypatch.setattr(insight_rules, "_rules_mtime", None)
+    monkeypatch.setattr(insight_rules, "_rules_warning", None)
+
+    rules, warning = insight_rules.get_insight_rules()
+    assert warning is None
+
+    path.write_text(json.dumps({"rules": [{"id": "broken", "kind": "pro"}]}))
+    os.utime(path, (1, 1))
+    stale, warning = insight_rules.get_insight_rules()
+    assert stale is rules
+    assert warning and str(path) in warning
+
+    hist = pd.DataFrame([{"MA50": 90.0, "MA200": 80.0, "RSI": 55.0}])
+    assert utils.build_insights("INFY.NS", hist, BASE_INFO)["Warning"] == warning
@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ledger import Ledger
+
+
+def test_concurrent_trades_keep_every_update(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger.sqlite3"))
+    dates = [f"2024-01-{day:02d}" for day in range(1, 29)] * 4
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda date: ledger.add_trade("default", "TCS", "BUY", 1, 100.0, date=date), dates))
+
+    position = ledger.positions(account="default")
+    assert position["Quantity"].iloc[0] == len(dates)
+    assert position["Trades"].iloc[0] == len(dates)
+
+
+def test_seeding_keeps_average_and_last_buy(tmp_path):
+    ledger = Ledger(str(tmp_path / "ledger.sqlite3"))
+    holdings = {
+        "TCS": {"avg_purchase_price": 3000.0, "last_purchase_price": 3200.0, "last_purchase_date": "2023-05-02"},
+        "INFY": {"avg_purchase_price": 1600.0, "last_purchase_price": 1400.0, "last_purchase_date": "2023-05-02"},
+        # 2 * avg - last is negative, so the earlier lot is a larger one at zero cost
+        "GAIL": {"avg_purchase_price": 100.0, "last_purchase_price": 350.0, "last_purchase_date": "2023-05-02"},
+        "ITC": {"avg_purchase_price": 450.0, "last_purchase_price": 450.0, "last_purchase_date": "2023-05-02"},
+    }
+    ledger.seed_from_holdings(holdings)
+
+    seeded = ledger.holdings()
+    for symbol, data in holdings.items():
+        assert seeded[symbol]["avg_purchase_price"] == pytest.approx(data["avg_purchase_price"])
+        assert seeded[symbol]["last_purchase_price"] == pytest.approx(data["last_purchase_price"])
+    assert ledger.transactions()["Seeded"].all()
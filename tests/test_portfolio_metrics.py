@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import portfolio_metrics
+from ledger import Ledger
+
+
+def test_add_xirr_with_repeated_symbol(tmp_path, monkeypatch):
+    ledger = Ledger(str(tmp_path / "ledger.sqlite3"))
+    ledger.add_trade("default", "TCS", "BUY", 10, 3000.0, date="2023-01-02")
+    ledger.add_trade("default", "INFY", "BUY", 5, 1500.0, date="2023-06-01")
+    monkeypatch.setattr(portfolio_metrics, "get_ledger", lambda: ledger)
+
+    df = pd.DataFrame({
+        "Symbol": ["TCS", "INFY", "TCS"],
+        "Current Price": [3600.0, 1600.0, 3600.0],
+    })
+    summary = {}
+    df = portfolio_metrics.add_xirr(df, summary)
+
+    xirr = df["XIRR %"].to_numpy()
+    assert np.isfinite(xirr).all()
+    assert xirr[0] == xirr[2]
+    assert np.isfinite(summary["Portfolio XIRR %"])
+
+
+def test_portfolio_xirr_includes_closed_positions(tmp_path, monkeypatch):
+    ledger = Ledger(str(tmp_path / "ledger.sqlite3"))
+    ledger.add_trade("default", "TCS", "BUY", 10, 3000.0, date="2023-01-02")
+    ledger.add_trade("default", "WIPRO", "BUY", 10, 400.0, date="2023-01-02")
+    ledger.add_trade("default", "WIPRO", "SELL", 10, 200.0, date="2024-01-02")
+    monkeypatch.setattr(portfolio_metrics, "get_ledger", lambda: ledger)
+
+    df = pd.DataFrame({"Symbol": ["TCS"], "Current Price": [3600.0]})
+    summary = {}
+    df = portfolio_metrics.add_xirr(df, summary)
+
+    # The WIPRO loss pulls the portfolio below TCS alone
+    assert summary["Portfolio XIRR %"] < df["XIRR %"].iloc[0]
+    assert list(df["Symbol"]) == ["TCS"]
+
+
+def test_seeded_symbols_have_no_xirr(tmp_path, monkeypatch):
+    ledger = Ledger(str(tmp_path / "ledger.sqlite3"))
+    ledger.seed_from_holdings({"TCS": {"avg_purchase_price": 3000.0, "last_purchase_price": 3200.0,
+                                       "last_purchase_date": "2023-05-02"}})
+    ledger.add_trade("default", "INFY", "BUY", 5, 1500.0, date="2023-06-01")
+    monkeypatch.setattr(portfolio_metrics, "get_ledger", lambda: ledger)
+
+    df = pd.DataFrame({"Symbol": ["TCS", "INFY"], "Current Price": [3600.0, 1600.0]})
+    summary = {}
+    df = portfolio_metrics.add_xirr(df, summary)
+
+    assert np.isnan(df["XIRR %"].iloc[0])
+    assert np.isfinite(df["XIRR %"].iloc[1])
+    assert summary["Portfolio XIRR %"] == pytest.approx(df["XIRR %"].iloc[1])
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fundamentals import FundamentalsStore
+from sector_stats import LEVELS, MIN_GROUP_SIZE, SectorStats
+
+SECTORS = {"Technology": ["Software", "IT Services"], "Energy": ["Oil & Gas"], "Finance": ["Banks", "Insurance"]}
+
+
+def random_info(rng):
+    sector = rng.choice(list(SECTORS))
+    return {
+        "sector": sector,
+        "industry": rng.choice(SECTORS[sector]),
+        # Missing, non-positive and NaN values must drop out the same way either path
+        "trailingPE": rng.choice([None, -4.0, float("nan"), *np.round(rng.uniform(5, 80, 6), 2)]),
+        "priceToBook": rng.choice([None, 0.0, *np.round(rng.uniform(0.5, 12, 6), 2)]),
+        "returnOnEquity": rng.choice([None, *np.round(rng.uniform(-0.2, 0.4, 6), 4)]),
+    }
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_incremental_updates_match_full_recompute(tmp_path, seed):
+    rng = np.random.default_rng(seed)
+    store = FundamentalsStore(str(tmp_path / "fundamentals.sqlite3"))
+    stats = SectorStats(store)
+    symbols = [f"SYM{i}.NS" for i in range(60)]
+
+    for symbol in symbols:
+        store.put(symbol, random_info(rng))
+    # Refreshes move symbols between groups and replace or drop their values
+    for symbol in rng.choice(symbols, 150):
+        store.put(symbol, random_info(rng))
+
+    rebuilt = SectorStats(store)
+    for level in LEVELS:
+        pd.testing.assert_frame_equal(stats.frame(level), rebuilt.frame(level), check_exact=False, rtol=1e-9)
+        for group in stats.frame(level)[level.title()]:
+            for field in ("trailingPE", "priceToBook", "returnOnEquity"):
+                for stat in ("mean", "median"):
+                    assert stats.value(level, group, field, stat) == pytest.approx(
+                        rebuilt.value(level, group, field, stat), rel=1e-9, nan_ok=True)
+
+    # And both agree with a plain groupby over the stored rows
+    rows = store.frame()
+    pe = rows[rows["trailingPE"] > 0].groupby("sector")["trailingPE"]
+    expected = pe.median()[pe.count() >= MIN_GROUP_SIZE]
+    frame = stats.frame("sector").set_index("Sector")
+    pd.testing.assert_series_equal(frame.loc[expected.index, "P/E Median"], expected,
+                                   check_names=False, check_index_type=False)
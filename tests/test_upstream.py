@@ -0,0 +1,35 @@
+import pytest
+
+from upstream import CircuitBreaker, Upstream, UpstreamUnavailable
+
+
+def _open_breaker():
+    breaker = CircuitBreaker(failures=1, reset_seconds=0)
+    breaker.record_failure()
+    return breaker
+
+
+def test_non_transient_error_during_probe_releases_the_breaker():
+    upstream = Upstream(rate=0, max_attempts=1, breaker=_open_breaker())
+
+    def broken():
+        raise ValueError("malformed payload")
+
+    with pytest.raises(ValueError):
+        upstream.call('quote', 'TCS.NS', broken)
+    assert upstream.call('quote', 'TCS.NS', lambda: {'regularMarketPrice': 1.0}) == {'regularMarketPrice': 1.0}
+    assert upstream.breaker.state == 'closed'
+
+
+def test_transient_error_during_probe_reopens_the_breaker():
+    breaker = _open_breaker()
+    breaker.reset_seconds = 60
+    breaker._opened_at -= 60
+    upstream = Upstream(rate=0, max_attempts=1, breaker=breaker)
+
+    def timeout():
+        raise TimeoutError("read timed out")
+
+    with pytest.raises(UpstreamUnavailable):
+        upstream.call('quote', 'TCS.NS', timeout)
+    assert upstream.breaker.state == 'open'
@@ -0,0 +1,397 @@
+"""Shared access layer for upstream (Yahoo Finance) calls.
+
+Every provider call made by ``utils`` goes through ``get_upstream().call``,
+which adds, in order:
+
+- a negative cache: (kind, symbol) pairs Yahoo reports as unknown raise
+  ``SymbolNotFound`` for ``NEGATIVE_CACHE_SECONDS`` without another request;
+- a circuit breaker: after ``BREAKER_FAILURES`` consecutive transient
+  failures, calls stop for ``BREAKER_RESET_SECONDS`` and are answered from the
+  last good result (or fail fast with ``UpstreamUnavailable``);
+- a token-bucket rate limit (``STOCKINSIGHT_UPSTREAM_RATE`` requests per
+  second, 0 for none) that halves its rate when Yahoo throttles and climbs
+  back as calls succeed;
+- jittered exponential retry of transient errors (throttling, timeouts,
+  connection errors, 5xx).
+
+On top of that, ``single_flight`` coalesces concurrent identical fetches
+across sessions. When every viewer opening the app at 9:15 asks for NIFTY and
+SENSEX, only the first caller runs the fetch; the others wait and share its
+result or exception, so load follows the number of distinct
+(symbol, kind, period) keys in flight, not the number of sessions.
+"""
+import functools
+import inspect
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from cache import copy_result
+from profiling import count_upstream
+
+T = TypeVar('T')
+
+# Requests per second to Yahoo; the burst covers a default portfolio plus the indices
+UPSTREAM_RATE = float(os.environ.get("STOCKINSIGHT_UPSTREAM_RATE", 10))
+UPSTREAM_BURST = 30
+# Attempts per call, including the first
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8
+BREAKER_FAILURES = 5
+BREAKER_RESET_SECONDS = 30
+NEGATIVE_CACHE_SECONDS = 3600
+# Last good results kept for serving while the breaker is open
+STALE_ENTRIES = 4096
+
+
+class SymbolNotFound(LookupError):
+    """Yahoo has no such symbol (or no price for it)."""
+
+
+class UpstreamUnavailable(RuntimeError):
+    """Upstream is throttling or failing and no cached result is available."""
+
+
+_STATUS_RE = re.compile(r'\b(429|5\d\d)\b')
+
+
+def is_throttled(error: BaseException) -> bool:
+    text = str(error).lower()
+    return ('ratelimit' in type(error).__name__.lower() or 'too many requests' in text
+            or 'rate limit' in text or '429' in _STATUS_RE.findall(text))
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of a requests/curl_cffi HTTPError, if the error carries a response."""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(error, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_not_found(error: BaseException) -> bool:
+    """Yahoo doesn't know the symbol: yfinance's missing-ticker errors or an HTTP 404.
+
+    ``YFTzMissingError`` doesn't count: yfinance also raises it when its
+    timezone request failed and the failure was swallowed.
+    """
+    if isinstance(error, SymbolNotFound) or _status_code(error) == 404:
+        return True
+    # Only loaded once yfinance is in use; an error can't come from it otherwise
+    exceptions = sys.modules.get('yfinance.exceptions')
+    return (exceptions is not None and isinstance(error, exceptions.YFTickerMissingError)
+            and not isinstance(error, exceptions.YFTzMissingError))
+
+
+def is_transient(error: BaseException) -> bool:
+    """Throttling, timeouts, dropped connections and server errors: worth retrying."""
+    name = type(error).__name__
+    return (is_throttled(error) or isinstance(error, (ConnectionError, TimeoutError))
+            or 'Timeout' in name or 'Connection' in name or bool(_STATUS_RE.search(str(error))))
+
+
+class TokenBucket:
+    """Token-bucket limiter with multiplicative slow-down on throttling and additive recovery."""
+
+    def __init__(self, rate: float, burst: int):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent. A rate of 0 disables the limit."""
+        if self.max_rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def throttled(self):
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+    def succeeded(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class CircuitBreaker:
+    """Closed until ``failures`` consecutive failures, then open for ``reset_seconds``.
+
+    After that one probe call is let through (half-open): success closes the
+    breaker, failure opens it again.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._count = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            return 'half-open' if time.monotonic() - self._opened_at >= self.reset_seconds else 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._count = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release_probe(self):
+        """End a probe that says nothing about upstream health; the next call probes again."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._count += 1
+            if self._probing or self._count >= self.failures:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class Upstream:
+    """Rate-limited, retried, circuit-broken access to the market data provider."""
+
+    def __init__(self, rate: float = UPSTREAM_RATE, burst: int = UPSTREAM_BURST,
+                 max_attempts: int = MAX_ATTEMPTS, negative_seconds: float = NEGATIVE_CACHE_SECONDS,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.limiter = TokenBucket(rate, burst)
+        self.breaker = breaker or CircuitBreaker()
+        self.max_attempts = max_attempts
+        self.negative_seconds = negative_seconds
+        # (kind, symbol) -> monotonic expiry; a symbol missing from one endpoint may exist on another
+        self._not_found: Dict[Tuple[str, str], float] = {}
+        self._stale: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'retries': 0, 'throttled': 0, 'not_found': 0,
+                      'negative_hits': 0, 'rejected': 0, 'stale_served': 0}
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def is_known_missing(self, kind: str, symbol: str) -> bool:
+        key = (kind, symbol)
+        with self._lock:
+            expires_at = self._not_found.get(key)
+            if expires_at is None:
+                return False
+            if expires_at > time.monotonic():
+                return True
+            del self._not_found[key]
+            return False
+
+    def _remember_missing(self, kind: str, symbol: str):
+        self._count('not_found')
+        with self._lock:
+            self._not_found[(kind, symbol)] = time.monotonic() + self.negative_seconds
+
+    def _remember_good(self, key, value):
+        with self._lock:
+            self._stale[key] = value
+            self._stale.move_to_end(key)
+            while len(self._stale) > STALE_ENTRIES:
+                self._stale.popitem(last=False)
+
+    def _serve_stale(self, key, error: BaseException):
+        with self._lock:
+            found = key in self._stale
+            value = self._stale.get(key)
+        if not found:
+            raise UpstreamUnavailable(f"Upstream unavailable for {key[1]}: {error}") from error
+        self._count('stale_served')
+        return copy_result(value)
+
+    def call(self, kind: str, symbol: str, fetch: Callable[[], T], keep_stale: bool = False,
+             validate: Optional[Callable[[T], bool]] = None, remember_invalid: bool = True) -> T:
+        """Run ``fetch()`` for ``symbol`` under the limit, retry and breaker policies.
+
+        ``validate(result)`` returning False means Yahoo doesn't know the
+        symbol (e.g. an info payload without a price) and raises
+        ``SymbolNotFound``. It is negative-cached only with ``remember_invalid``;
+        pass False where an invalid result may be transient. With
+        ``keep_stale`` the last good result is served while upstream is unavailable.
+        """
+        key = (kind, symbol)
+        if self.is_known_missing(kind, symbol):
+            self._count('negative_hits')
+            raise SymbolNotFound(f"Unknown symbol {symbol}")
+
+        error: BaseException = UpstreamUnavailable("circuit open")
+        for attempt in range(self.max_attempts):
+            if not self.breaker.allow():
+                self._count('rejected')
+                break
+            self.limiter.acquire()
+            self._count('calls')
+            if attempt:
+                self._count('retries')
+            count_upstream(kind)
+            try:
+                result = fetch()
+            except Exception as e:
+                if is_not_found(e):
+                    self.breaker.record_success()
+                    self._remember_missing(kind, symbol)
+                    raise SymbolNotFound(f"Unknown symbol {symbol}: {e}") from e
+                if not is_transient(e):
+                    # Not an upstream failure, but a half-open probe must still end
+                    self.breaker.release_probe()
+                    raise
+                self.breaker.record_failure()
+                if is_throttled(e):
+                    self._count('throttled')
+                    self.limiter.throttled()
+                error = e
+                if attempt + 1 < self.max_attempts:
+                    # Full jitter keeps many waiting sessions from retrying in lockstep
+                    time.sleep(random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)))
+                continue
+
+            self.breaker.record_success()
+            self.limiter.succeeded()
+            if validate is not None and not validate(result):
+                if remember_invalid:
+                    self._remember_missing(kind, symbol)
+                raise SymbolNotFound(f"Unknown symbol {symbol}")
+            if keep_stale:
+                self._remember_good(key, result)
+            return result
+
+        if keep_stale:
+            return self._serve_stale(key, error)
+        raise UpstreamUnavailable(f"Upstream unavailable for {symbol}: {error}") from error
+
+    def status(self) -> dict:
+        """Counters plus the current rate limit and breaker state."""
+        with self._lock:
+            stats = dict(self.stats)
+        return {**stats, 'rate': self.limiter.rate, 'breaker': self.breaker.state}
+
+
+_upstream: Optional[Upstream] = None
+_upstream_lock = threading.Lock()
+
+
+def get_upstream() -> Upstream:
+    """Return the process-wide upstream access layer."""
+    global _upstream
+    if _upstream is None:
+        with _upstream_lock:
+            if _upstream is None:
+                _upstream = Upstream()
+    return _upstream
+
+
+class _Call:
+    """One in-flight execution and its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers with that key share it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self.stats = {'calls': 0, 'shared': 0}
+
+    def do(self, key: Hashable, func: Callable, *args, **kwargs):
+        """Return ``func(*args, **kwargs)``, or the result of the call already running for ``key``.
+
+        The caller that runs the call gets its value; callers that joined it
+        get a shallow copy (see ``cache.copy_result``) so they can't mutate
+        each other's frames.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.stats['calls'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy_result(call.value)
+
+        try:
+            call.value = func(*args, **kwargs)
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+
+def single_flight(kind: str):
+    """Coalesce concurrent calls of the decorated fetcher that have the same arguments.
+
+    The key is ``(first argument, kind, remaining arguments)`` after binding
+    defaults, so ``load_history('TCS.NS')`` and ``load_history('TCS.NS',
+    period='1y')`` share a call: in practice ``(symbol, kind, period)``.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+        flight = SingleFlight()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            first, *rest = bound.arguments.values()
+            return flight.do((first, kind, *rest), func, *args, **kwargs)
+
+        def flight_info() -> dict:
+            return {**flight.stats, 'in_flight': flight.in_flight()}
+
+        wrapper.flight_info = flight_info
+        return wrapper
+
+    return decorator
@@ -1,58 +1,131 @@
+# pandas, numpy and the indicator/downsampling modules are imported inside the
+# functions that use them, so importing utils (CLI, calendar checks, batch jobs)
+# doesn't pay for them until first use. benchmarks/bench_import.py holds the budget.
+from __future__ import annotations
+
 import datetime
+import threading
+import time
 import pytz
-import pandas as pd
-import numpy as np
-import yfinance as yf
-from typing import Tuple, Optional, Dict, List
-import requests
-
-NSE_HOLIDAY_URL = "https://www.nseindia.com/api/holiday-master?type=trading"
-
-def get_nse_holidays() -> list:
-    """Fetch Indian market holidays from NSE."""
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
-    try:
-        response = requests.get(NSE_HOLIDAY_URL, headers=headers)
-        data = response.json()
-        holidays = [item['tradingDate'] for item in data['CM'] if item['holidayType'] == 'TRADING']
-        return holidays
-    except Exception as e:
-        print("Error fetching NSE holidays:", e)
-        return []
+from typing import TYPE_CHECKING, Tuple, Optional, Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from history_store import get_history_store
+from fundamentals import FUNDAMENTALS_TTL_SECONDS, get_fundamentals_store
+from market_calendar import get_calendar
+from providers import get_provider
+from profiling import stage, submit, map_in_context
+from cache import ttl_lru_cache
+from upstream import SymbolNotFound, UpstreamUnavailable, get_upstream, single_flight
+from prefetch import QuoteSnapshot, Prefetcher
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from indicators import IndicatorCache
+
+
+# Upper bound on concurrent upstream requests issued by the batch fetchers
+MAX_FETCH_WORKERS = 16
+_fetch_pool = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="yf-fetch")
+
+# Index display name -> Yahoo symbol
+NSE_INDICES = {
+    'NIFTY 50': '^NSEI',
+    'BANK NIFTY': '^NSEBANK',
+    'SENSEX': '^BSESN'
+}
+# Seconds the homepage waits for index data before showing what has loaded
+INDEX_FETCH_TIMEOUT = 10
+
+# Calendar days covered by each supported history period ('max' is unbounded)
+HISTORY_PERIOD_DAYS = {
+    '1mo': 31,
+    '3mo': 92,
+    '6mo': 183,
+    '1y': 365,
+    '2y': 730,
+    '3y': 1096,
+    '5y': 1826,
+    '10y': 3653,
+    'max': None,
+}
+# Chart range selector labels and the history period each one loads
+CHART_RANGES = {
+    '1M': '1mo',
+    '1Y': '1y',
+    '3Y': '3y',
+    '10Y': '10y',
+    'Max': 'max',
+}
+# Calendar days loaded before a chart range so its MA200 (200 trading days,
+# plus weekends and holidays) is defined from the first bar shown
+CHART_WARMUP_DAYS = 300
+# Earliest possible bar date, used as the coverage start of a 'max' download
+MAX_HISTORY_START = '1900-01-01'
+# How long stored bars stay fresh while the market is open or the close settles
+HISTORY_REFRESH_SECONDS = 60
+# How long fetched quotes and history stay cached in memory while the market is open or the close settles
+MARKET_OPEN_CACHE_TTL = 60
+# Seconds between background quote refreshes while the market is open
+QUOTE_REFRESH_SECONDS = 30
+# Quotes keep moving briefly after the 3:30 PM close (closing session), so
+# snapshot entries are only trusted as final this long after it
+CLOSE_SETTLE_SECONDS = 15 * 60
+# Longest the prefetcher sleeps while the market is closed
+CLOSED_POLL_SECONDS = 3600
+
+# Indicator state per (symbol, period), so refreshes only process new or updated bars
+_indicator_cache: Optional[IndicatorCache] = None
+_indicator_cache_lock = threading.Lock()
+
+def _get_indicator_cache() -> IndicatorCache:
+    """Return the shared indicator cache, created (and indicators imported) on first use."""
+    global _indicator_cache
+    if _indicator_cache is None:
+        with _indicator_cache_lock:
+            if _indicator_cache is None:
+                from indicators import IndicatorCache
+                _indicator_cache = IndicatorCache()
+    return _indicator_cache
 
-def is_indian_market_open() -> Tuple[bool, str]:
-    """Check if the Indian market is open, considering holidays."""
-    ist = pytz.timezone('Asia/Kolkata')
-    current_time = datetime.datetime.now(ist)
+def calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
+    """RSI of a close series; see ``indicators.calculate_rsi``."""
+    from indicators import calculate_rsi as _calculate_rsi
+    return _calculate_rsi(series, period)
+
+def _opens_phrase(now: datetime.datetime, next_open: datetime.datetime) -> str:
+    """Describe when the market next opens, e.g. 'today at 09:15 AM' or 'on Monday, 20 Oct at 09:15 AM'."""
+    time_str = next_open.strftime('%I:%M %p')
+    days = (next_open.date() - now.date()).days
+    if days == 0:
+        return f"today at {time_str}"
+    if days == 1:
+        return f"tomorrow at {time_str}"
+    return f"on {next_open.strftime('%A, %d %b')} at {time_str}"
 
-    # Market hours: 9:15 AM to 3:30 PM IST, Monday to Friday
-    market_start = current_time.replace(hour=9, minute=15, second=0, microsecond=0)
-    market_end = current_time.replace(hour=15, minute=30, second=0, microsecond=0)
+def is_indian_market_open() -> Tuple[bool, str]:
+    """Check if the Indian market is open, considering weekends and NSE holidays.
 
-    # # Fetch real-time holidays
-    # holidays = get_nse_holidays()
-    
-    # # Convert holiday dates to datetime format
-    # holiday_dates = [datetime.datetime.strptime(date, "%d-%b-%Y").date() for date in holidays]
+    Uses the bundled trading calendar, so no network call is made.
+    """
+    calendar = get_calendar()
+    current_time = datetime.datetime.now(pytz.timezone('Asia/Kolkata'))
 
-    # # Check if today is a holiday
-    # if current_time.date() in holiday_dates:
-    #     return False, f"Market is closed (Holiday)" # - Next Open Date Unknown"
+    if calendar.is_open(current_time):
+        return True, "Market is open"
 
-    # Check if today is a weekend
-    if current_time.weekday() >= 5:  # Saturday or Sunday
-        return False, "Market is closed (Weekend) - Opens on Monday at 9:15 AM IST"
+    opens = _opens_phrase(current_time, calendar.next_open(current_time))
+    today = current_time.date()
 
-    # Check if market hours
-    if current_time < market_start:
-        return False, f"Market is closed - Opens today at {market_start.strftime('%I:%M %p')} IST"
+    # Check if today is a holiday
+    holiday = calendar.holiday_name(today)
+    if holiday and today.weekday() < 5:
+        return False, f"Market is closed (Holiday: {holiday}) - Opens {opens} IST"
 
-    if current_time > market_end:
-        return False, f"Market is closed - Opens tomorrow at 9:15 AM IST"
+    # Check if today is a weekend
+    if today.weekday() >= 5:  # Saturday or Sunday
+        return False, f"Market is closed (Weekend) - Opens {opens} IST"
 
-    return True, "Market is open"
+    return False, f"Market is closed - Opens {opens} IST"
 
 # Example Usage
 # market_status, message = is_indian_market_open()
@@ -94,52 +167,336 @@ def is_indian_market_open() -> Tuple[bool, str]:
 #     return True, "Market is open"
 
 
-def calculate_rsi(series: pd.Series, period: int = 14) -> pd.Series:
-    """Calculate Relative Strength Index (RSI) for a given series."""
-    delta = series.diff(1)
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
-
-def get_nse_indices() -> Dict[str, Tuple[Optional[pd.DataFrame], Optional[dict], str]]:
-    """Fetch NSE & BSE indices data (Nifty 50, Bank Nifty, and Sensex)."""
-    indices = {
-        'NIFTY 50': '^NSEI',
-        'BANK NIFTY': '^NSEBANK',
-        'SENSEX': '^BSESN'
-    }
+def market_cache_ttl() -> float:
+    """Cache lifetime in seconds: short while trading or settling, otherwise until the next open."""
+    # Prices fetched before the close settles aren't final, so they mustn't be kept overnight
+    if _settled_close() is None:
+        return MARKET_OPEN_CACHE_TTL
+    now = datetime.datetime.now(pytz.timezone('Asia/Kolkata'))
+    return max((get_calendar().next_open(now) - now).total_seconds(), MARKET_OPEN_CACHE_TTL)
+
+def _history_is_fresh(fetched_at: float) -> bool:
+    """Stored bars are fresh if fetched recently, or after the last close settled while the market is shut."""
+    settled = _settled_close()
+    if settled is None:
+        return time.time() - fetched_at < HISTORY_REFRESH_SECONDS
+    return fetched_at >= settled
+
+@single_flight('info')
+def _upstream_info(symbol: str) -> dict:
+    """Full info payload straight from the provider; concurrent requests for a symbol share one call.
+
+    Raises ``SymbolNotFound`` for symbols Yahoo has no price for, and
+    ``UpstreamUnavailable`` when upstream is failing and no earlier payload is cached.
+    """
+    return get_upstream().call('info', symbol, lambda: get_provider().info(symbol), keep_stale=True,
+                               validate=lambda info: 'regularMarketPrice' in info)
+
+@ttl_lru_cache(maxsize=1024, ttl=market_cache_ttl)
+def get_info(symbol: str) -> dict:
+    """Fetch the full info payload for a Yahoo symbol, memoized until the cache TTL expires."""
+    return _upstream_info(symbol)
+
+@single_flight('quote')
+def _upstream_quote(symbol: str) -> dict:
+    """Price fields only (``providers.QUOTE_FIELDS``), from the provider's lightweight quote call."""
+    # A quote without a price can be a passing gap, so it isn't negative-cached; unknown symbols raise instead
+    return get_upstream().call('quote', symbol, lambda: get_provider().quote(symbol), keep_stale=True,
+                               validate=lambda quote: quote.get('regularMarketPrice') is not None,
+                               remember_invalid=False)
+
+@ttl_lru_cache(maxsize=1024, ttl=market_cache_ttl)
+def get_quote(symbol: str) -> dict:
+    """Price, previous close, open, day and 52-week range for a Yahoo symbol, keyed like ``get_info``.
+
+    Much cheaper than the full payload; raises like ``get_info``.
+    """
+    return _upstream_quote(symbol)
+
+def get_fundamentals(symbol: str) -> dict:
+    """P/E, EPS, ROE, dividend yield, sector etc. for a Yahoo symbol, keyed like ``get_info``.
+
+    Served from the fundamentals store while younger than
+    ``FUNDAMENTALS_TTL_SECONDS``; otherwise refreshed from the full payload.
+    If that refresh fails because upstream is unavailable, the stored copy is
+    served regardless of age.
+    """
+    store = get_fundamentals_store()
+    stored = store.get(symbol)
+    if stored is not None and time.time() - stored.pop('fetched_at') < FUNDAMENTALS_TTL_SECONDS:
+        return stored
+    try:
+        info = get_info(symbol)
+    except UpstreamUnavailable:
+        if stored is None:
+            raise
+        return stored
+    return store.put(symbol, info)
+
+def _rebased(stored: pd.DataFrame, delta: pd.DataFrame) -> bool:
+    """Whether a delta download is on a different adjustment basis than the stored bars.
+
+    Yahoo back-adjusts closes for dividends and splits, so a new action, or an
+    overlapping bar whose close no longer matches the stored one, means the
+    stored range is stale.
+    """
+    import numpy as np
+
+    if delta.empty:
+        return False
+    anchor = stored.index[0].strftime('%Y-%m-%d')
+    dates = delta.index.strftime('%Y-%m-%d')
+    new_bars = delta[dates > anchor]
+    for column in ('Dividends', 'Stock Splits'):
+        if column in new_bars and (new_bars[column].fillna(0) != 0).any():
+            return True
+    overlap = delta['Close'][dates == anchor]
+    return len(overlap) > 0 and not np.isclose(overlap.iloc[0], stored['Close'].iloc[0], rtol=1e-6)
+
+def _period_start(period: str) -> str:
+    """First date (ISO, IST) covered by ``period``."""
+    days = HISTORY_PERIOD_DAYS[period]
+    if days is None:
+        return MAX_HISTORY_START
+    return (datetime.datetime.now(pytz.timezone('Asia/Kolkata')).date() - datetime.timedelta(days=days)).isoformat()
+
+def _warmup_period(period: str) -> str:
+    """Shortest history period covering ``period`` plus ``CHART_WARMUP_DAYS``."""
+    days = HISTORY_PERIOD_DAYS[period]
+    if days is None:
+        return period
+    for longer, longer_days in HISTORY_PERIOD_DAYS.items():
+        if longer_days is not None and longer_days >= days + CHART_WARMUP_DAYS:
+            return longer
+    return 'max'
+
+# Cache misses from many sessions at once share one store refresh per (symbol, period)
+@ttl_lru_cache(maxsize=256, ttl=market_cache_ttl)
+@single_flight('history')
+def load_history(symbol: str, period: str = "1y") -> pd.DataFrame:
+    """Return daily bars for ``period``, downloading only what the local store lacks.
+
+    The first lookup of a symbol (or one reaching further back than before)
+    downloads the whole period; later lookups request only the bars from the
+    last settled stored date onwards, and none at all while the stored copy is
+    fresh. If that delta shows a dividend, a split or a re-adjusted close, the
+    whole stored range is downloaded again.
+    """
+    days = HISTORY_PERIOD_DAYS[period]
+    start = _period_start(period)
+
+    store = get_history_store()
+    coverage = store.coverage(symbol)
+    provider = get_provider()
+    upstream = get_upstream()
+
+    if coverage is None or coverage['start'] > start:
+        try:
+            hist = upstream.call('history', symbol, lambda: (
+                provider.history(symbol, period="max") if days is None else provider.history(symbol, start=start)))
+        except UpstreamUnavailable:
+            if coverage is None:
+                raise
+            # Serve the shorter stored range until upstream recovers
+            return store.load(symbol, start)
+        if hist.empty:
+            return hist
+        store.save(symbol, hist, start=start)
+    elif not _history_is_fresh(coverage['fetched_at']):
+        try:
+            # Start from the last settled bar: it must still match the store, and the
+            # possibly partial intraday bar after it is replaced
+            stored = store.tail(symbol, 2)
+            anchor = stored.index[0].strftime('%Y-%m-%d')
+            delta = upstream.call('history', symbol, lambda: provider.history(symbol, start=anchor))
+            if _rebased(stored, delta):
+                # A dividend or split re-adjusted every earlier close; replace the whole stored range
+                full = coverage['start'] == MAX_HISTORY_START
+                hist = upstream.call('history', symbol, lambda: (
+                    provider.history(symbol, period="max") if full else provider.history(symbol, start=coverage['start'])))
+                store.save(symbol, hist, start=coverage['start'])
+            else:
+                store.save(symbol, delta)
+        except Exception as e:
+            print(f"Delta refresh failed for {symbol}, serving stored bars:", e)
+
+    return store.load(symbol, start)
+
+# Quotes and index history shared by all sessions, kept warm by the prefetcher
+_quote_snapshot = QuoteSnapshot()
+_watched_quotes: Dict[str, None] = {}
+_watched_histories: Dict[str, None] = {}
+_watch_lock = threading.Lock()
+
+def _settled_close() -> Optional[float]:
+    """Epoch time the last close's prices became final, or None while trading or settling."""
+    if is_indian_market_open()[0]:
+        return None
+    now = datetime.datetime.now(pytz.timezone('Asia/Kolkata'))
+    settled = get_calendar().previous_close(now).timestamp() + CLOSE_SETTLE_SECONDS
+    return settled if now.timestamp() >= settled else None
+
+def _snapshot_since() -> float:
+    """Oldest fetch time (epoch seconds) a snapshot entry may have and still be served."""
+    settled = _settled_close()
+    return settled if settled is not None else time.time() - 2 * QUOTE_REFRESH_SECONDS
+
+def _prefetch_delay() -> float:
+    """Seconds until the next refresh: the interval while trading, else until the next open."""
+    if _settled_close() is None:
+        return QUOTE_REFRESH_SECONDS
+    # One refresh after the close has settled is enough until the next open
+    now = datetime.datetime.now(pytz.timezone('Asia/Kolkata'))
+    return min((get_calendar().next_open(now) - now).total_seconds(), CLOSED_POLL_SECONDS)
+
+def _fetch_live_quote(symbol: str) -> Optional[dict]:
+    """Fetch a quote straight from the provider, bypassing the memo cache."""
+    try:
+        return _upstream_quote(symbol)
+    except Exception as e:
+        print(f"Error prefetching quote for {symbol}:", e)
+        return None
+
+def _fetch_live_history(symbol: str) -> Optional[pd.DataFrame]:
+    try:
+        return load_history(symbol, "1y")
+    except Exception as e:
+        print(f"Error prefetching history for {symbol}:", e)
+        return None
+
+def _refresh_watchlist():
+    """Re-fetch watched quotes and histories: all of them while trading, else those older than the settled close."""
+    # Readers accept entries up to two intervals old, so refreshing everything
+    # each interval keeps them served from memory
+    settled = _settled_close()
+    since = settled if settled is not None else time.time()
+    with _watch_lock:
+        quotes = [symbol for symbol in _watched_quotes if _quote_snapshot.quote(symbol, since) is None]
+        histories = [symbol for symbol in _watched_histories if _quote_snapshot.history(symbol, since) is None]
+
+    for symbol, quote in zip(quotes, map_in_context(_fetch_pool, _fetch_live_quote, quotes)):
+        if quote is not None:
+            _quote_snapshot.put_quote(symbol, quote)
+    for symbol, hist in zip(histories, map_in_context(_fetch_pool, _fetch_live_history, histories)):
+        if hist is not None and not hist.empty:
+            _quote_snapshot.put_history(symbol, hist)
+
+_prefetcher = Prefetcher(_refresh_watchlist, _prefetch_delay)
+
+def start_prefetch(symbols: List[str]):
+    """Keep quotes for ``symbols`` and the indices warm in the background.
+
+    Safe to call on every rerun: symbols are added to the watchlist and the
+    refresher thread is started once per process.
+    """
+    quotes = list(NSE_INDICES.values()) + [to_yahoo_symbol(symbol) for symbol in symbols]
+    with _watch_lock:
+        added = any(symbol not in _watched_quotes for symbol in quotes)
+        _watched_quotes.update(dict.fromkeys(quotes))
+        _watched_histories.update(dict.fromkeys(NSE_INDICES.values()))
+    # A running thread is woken so new symbols don't wait for the next cycle
+    if not _prefetcher.start() and added:
+        _prefetcher.wake()
+
+class _Resolved(Future):
+    """A future holding a snapshot hit, so hits and pool fetches are handled alike."""
+
+    def __init__(self, value):
+        super().__init__()
+        self.set_result(value)
+
+def get_nse_indices(timeout: float = INDEX_FETCH_TIMEOUT) -> Dict[str, Tuple[Optional[pd.DataFrame], Optional[dict], str]]:
+    """Fetch NSE & BSE indices data (Nifty 50, Bank Nifty, and Sensex).
+
+    Entries prefetched into the shared snapshot are served from memory; any
+    other quote and history requests run concurrently. Any index
+    not loaded within ``timeout`` seconds is reported as an error so the others
+    can render; its requests keep running and warm the cache for the next run.
+    """
+    since = _snapshot_since()
+    pending = {}
+    for index_name, symbol in NSE_INDICES.items():
+        # Prefetched entries are served from memory; only misses go upstream
+        # and are written back to the snapshot for other sessions
+        quote = _quote_snapshot.quote(symbol, since)
+        hist = _quote_snapshot.history(symbol, since)
+        pending[index_name] = (
+            _Resolved(quote) if quote is not None else submit(_fetch_pool, get_quote, symbol),
+            _Resolved(hist) if hist is not None else submit(_fetch_pool, load_history, symbol, "1y"),
+        )
+    wait([future for pair in pending.values() for future in pair], timeout=timeout)
 
     result = {}
-    for index_name, symbol in indices.items():
+    for index_name, (info_future, hist_future) in pending.items():
+        symbol = NSE_INDICES[index_name]
+        if not (info_future.done() and hist_future.done()):
+            result[index_name] = (None, None, f"Timed out fetching {index_name} data")
+            continue
+
         try:
-            index = yf.Ticker(symbol)
-            info = index.info
+            info = info_future.result()
 
             if 'regularMarketPrice' not in info:
                 result[index_name] = (None, None, f"Unable to fetch {index_name} data")
                 continue
 
-            hist = index.history(period="1y")
+            hist = hist_future.result()
             if hist.empty:
                 result[index_name] = (None, None, f"No historical data available for {index_name}")
                 continue
 
+            if not isinstance(info_future, _Resolved):
+                _quote_snapshot.put_quote(symbol, info)
+            if not isinstance(hist_future, _Resolved):
+                _quote_snapshot.put_history(symbol, hist)
+
             # Calculate technical indicators
-            hist['MA20'] = hist['Close'].rolling(window=20).mean()
-            hist['MA50'] = hist['Close'].rolling(window=50).mean()
-            hist['MA200'] = hist['Close'].rolling(window=200).mean()
-            hist['RSI'] = calculate_rsi(hist['Close'])
+            with stage("indicators"):
+                _get_indicator_cache().apply((symbol, "1y"), hist)
 
             result[index_name] = (hist, info, "success")
 
+        except SymbolNotFound:
+            result[index_name] = (None, None, f"Unable to fetch {index_name} data")
+        except UpstreamUnavailable:
+            result[index_name] = (None, None, f"{index_name} data is temporarily unavailable, retrying shortly")
         except Exception as e:
             result[index_name] = (None, None, f"Error fetching {index_name} data: {str(e)}")
 
     return result
 
+def get_chart_history(symbol: str, chart_range: str = '1Y', candles: bool = False,
+                      max_points: Optional[int] = None) -> Tuple[Optional[pd.DataFrame], str]:
+    """Bars and indicators for a chart range, reduced to at most ``max_points`` rows
+    (default ``downsample.MAX_CHART_POINTS``).
+
+    Line charts keep the rows picked by LTTB on the close; candlestick charts
+    merge consecutive bars into OHLC buckets. Indicators are computed on the
+    full-resolution bars, including ``CHART_WARMUP_DAYS`` before the range so
+    short ranges have their long moving averages, then the range is cut out and reduced.
+    """
+    from downsample import MAX_CHART_POINTS, lttb, ohlc_buckets
+
+    max_points = max_points or MAX_CHART_POINTS
+    try:
+        period = CHART_RANGES[chart_range]
+        warmup = _warmup_period(period)
+        hist = load_history(symbol, period=warmup)
+        if hist.empty:
+            return None, f"No historical data available for {chart_range}"
+
+        with stage("indicators"):
+            _get_indicator_cache().apply((symbol, warmup), hist)
+        hist = hist.loc[_period_start(period):]
+        if hist.empty:
+            return None, f"No historical data available for {chart_range}"
+        with stage("downsample"):
+            hist = ohlc_buckets(hist, max_points) if candles else lttb(hist, 'Close', max_points)
+        return hist, "success"
+
+    except Exception as e:
+        return None, f"Error fetching {chart_range} history: {str(e)}"
+
 
 # def get_stock_data(symbol: str) -> Tuple[Optional[pd.DataFrame], Optional[dict], str]:
 #     """Fetch stock data from Yahoo Finance."""
@@ -177,147 +534,152 @@ def get_nse_indices() -> Dict[str, Tuple[Optional[pd.DataFrame], Optional[dict],
 
 
 
-def get_stock_data(symbol: str) -> Tuple[Optional[pd.DataFrame], Optional[dict], str, Optional[dict]]:
-    """Fetch stock data and provide insights with fundamentals, sentiment, and sector analysis."""
+def get_stock_quote(symbol: str) -> Tuple[Optional[dict], str]:
+    """Fast tier for the stock page: just the quote (``get_quote``), as (quote, message)."""
     try:
-        symbol = symbol.upper()
-        if not (symbol.endswith('.NS') or symbol.endswith('.BO')):
-            symbol = f"{symbol}.NS"
+        return get_quote(to_yahoo_symbol(symbol)), "success"
+    except SymbolNotFound:
+        return None, "Invalid stock symbol"
+    except UpstreamUnavailable:
+        return None, "Market data is temporarily unavailable, please try again shortly"
+    except Exception as e:
+        return None, f"Error fetching data: {str(e)}"
+
+# Ticker.info key -> insight rule field (see data/insight_rules.json)
+INSIGHT_INFO_FIELDS = {
+    'trailingPE': 'pe',
+    'trailingEps': 'eps',
+    'fiftyTwoWeekHigh': 'week52_high',
+    'fiftyTwoWeekLow': 'week52_low',
+    'returnOnEquity': 'roe',
+    'dividendYield': 'dividend_yield',
+}
+
+def insight_fields(data: pd.DataFrame) -> pd.DataFrame:
+    """Fields the insight rules read, one row per Yahoo symbol of ``data``.
+
+    ``data`` is indexed by symbol and holds 'price', 'MA50', 'MA200', 'RSI',
+    'sector' and the ``INSIGHT_INFO_FIELDS`` keys; missing values may be None.
+    """
+    import numpy as np
+    import pandas as pd
+
+    numeric = {'price': data['price'], 'ma50': data['MA50'], 'ma200': data['MA200'], 'rsi': data['RSI'],
+               **{field: data[key] for key, field in INSIGHT_INFO_FIELDS.items()}}
+    # to_numeric keeps ints as ints, so messages show e.g. 'EPS 19' as they always have
+    fields = {field: pd.to_numeric(values, errors='coerce').to_numpy() for field, values in numeric.items()}
+
+    # ROE=Net Income / Shareholder's Equity, as a percentage rounded with the
+    # builtin round() the messages have always shown (e.g. 0.1534 -> 15.34)
+    fields['roe'] = np.array([np.nan if np.isnan(roe) else round(roe * 100, 2) for roe in fields['roe']])
+    fields['dividend_yield_pct'] = fields['dividend_yield'] * 100
+
+    sector_pe = {sector: get_sector_avg_pe(sector) for sector in data['sector'].dropna().unique()}
+    fields['sector'] = data['sector'].to_numpy()
+    fields['sector_pe'] = pd.to_numeric(data['sector'].map(sector_pe), errors='coerce').to_numpy(dtype=float)
+    fields['sentiment'] = [get_news_sentiment(symbol) for symbol in data.index]
+    return pd.DataFrame(fields, index=data.index)
+
+def build_insights(symbol: str, hist: pd.DataFrame, info: dict) -> dict:
+    """Pros and cons from the latest indicators in ``hist`` and the quote and fundamentals in ``info``.
+
+    The rules themselves are in data/insight_rules.json (see ``insight_rules``).
+    Returns {'Pros': [...], 'Cons': [...]}, plus 'Warning' while the rules file is invalid.
+    """
+    import pandas as pd
+    from insight_rules import get_insight_rules
+
+    row = {
+        'price': info.get('regularMarketPrice', 0),
+        'MA50': hist['MA50'].iloc[-1],
+        'MA200': hist['MA200'].iloc[-1],
+        'RSI': hist['RSI'].iloc[-1],
+        'sector': info.get('sector', 'Unknown'),
+        **{key: info.get(key) for key in INSIGHT_INFO_FIELDS},
+    }
+    rules, warning = get_insight_rules()
+    insights = rules.insights(insight_fields(pd.DataFrame([row], index=[symbol])))[0]
+    if warning:
+        insights['Warning'] = warning
+    return insights
+
+def get_stock_data(symbol: str) -> Tuple[Optional[pd.DataFrame], Optional[dict], str, Optional[dict]]:
+    """Fetch stock data and provide insights with fundamentals, sentiment, and sector analysis.
 
-        stock = yf.Ticker(symbol)
-        info = stock.info
+    ``info`` merges the quote (``get_quote``) over the long-lived
+    fundamentals (``get_fundamentals``); pages that want to show the price
+    first call ``get_stock_quote`` and run this with ``get_stock_data_async``.
+    """
+    try:
+        symbol = to_yahoo_symbol(symbol)
 
-        if 'regularMarketPrice' not in info:
-            return None, None, "Invalid stock symbol", None
+        with stage("quote"):
+            quote = get_quote(symbol)
 
-        hist = stock.history(period="1y")
+        with stage("history"):
+            hist = load_history(symbol, period="1y")
         if hist.empty:
             return None, None, "No historical data available", None
 
         # Calculate technical indicators
-        hist['MA20'] = hist['Close'].rolling(window=20).mean()
-        hist['MA50'] = hist['Close'].rolling(window=50).mean()
-        hist['MA200'] = hist['Close'].rolling(window=200).mean()
-        hist['RSI'] = calculate_rsi(hist['Close'])
-
-        # Extract key financial data
-        current_price = info.get('regularMarketPrice', 0)
-        ma50 = hist['MA50'].iloc[-1]
-        ma200 = hist['MA200'].iloc[-1]
-        rsi = hist['RSI'].iloc[-1]
-        pe_ratio = info.get('trailingPE', None)
-        eps = info.get('trailingEps', None)
-        week52_high = info.get('fiftyTwoWeekHigh', None)
-        week52_low = info.get('fiftyTwoWeekLow', None)
-        dividend_yield = info.get('dividendYield', None)
-        earnings_growth = info.get('earningsGrowth', None)
-        debt_to_equity = info.get('debtToEquity', None)
-        sector = info.get('sector', 'Unknown')
-
-
-        # Extract ROE  ROE=Net Income​ / Shareholder’s Equity
-        roe = info.get('returnOnEquity', None)  # Usually in decimal form (e.g., 0.15 = 15%)
-        if roe is not None:
-            roe = round(roe * 100, 2)  # Convert to percentage
-
-
-        # Generate pros & cons
-        pros, cons = [], []
-
-        # P/E= Stock Price​/ Earnings Per Share (EPS)
-
-        # **Technical Analysis Insights**
-        if current_price > ma50 and current_price > ma200:
-            pros.append("Stock is in an uptrend (above 50-day & 200-day MA).")
-        if 30 < rsi < 70:
-            pros.append("RSI is in a healthy range (30-70).")
-        if current_price >= week52_high * 0.95:
-            pros.append("Near 52-week high (strong momentum).")
-        if pe_ratio and pe_ratio < 20:
-            pros.append(f"Low P/E ratio ({pe_ratio:.2f}), undervalued.")
-
-        if current_price < ma50 or current_price < ma200:
-            cons.append("Stock is in a downtrend (below key moving averages).")
-        if rsi > 70:
-            cons.append("Stock is overbought (RSI > 70), possible correction ahead.")
-        if rsi < 30:
-            cons.append("Stock is oversold (RSI < 30), indicating weakness.")
-        if current_price <= week52_low * 1.05:
-            cons.append("Near 52-week low, weak momentum.")
-        if pe_ratio and pe_ratio > 50:
-            cons.append(f"High P/E ratio ({pe_ratio:.2f}), overvalued.")
-
-
-        if roe is not None:
-            if roe > 15:
-                pros.append(f"Strong Return on Equity (ROE): {roe}% - Indicates good profitability and efficient management.")
-            elif roe > 8:
-                pros.append(f"Moderate Return on Equity (ROE): {roe}% - Decent profitability, but further analysis needed.")
-            else:
-                cons.append(f"Low Return on Equity (ROE): {roe}% - Could indicate inefficiencies or weak profitability.")
-
-
-        # EPS (Earnings Per Share)
-        if eps is not None:
-            if eps > 30:
-                pros.append(f"Very strong earnings per share {eps}, indicating high profitability.")
-            elif eps > 10:
-                pros.append(f"Good EPS {eps}, suggesting a profitable company.")
-            else:
-                cons.append(f"Low EPS {eps}, company may have profitability concerns.")
-
-
-        # **Fundamental Insights**
-        if dividend_yield and dividend_yield > 0:
-            pros.append(f"Pays dividends (Yield: {dividend_yield * 100:.2f}%).")
-        else:
-            cons.append("No dividends, less passive income potential.")
-
-        # if earnings_growth and earnings_growth > 0:
-        #     pros.append(f"Positive earnings growth ({earnings_growth * 100:.2f}%).")
-        # else:
-        #     cons.append("Negative earnings growth, may indicate weaker future performance.")
-
-        # if debt_to_equity and debt_to_equity < 1:
-        #     pros.append(f"Low debt-to-equity ratio ({debt_to_equity:.2f}), financially stable.")
-        # else:
-        #     cons.append(f"High debt-to-equity ratio ({debt_to_equity:.2f}), may struggle with debt.")
-
-        # **Sector Comparison Insights**
-        industry_avg_pe = get_sector_avg_pe(sector)
-        if pe_ratio and industry_avg_pe:
-            if pe_ratio < industry_avg_pe:
-                pros.append(f"P/E ratio ({pe_ratio:.2f}) is lower than sector average ({industry_avg_pe:.2f}).")
-            else:
-                cons.append(f"P/E ratio ({pe_ratio:.2f}) is higher than sector average ({industry_avg_pe:.2f}), overvalued.")
+        with stage("indicators"):
+            _get_indicator_cache().apply((symbol, "1y"), hist)
 
-        # **News Sentiment Analysis**
-        sentiment = get_news_sentiment(symbol)
-        if sentiment == "Positive":
-            pros.append("Positive news sentiment, good market perception.")
-        elif sentiment == "Negative":
-            cons.append("Negative news sentiment, possible market concerns.")
-        else:
-            pros.append("Neutral news sentiment, no strong bias.")
+        with stage("fundamentals"):
+            info = {**get_fundamentals(symbol), **quote}
+            # Shares outstanding only change with filings, so the market cap follows the live price
+            if info.get('sharesOutstanding') and info.get('regularMarketPrice'):
+                info['marketCap'] = info['sharesOutstanding'] * info['regularMarketPrice']
 
-        insights = {"Pros": pros, "Cons": cons}
+        insights = build_insights(symbol, hist, info)
 
         return hist, info, "success", insights
 
+    except SymbolNotFound:
+        return None, None, "Invalid stock symbol", None
+    except UpstreamUnavailable:
+        return None, None, "Market data is temporarily unavailable, please try again shortly", None
     except Exception as e:
         return None, None, f"Error fetching data: {str(e)}", None
 
+def get_stock_data_async(symbol: str) -> Future:
+    """Start ``get_stock_data`` on the fetch pool, so a page can render the quote and chart meanwhile."""
+    return submit(_fetch_pool, get_stock_data, symbol)
+
+def get_indicator_panel(symbols: List[str], period: str = "1y") -> Tuple[Optional[pd.DataFrame], str]:
+    """Latest MA/RSI/52-week indicators for many symbols, computed in one vectorized pass."""
+    yahoo_symbols = list(dict.fromkeys(to_yahoo_symbol(symbol) for symbol in symbols))
+
+    def fetch(symbol):
+        try:
+            return load_history(symbol, period)
+        except Exception as e:
+            print(f"Error loading history for {symbol}:", e)
+            return None
+
+    histories = {
+        symbol.replace('.NS', ''): hist
+        for symbol, hist in zip(yahoo_symbols, map_in_context(_fetch_pool, fetch, yahoo_symbols))
+        if hist is not None and not hist.empty
+    }
+    if not histories:
+        return None, "No historical data available"
+
+    from indicators import close_matrix, latest_indicators
+
+    names, _, closes = close_matrix(histories)
+    return latest_indicators(names, closes), "success"
+
 # **Helper function to get sector average P/E ratio**
 def get_sector_avg_pe(sector: str) -> Optional[float]:
-    """Mock function to return average P/E ratio of a sector (replace with real data)."""
-    sector_pe_data = {
-        "Technology": 25,
-        "Finance": 15,
-        "Healthcare": 18,
-        "Consumer Goods": 22,
-        "Energy": 12
-    }
-    return sector_pe_data.get(sector, None)
+    """Median trailing P/E of the stored symbols in ``sector`` (see ``sector_stats``).
+
+    None when fewer than ``sector_stats.MIN_GROUP_SIZE`` symbols of the
+    sector have a P/E in the fundamentals store.
+    """
+    from sector_stats import get_sector_stats
+
+    return get_sector_stats().value('sector', sector, 'trailingPE', 'median')
 
 # **Helper function to get news sentiment analysis**
 def get_news_sentiment(symbol: str) -> str:
@@ -334,12 +696,16 @@ def get_news_sentiment(symbol: str) -> str:
 
 def format_currency(value: float) -> str:
     """Format number with Indian Rupee symbol."""
+    import pandas as pd
+
     if pd.isna(value):
         return "N/A"
     return f"₹{value:,.2f}"
 
 def prepare_summary_data(info: dict) -> pd.DataFrame:
     """Prepare summary table data."""
+    import pandas as pd
+
     metrics = {
         'Current Price': info.get('regularMarketPrice', None),
         'Previous Close': info.get('regularMarketPreviousClose', None),
@@ -358,26 +724,75 @@ def prepare_summary_data(info: dict) -> pd.DataFrame:
     df['Value'] = df['Value'].apply(lambda x: format_currency(x) if isinstance(x, (int, float)) else 'N/A')
     return df
 
+def to_yahoo_symbol(symbol: str) -> str:
+    """Upper-case a symbol and append .NS (NSE) unless an exchange suffix is present."""
+    symbol = symbol.strip().upper()
+    if not (symbol.endswith('.NS') or symbol.endswith('.BO')):
+        symbol = f"{symbol}.NS"
+    return symbol
+
+def _fetch_info(symbol: str) -> Tuple[Optional[dict], Optional[Exception]]:
+    """Fetch the quote for one symbol, returning (quote, error)."""
+    try:
+        return get_quote(symbol), None
+    except Exception as e:
+        return None, e
+
+def fetch_infos(symbols: List[str]) -> Dict[str, Tuple[Optional[dict], Optional[Exception]]]:
+    """Fetch quotes (``get_quote``) for many Yahoo symbols concurrently.
+
+    Quotes already in the shared snapshot (kept warm by ``start_prefetch``) are
+    served from memory. The rest run on a shared pool bounded by
+    MAX_FETCH_WORKERS, so they cost roughly len(missing) / MAX_FETCH_WORKERS
+    round-trips.
+    Returns {symbol: (quote, error)} with exactly one of the two set; the error
+    is ``SymbolNotFound`` for unknown symbols.
+    """
+    since = _snapshot_since()
+    result = {}
+    for symbol in dict.fromkeys(symbols):
+        info = _quote_snapshot.quote(symbol, since)
+        if info is not None:
+            result[symbol] = (info, None)
+
+    # Misses are fetched inline and shared with every other session
+    missing = [symbol for symbol in dict.fromkeys(symbols) if symbol not in result]
+    for symbol, (info, error) in zip(missing, map_in_context(_fetch_pool, _fetch_info, missing)):
+        if error is None:
+            _quote_snapshot.put_quote(symbol, info)
+        result[symbol] = (info, error)
+    return result
+
 #def generate_portfolio_snapshot(symbols: List[str]) -> Tuple[Optional[pd.DataFrame], Dict, str]:
 def generate_portfolio_snapshot(symbols: List[str], stock_data: Dict[str, Dict]) -> Tuple[Optional[pd.DataFrame], Dict, str]:
 
     """Generate a snapshot of the portfolio performance."""
+    import pandas as pd
+
     try:
         portfolio_data = []
         total_value = 0
         total_change = 0
         invalid_symbols = []
+        # Known symbols whose quote couldn't be fetched right now (upstream unavailable)
+        unavailable_symbols = []
+
+        # Fetch all quotes up front in one concurrent batch
+        quotes = fetch_infos([to_yahoo_symbol(symbol) for symbol in symbols])
 
         for symbol in symbols:
             try:
                 # Convert to upper case and append .NS if not present
-                symbol = symbol.strip().upper()
                 symbol_s = symbol.strip().upper()
-                if not (symbol.endswith('.NS') or symbol.endswith('.BO')):
-                    symbol = f"{symbol}.NS"
-
-                stock = yf.Ticker(symbol)
-                info = stock.info
+                symbol = to_yahoo_symbol(symbol)
+
+                info, error = quotes[symbol]
+                if error is not None:
+                    if isinstance(error, UpstreamUnavailable):
+                        unavailable_symbols.append(symbol.replace('.NS', ''))
+                    else:
+                        invalid_symbols.append(symbol.replace('.NS', ''))
+                    continue
 
                 if not info or 'regularMarketPrice' not in info:
                     invalid_symbols.append(symbol.replace('.NS', ''))
@@ -392,13 +807,13 @@ def generate_portfolio_snapshot(symbols: List[str], stock_data: Dict[str, Dict])
                 week_high = info.get('fiftyTwoWeekHigh', 0)
                 week_low = info.get('fiftyTwoWeekLow', 0)
 
-                # Add to total value (assuming equal weights for simplicity)
-                total_value += current_price
-                total_change += change
-
                 average_buy=stock_data[symbol_s]["avg_purchase_price"]
                 last_purchase_price=stock_data[symbol_s]["last_purchase_price"]
                 last_purchase_date=stock_data[symbol_s]["last_purchase_date"]
+
+                # Add to total value (assuming equal weights for simplicity)
+                total_value += current_price
+                total_change += change
                 
                 
 
@@ -416,36 +831,36 @@ def generate_portfolio_snapshot(symbols: List[str], stock_data: Dict[str, Dict])
                     'Distance from 52W Low %': ((current_price - week_low) / week_low * 100) if week_low else 0
                 })
             except Exception as e:
+                # e.g. a symbol that isn't in the holdings; only upstream outages count as unavailable
+                print(f"Error processing {symbol}:", e)
                 invalid_symbols.append(symbol.replace('.NS', ''))
                 continue
 
         if not portfolio_data:
+            if unavailable_symbols:
+                return None, None, ("Market data is temporarily unavailable for: " + ", ".join(unavailable_symbols)
+                                    + (f". Invalid symbols: {', '.join(invalid_symbols)}" if invalid_symbols else ""))
             invalid_symbols_str = ", ".join(invalid_symbols)
             return None, None, f"No valid stocks found in portfolio. Invalid symbols: {invalid_symbols_str}"
 
-        # Create DataFrame
+        # Create DataFrame; values stay numeric and are formatted by the caller at render time
         df = pd.DataFrame(portfolio_data)
 
-        # Format the DataFrame
-        for col in ['Current Price', 'Change', '52W High', '52W Low']:
-            df[col] = df[col].apply(format_currency)
-
-        for col in ['Change %', 'Distance from 52W High %', 'Distance from 52W Low %']:
-            df[col] = df[col].apply(lambda x: f"{x:.2f}%")
-
         # Calculate portfolio summary
         summary = {
             'Total Value': total_value,
             'Total Change': total_change,
             'Total Change %': (total_change / (total_value - total_change) * 100) if (total_value - total_change) != 0 else 0,
-            'Best Performer': df.iloc[df['Change %'].str.rstrip('%').astype(float).idxmax()]['Symbol'],
-            'Worst Performer': df.iloc[df['Change %'].str.rstrip('%').astype(float).idxmin()]['Symbol'],
+            'Best Performer': df.loc[df['Change %'].idxmax(), 'Symbol'],
+            'Worst Performer': df.loc[df['Change %'].idxmin(), 'Symbol'],
             'Timestamp': datetime.datetime.now(pytz.timezone('Asia/Kolkata')).strftime('%Y-%m-%d %H:%M:%S IST')
         }
 
         # Add invalid symbols to summary if any
         if invalid_symbols:
             summary['Invalid Symbols'] = invalid_symbols
+        if unavailable_symbols:
+            summary['Unavailable Symbols'] = unavailable_symbols
 
         return df, summary, "success"
 
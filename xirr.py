@@ -0,0 +1,141 @@
+"""Cashflow-based XIRR for many holdings at once.
+
+Each group's rate r solves  sum(amount_i * (1 + r) ** years_i) = 0,  where
+``years_i`` is how long before the valuation date cashflow i happened
+(365-day years, as in spreadsheet XIRR). All groups are solved together:
+Newton iterations on x = ln(1 + r) run as array operations over every
+cashflow, with per-group sums via ``np.bincount``. Groups Newton can't
+settle fall back to vectorized bisection over a bracket. Groups with no
+sign change in their cashflows have no rate and come back as NaN.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_YEAR = 365.0
+# Bracket on x = ln(1 + r): r from about -99.995% to +100,000% a year
+MIN_LOG_RATE = -10.0
+MAX_LOG_RATE = np.log1p(1000.0)
+NEWTON_ITERATIONS = 50
+BISECTION_ITERATIONS = 100
+
+
+def _npv(groups, amounts, years, x, n_groups):
+    """Per-group NPV and its derivative in x, evaluated at each group's x."""
+    growth = amounts * np.exp(x[groups] * years)
+    return (np.bincount(groups, weights=growth, minlength=n_groups),
+            np.bincount(groups, weights=growth * years, minlength=n_groups))
+
+
+def solve_xirr(groups: np.ndarray, amounts: np.ndarray, years: np.ndarray,
+               n_groups: Optional[int] = None, tol: float = 1e-9) -> np.ndarray:
+    """Annual rate per group for cashflows given as parallel arrays.
+
+    ``groups`` are integer ids in ``[0, n_groups)``, ``amounts`` are signed
+    (money out negative), and ``years`` are non-negative ages in years at the
+    valuation date. A group containing a NaN amount gets NaN.
+    """
+    groups = np.asarray(groups, dtype=np.intp)
+    amounts = np.asarray(amounts, dtype=float)
+    years = np.asarray(years, dtype=float)
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if len(groups) else 0
+
+    # Scale each group to unit gross flow so the tolerance means the same everywhere
+    scale = np.bincount(groups, weights=np.abs(np.nan_to_num(amounts)), minlength=n_groups)
+    amounts = amounts / np.where(scale > 0, scale, 1.0)[groups]
+
+    invalid = np.bincount(groups, weights=np.isnan(amounts), minlength=n_groups) > 0
+    has_in = np.bincount(groups, weights=amounts > 0, minlength=n_groups) > 0
+    has_out = np.bincount(groups, weights=amounts < 0, minlength=n_groups) > 0
+    solvable = has_in & has_out & ~invalid
+    amounts = np.where(np.isnan(amounts), 0.0, amounts)
+
+    x = np.full(n_groups, np.log1p(0.1))
+    converged = ~solvable
+    for _ in range(NEWTON_ITERATIONS):
+        value, slope = _npv(groups, amounts, years, x, n_groups)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.where(converged | (slope == 0), 0.0, value / slope)
+        x = np.clip(x - np.nan_to_num(step), MIN_LOG_RATE, MAX_LOG_RATE)
+        converged |= np.abs(step) < tol
+        if converged.all():
+            break
+
+    # Newton can stall on flat or non-convex NPV curves; bisect those groups
+    value, _ = _npv(groups, amounts, years, x, n_groups)
+    pending = solvable & ~(converged & (np.abs(value) < 1e-6))
+    if pending.any():
+        x = np.where(pending, _bisect(groups, amounts, years, pending, n_groups), x)
+
+    rates = np.expm1(x)
+    rates[~solvable] = np.nan
+    return rates
+
+
+def _bisect(groups, amounts, years, pending, n_groups):
+    """x per group by bisection on [MIN_LOG_RATE, MAX_LOG_RATE]; NaN where the bracket has no sign change."""
+    mask = pending[groups]
+    groups, amounts, years = groups[mask], amounts[mask], years[mask]
+    lo = np.full(n_groups, MIN_LOG_RATE)
+    hi = np.full(n_groups, MAX_LOG_RATE)
+    f_lo, _ = _npv(groups, amounts, years, lo, n_groups)
+    f_hi, _ = _npv(groups, amounts, years, hi, n_groups)
+    bracketed = np.sign(f_lo) != np.sign(f_hi)
+    for _ in range(BISECTION_ITERATIONS):
+        mid = (lo + hi) / 2
+        f_mid, _ = _npv(groups, amounts, years, mid, n_groups)
+        same = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(same, mid, lo)
+        f_lo = np.where(same, f_mid, f_lo)
+        hi = np.where(same, hi, mid)
+    return np.where(bracketed, (lo + hi) / 2, np.nan)
+
+
+def transaction_cashflows(transactions: pd.DataFrame, prices: pd.Series, as_of=None) -> pd.DataFrame:
+    """Cashflows from ledger transactions plus the current value of each open position.
+
+    Buys (quantity * price + fees) are money out, sells (quantity * price -
+    fees) money in. Each symbol's remaining quantity is valued at
+    ``prices[symbol]`` on ``as_of`` (default today). A symbol with no price
+    gets a NaN terminal flow, and so a NaN rate.
+    Returns columns Symbol, Date, Amount.
+    """
+    as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.today()).normalize()
+    is_buy = (transactions['Side'] == 'BUY').to_numpy()
+    quantity = transactions['Quantity'].to_numpy(dtype=float)
+    gross = quantity * transactions['Price'].to_numpy(dtype=float)
+    fees = transactions['Fees'].to_numpy(dtype=float)
+
+    flows = pd.DataFrame({
+        'Symbol': transactions['Symbol'].to_numpy(),
+        'Date': pd.to_datetime(transactions['Date']).to_numpy(),
+        'Amount': np.where(is_buy, -(gross + fees), gross - fees),
+    })
+
+    held = pd.Series(np.where(is_buy, quantity, -quantity), index=transactions['Symbol'].to_numpy()).groupby(level=0).sum()
+    held = held[held > 1e-9]
+    terminal = pd.DataFrame({
+        'Symbol': held.index,
+        'Date': as_of,
+        'Amount': held.to_numpy() * prices.reindex(held.index).to_numpy(dtype=float),
+    })
+    return pd.concat([flows, terminal], ignore_index=True)
+
+
+def xirr(cashflows: pd.DataFrame, by: Optional[str] = 'Symbol', as_of=None) -> pd.Series:
+    """XIRR of a Date/Amount cashflow frame, per ``by`` group (or one rate for all rows if ``by`` is None).
+
+    ``as_of`` defaults to the latest cashflow date. Rates are fractions (0.12 = 12%).
+    """
+    dates = pd.to_datetime(cashflows['Date'])
+    as_of = pd.Timestamp(as_of) if as_of is not None else dates.max()
+    years = ((as_of - dates).dt.days / DAYS_PER_YEAR).to_numpy(dtype=float)
+
+    if by is None:
+        codes, labels = np.zeros(len(cashflows), dtype=np.intp), pd.Index(['Portfolio'])
+    else:
+        codes, labels = pd.factorize(cashflows[by], sort=True)
+    rates = solve_xirr(codes, cashflows['Amount'].to_numpy(dtype=float), years, n_groups=len(labels))
+    return pd.Series(rates, index=labels, name='XIRR')